@@ -8,14 +8,24 @@ COPYRIGHT:   Copyright 2025,2026 Mark Jansen <mark.jansen@reactos.org>
 import re
 from enum import IntEnum, IntFlag
 from base64 import b64encode
-from uuid import UUID
 from . import winapi as apphelp
-from .sdb_reader import SdbFile
+from .sdb_reader import (
+    SdbFile,
+    StringCache,
+    SdbSetStringCache,
+    DEFAULT_STRING_CACHE_SIZE,
+)
+from .tag_index import TagIndex, SdbBuildTagIndex
+from .indexes import SdbFindIndexedTags, SdbGetIndex, SdbScanForTags
+from .walk import WalkEvent, walk_tags
+from collections.abc import Callable
 from datetime import datetime, timezone
 from abc import ABC, abstractmethod
 from .tags import (
     WellKnownTags as Tags,
     tag_id_to_string,
+    tag_ids_for_name,
+    tag_ids_for_output_name,
 )
 from pathlib import Path
 from os import PathLike
@@ -112,6 +122,28 @@ def is_excluded(name: str, exclude_tags) -> bool:
     return name.startswith("InvalidTag") and "InvalidTag" in exclude_tags
 
 
+class ExcludedTags(dict):
+    """``--exclude`` names compiled to tag numbers, for one target OS.
+
+    ``excluded[tag]`` is whether TAG number ``tag`` is excluded, as
+    :func:`is_excluded` decides it for the name the tag has on ``target_os``.
+    Every number is resolved once, on first use; after that the lookup is a
+    plain dict lookup, cheap enough for the walker to do on every tag (see
+    :meth:`Tag.accept`).
+    """
+
+    def __init__(self, exclude_tags, target_os: str | None = None):
+        super().__init__()
+        self.names = frozenset(exclude_tags)
+        self.target_os = target_os
+
+    def __missing__(self, tag: int) -> bool:
+        excluded = self[tag] = is_excluded(
+            tag_id_to_string(tag, self.target_os), self.names
+        )
+        return excluded
+
+
 def _value_to_flags(value: int, flags: type[IntFlag]) -> str:
     """Converts a value to a string representation of its flags."""
     values = []
@@ -124,51 +156,125 @@ def _value_to_flags(value: int, flags: type[IntFlag]) -> str:
     return " | ".join(values) if values else "0x0"
 
 
-def tag_value_to_string(tag: "Tag") -> tuple[str, str | None]:
-    if tag.type == TagType.BYTE:
-        return f"{tag.read_byte()}", None
-    elif tag.type == TagType.WORD:
-        value = tag.read_word()
-        if tag.tag in (Tags.INDEX_TAG, Tags.INDEX_KEY):
-            return f"{value}", normalize_tag_name(
-                tag_id_to_string(value, tag.db.target_os)
-            )
-        return f"{value}", None
-    elif tag.type == TagType.DWORD:
-        value = tag.read_dword()
-        comment = None
-        if tag.tag in (Tags.INDEX_FLAGS,):
-            comment = _value_to_flags(value, IndexFlags)
-        elif tag.tag in (Tags.GUEST_TARGET_PLATFORM, Tags.RUNTIME_PLATFORM):
-            # GUEST_TARGET_PLATFORM is known as TAG_OS_PLATFORM in older versions
-            comment = _value_to_flags(value, PlatformType)
-        elif (
-            tag.tag in (Tags.LINK_DATE, Tags.UPTO_LINK_DATE, Tags.FROM_LINK_DATE)
-            and value != 0
-        ):
-            dt = datetime.fromtimestamp(value, tz=timezone.utc)
-            comment = dt.strftime("%Y-%m-%d %H:%M:%S %Z")
-        return f"{value}", comment
-    elif tag.type == TagType.QWORD:
-        comment = None
-        value = tag.read_qword()
-        if tag.tag == Tags.TIME and value != 0:
-            comment = _filetime_to_string(value)
-        return f"{value}", comment
-    elif tag.type in (TagType.STRINGREF, TagType.STRING):
-        val = tag.read_string()
-        return val, None
-    elif tag.type == TagType.BINARY:
-        data = tag.read_bytes()
-        if data:
-            base64_data = b64encode(data).decode("utf-8")
-            if normalize_tag_name(tag.name).endswith("_ID") and len(data) == 16:
-                return base64_data, f"{{{UUID(bytes_le=data)}}}"
-            return base64_data, None
-        return "", None
+# Value decoders: each turns a tag into ``(value text, annotation or None)``.
+# The right one is picked once per tag number (see TagInfo.decode).
+
+
+def _decode_byte(tag: "Tag") -> tuple[str, str | None]:
+    return f"{tag.read_byte()}", None
+
+
+def _decode_word(tag: "Tag") -> tuple[str, str | None]:
+    return f"{tag.read_word()}", None
+
+
+def _decode_tag_word(tag: "Tag") -> tuple[str, str | None]:
+    # INDEX_TAG / INDEX_KEY hold a tag number; annotate it with its name.
+    value = tag.read_word()
+    return f"{value}", normalize_tag_name(tag_id_to_string(value, tag.db.target_os))
+
+
+def _decode_dword(tag: "Tag") -> tuple[str, str | None]:
+    return f"{tag.read_dword()}", None
+
+
+def _decode_index_flags(tag: "Tag") -> tuple[str, str | None]:
+    value = tag.read_dword()
+    return f"{value}", _value_to_flags(value, IndexFlags)
+
+
+def _decode_platform(tag: "Tag") -> tuple[str, str | None]:
+    # GUEST_TARGET_PLATFORM is known as TAG_OS_PLATFORM in older versions
+    value = tag.read_dword()
+    return f"{value}", _value_to_flags(value, PlatformType)
+
+
+def _decode_link_date(tag: "Tag") -> tuple[str, str | None]:
+    value = tag.read_dword()
+    comment = None
+    if value != 0:
+        dt = datetime.fromtimestamp(value, tz=timezone.utc)
+        comment = dt.strftime("%Y-%m-%d %H:%M:%S %Z")
+    return f"{value}", comment
+
+
+def _decode_qword(tag: "Tag") -> tuple[str, str | None]:
+    return f"{tag.read_qword()}", None
+
+
+def _decode_time(tag: "Tag") -> tuple[str, str | None]:
+    value = tag.read_qword()
+    return f"{value}", _filetime_to_string(value) if value != 0 else None
+
+
+def _decode_string(tag: "Tag") -> tuple[str, str | None]:
+    return tag.read_string(), None
+
+
+def _decode_binary(tag: "Tag") -> tuple[str, str | None]:
+    data = tag.read_bytes()
+    return (b64encode(data).decode("utf-8") if data else ""), None
+
+
+def _decode_id_binary(tag: "Tag") -> tuple[str, str | None]:
+    # *_ID binaries of 16 bytes are GUIDs.
+    data = tag.read_bytes()
+    if data:
+        base64_data = b64encode(data).decode("utf-8")
+        if len(data) == 16:
+            from uuid import UUID  # imported here: it is slow to import
+
+            return base64_data, f"{{{UUID(bytes_le=data)}}}"
+        return base64_data, None
+    return "", None
+
+
+def _decode_invalid(tag: "Tag") -> tuple[str, str | None]:
     raise ValueError(f"Unknown tag type: {tag.type.name} for tag {tag.name}")
 
 
+_VALUE_DECODERS = {
+    TagType.BYTE: _decode_byte,
+    TagType.WORD: _decode_word,
+    TagType.DWORD: _decode_dword,
+    TagType.QWORD: _decode_qword,
+    TagType.STRINGREF: _decode_string,
+    TagType.STRING: _decode_string,
+    TagType.BINARY: _decode_binary,
+}
+
+_TAG_DECODERS = {
+    Tags.INDEX_TAG: _decode_tag_word,
+    Tags.INDEX_KEY: _decode_tag_word,
+    Tags.INDEX_FLAGS: _decode_index_flags,
+    Tags.GUEST_TARGET_PLATFORM: _decode_platform,
+    Tags.RUNTIME_PLATFORM: _decode_platform,
+    Tags.LINK_DATE: _decode_link_date,
+    Tags.UPTO_LINK_DATE: _decode_link_date,
+    Tags.FROM_LINK_DATE: _decode_link_date,
+    Tags.TIME: _decode_time,
+}
+
+
+def _value_decoder(tag: int, tag_type: TagType, normalized: str):
+    if tag_type == TagType.BINARY:
+        return _decode_id_binary if normalized.endswith("_ID") else _decode_binary
+    decoder = _TAG_DECODERS.get(tag)
+    if decoder is not None and (tag & TagType.MASK) == tag_type:
+        return decoder
+    return _VALUE_DECODERS.get(tag_type, _decode_invalid)
+
+
+def tag_value_to_string(tag: "Tag") -> tuple[str, str | None]:
+    if isinstance(tag, Tag):
+        return tag.info.decode(tag)
+    # Duck-typed tag without a TagInfo: pick the decoder on the spot.
+    decoder = _value_decoder(
+        getattr(tag, "tag", TAG_NULL), tag.type, normalize_tag_name(tag.name)
+    )
+    return decoder(tag)
+
+
 def _filetime_to_string(filetime: int) -> str:
     """Converts a Windows filetime (100-nanosecond intervals since 1601-01-01) to an ISO 8601 -ish string."""
     TICKSTO1970 = 0x019DB1DED53E8000
@@ -182,18 +288,150 @@ def _filetime_to_string(filetime: int) -> str:
     return part
 
 
+TAG_TYPE_JSON_NAMES = {
+    TagType.BYTE: "byte",
+    TagType.WORD: "word",
+    TagType.DWORD: "dword",
+    TagType.QWORD: "qword",
+    TagType.STRINGREF: "string",
+    TagType.STRING: "string",
+    TagType.BINARY: "binary",
+}
+
+TAG_TYPE_XML_NAMES = {
+    TagType.BYTE: "xs:byte",
+    TagType.WORD: "xs:unsignedShort",
+    TagType.DWORD: "xs:unsignedInt",
+    TagType.QWORD: "xs:unsignedLong",
+    TagType.STRINGREF: "xs:string",
+    TagType.STRING: "xs:string",
+    TagType.BINARY: "xs:base64Binary",
+}
+
+
+class TagInfo:
+    """Everything about a tag number that does not depend on where it occurs.
+
+    One instance is shared by every tag with the same number (per target OS),
+    so the name lookup, the name forms used in the output and the choice of
+    value decoder happen once per tag number rather than once per tag. It is
+    immutable, so no caller can change it for every other tag. (A plain slotted
+    class: ``dataclasses`` is slow to import.)
+    """
+
+    __slots__ = (
+        "tag",
+        "name",
+        "type",
+        "normalized",
+        "xml_name",
+        "json_type",
+        "xml_type",
+        "decode",
+    )
+
+    tag: int
+    name: str  # raw name, as from tag_id_to_string
+    type: TagType
+    normalized: str  # normalize_tag_name(name), used in JSON
+    xml_name: str  # xml_tag_name(name), used as XML element name
+    json_type: str | None  # "type" in JSON; None for NULL and LIST
+    xml_type: str | None  # the XML type attribute; None for NULL and LIST
+    decode: Callable[["Tag"], tuple[str, str | None]]
+
+    def __init__(self, tag: int, name: str, tag_type: TagType):
+        normalized = normalize_tag_name(name)
+        init = object.__setattr__
+        init(self, "tag", tag)
+        init(self, "name", name)
+        init(self, "type", tag_type)
+        init(self, "normalized", normalized)
+        init(
+            self,
+            "xml_name",
+            "S" + normalized if normalized[:1].isdigit() else normalized,
+        )
+        init(self, "json_type", TAG_TYPE_JSON_NAMES.get(tag_type))
+        init(self, "xml_type", TAG_TYPE_XML_NAMES.get(tag_type))
+        init(self, "decode", _value_decoder(tag, tag_type, normalized))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"TagInfo is read-only: cannot set {name!r}")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"TagInfo is read-only: cannot delete {name!r}")
+
+    def __repr__(self) -> str:
+        return f"TagInfo(0x{self.tag:04x}, {self.name!r}, {self.type.name})"
+
+
+_ROOT_INFO = TagInfo(TAG_NULL, "SDB", TagType.LIST)
+_TAG_INFOS: dict[str | None, dict[int, TagInfo]] = {}
+
+
+def tag_info_table(target_os: str | None) -> dict[int, TagInfo]:
+    """The shared ``tag number -> TagInfo`` cache for ``target_os``."""
+    table = _TAG_INFOS.get(target_os)
+    if table is None:
+        table = _TAG_INFOS[target_os] = {}
+    return table
+
+
+def get_tag_info(tag: int, target_os: str | None = None) -> TagInfo:
+    """The shared :class:`TagInfo` for ``tag`` as named on ``target_os``."""
+    table = tag_info_table(target_os)
+    info = table.get(tag)
+    if info is None:
+        info = TagInfo(tag, tag_id_to_string(tag, target_os), get_tag_type(tag))
+        table[tag] = info
+    return info
+
+
+def tag_info(tag) -> TagInfo:
+    """``tag.info``; for a duck-typed tag without one, built from its fields.
+
+    The visitors go through this, so anything with ``tag``, ``name`` and
+    ``type`` can still be visited.
+    """
+    try:
+        return tag.info
+    except AttributeError:
+        return TagInfo(tag.tag, tag.name, tag.type)
+
+
 class Tag:
-    def __init__(self, db: "SdbDatabase", tag_id: int):
+    __slots__ = ("db", "tag_id", "tag", "info")
+
+    def __init__(self, db: "SdbDatabase", tag_id: int, tag: int | None = None):
         self.db = db
         self.tag_id = tag_id
         if tag_id == TAGID_ROOT:
             self.tag = TAG_NULL
-            self.name = "SDB"
-            self.type = TagType.LIST
+            self.info = _ROOT_INFO
         else:
-            self.tag = apphelp.SdbGetTagFromTagID(self._ensure_db_handle(), tag_id)
-            self.name = tag_id_to_string(self.tag, self.db.target_os)
-            self.type = get_tag_type(self.tag)
+            if tag is None:
+                tag = apphelp.SdbGetTagFromTagID(self._ensure_db_handle(), tag_id)
+            self.tag = tag
+            info = db._tag_infos.get(tag)
+            self.info = (
+                info if info is not None else get_tag_info(tag, self.db.target_os)
+            )
+
+    @property
+    def name(self) -> str:
+        return self.info.name
+
+    @name.setter
+    def name(self, name: str):
+        self.info = TagInfo(self.tag, name, self.info.type)
+
+    @property
+    def type(self) -> TagType:
+        return self.info.type
+
+    @type.setter
+    def type(self, tag_type: TagType):
+        self.info = TagInfo(self.tag, self.info.name, tag_type)
 
     def _ensure_db_handle(self) -> SdbFile:
         """Ensures that the database handle is initialized."""
@@ -202,7 +440,11 @@ class Tag:
         return self.db._handle
 
     def tags(self):
-        self._ensure_db_handle()
+        index = self._ensure_db_handle().index
+        if index is not None:
+            for child in index.children(self.tag_id):
+                yield Tag(self.db, child)
+            return
         child = apphelp.SdbGetFirstChild(self._ensure_db_handle(), self.tag_id)
         while child != 0:
             yield Tag(self.db, child)
@@ -210,6 +452,39 @@ class Tag:
                 self._ensure_db_handle(), self.tag_id, child
             )
 
+    @property
+    def parent(self) -> "Tag | None":
+        """The enclosing tag (the root for top-level tags), or ``None`` for the root."""
+        if self.tag_id == TAGID_ROOT:
+            return None
+        return Tag(self.db, self.db.index().parent(self.tag_id))
+
+    def ancestors(self):
+        """Yield the enclosing tags, from the parent up to (and including) the root."""
+        index = self.db.index()
+        for tag_id in reversed(index.path(self.tag_id)[:-1]):
+            yield Tag(self.db, tag_id)
+        if self.tag_id != TAGID_ROOT:
+            yield self.db.root()
+
+    @property
+    def depth(self) -> int:
+        """Nesting depth: 0 for the root, 1 for top-level tags."""
+        return self.db.index().depth(self.tag_id)
+
+    @property
+    def path(self) -> str:
+        """Slash-separated normalized names from the top level down to this tag.
+
+        For example ``DATABASE/EXE/NAME``; the root's path is empty.
+        """
+        index = self.db.index()
+        target_os = self.db.target_os
+        return "/".join(
+            get_tag_info(index.get_tag(tag_id), target_os).normalized
+            for tag_id in index.path(self.tag_id)
+        )
+
     def read_byte(self, default: int = 0) -> int:
         """Returns the tag value as a byte (8-bit integer)."""
         if self.type != TagType.BYTE:
@@ -247,16 +522,24 @@ class Tag:
         ptr = apphelp.SdbGetStringTagPtr(self._ensure_db_handle(), self.tag_id)
         return ptr if ptr is not None else ""
 
-    def accept(self, visitor: "TagVisitor"):
-        """Accepts a visitor for this tag."""
-        if self.type == TagType.LIST:
-            visitor.visit_list_begin(self)
-            for child in self.tags():
-                child.accept(visitor)
-            visitor.visit_list_end(self)
-        else:
-            # For non-list tags, we just visit this tag
-            visitor.visit(self)
+    def accept(self, visitor: "TagVisitor", excluded: ExcludedTags | None = None):
+        """Accepts a visitor for this tag and, for a list, all its descendants.
+
+        Driven by the iterative :meth:`SdbDatabase.walk`, so arbitrarily deep
+        databases do not hit the recursion limit. The descendants in
+        ``excluded``, with everything below them, are skipped without being
+        read; this tag itself is always visited.
+        """
+        visit = visitor.visit
+        begin = visitor.visit_list_begin
+        end = visitor.visit_list_end
+        for event, _, _, tag in self.db.walk(self, excluded):
+            if event is WalkEvent.LEAF:
+                visit(tag)
+            elif event is WalkEvent.BEGIN:
+                begin(tag)
+            else:
+                end(tag)
 
 
 class TagVisitor(ABC):
@@ -279,25 +562,134 @@ class SdbDatabase:
         path: str | PathLike,
         path_type: PathType = PathType.DOS_PATH,
         target_os: str | None = None,
+        use_mmap: bool = False,
+        with_index: bool = False,
+        string_cache_size: int = DEFAULT_STRING_CACHE_SIZE,
+        eager_strings: bool = False,
     ):
         self.path = Path(path)
         self.name = self.path.name
         self.path_type = path_type
-        # Which OS' tag table to resolve names against (None = newest); see
-        # sdbtool.apphelp.tags.tag_id_to_string.
         self.target_os = target_os
-        self._handle = apphelp.SdbOpenDatabase(str(path), path_type)
+        # use_mmap maps the file instead of reading it (see SdbOpenDatabase).
+        self._handle = apphelp.SdbOpenDatabase(str(path), path_type, use_mmap)
         self._root = None
+        if self._handle is not None:
+            if with_index:
+                SdbBuildTagIndex(self._handle)
+            # Decoded STRINGREF strings are cached per database (LRU, bounded by
+            # string_cache_size); eager_strings decodes the STRINGTABLE up front.
+            if eager_strings or string_cache_size != DEFAULT_STRING_CACHE_SIZE:
+                SdbSetStringCache(self._handle, string_cache_size, eager_strings)
+
+    @property
+    def target_os(self) -> str | None:
+        """Which OS' tag table names are resolved against (None = newest).
+
+        See :func:`sdbtool.apphelp.tags.tag_id_to_string`.
+        """
+        return self._target_os
+
+    @target_os.setter
+    def target_os(self, target_os: str | None):
+        self._target_os = target_os
+        self._tag_infos = tag_info_table(target_os)
 
     def root(self) -> Tag | None:
         if self._root is None and self._handle is not None:
             self._root = Tag(self, TAGID_ROOT)
         return self._root
 
+    def walk(
+        self,
+        start: "Tag | int | None" = None,
+        excluded: ExcludedTags | None = None,
+    ):
+        """Yield ``(event, tag_id, depth, tag)`` for a subtree, in document order.
+
+        ``event`` is a :class:`WalkEvent`: ``BEGIN`` / ``END`` around the children
+        of a list, ``LEAF`` for every other tag. The walk covers ``start`` (a
+        :class:`Tag` or tag id, default the root) and all its descendants, with
+        ``depth`` counted from ``start``. It uses an explicit stack rather than
+        recursion; stop iterating to end it early, or start a new walk at any
+        tag to resume from there. Descendants in ``excluded`` (see
+        :meth:`exclusions`) are left out, lists with all their children.
+        """
+        handle = self._handle
+        if handle is None:
+            raise ValueError("Database handle is not initialized")
+        if start is None:
+            start = self.root()
+        elif not isinstance(start, Tag):
+            start = self.root() if start == TAGID_ROOT else Tag(self, start)
+        start_id = start.tag_id
+
+        def make(tag_id: int, tag: int) -> Tag:
+            return start if tag_id == start_id else Tag(self, tag_id, tag)
+
+        return walk_tags(handle, start_id, make, excluded)
+
+    def exclusions(self, exclude_tags) -> ExcludedTags | None:
+        """``exclude_tags`` compiled for :meth:`walk`, or None if there are none."""
+        return ExcludedTags(exclude_tags, self.target_os) if exclude_tags else None
+
+    def _tag_number(self, tag: "int | str") -> int:
+        if not isinstance(tag, str):
+            return int(tag)
+        tags = tag_ids_for_name(tag, self.target_os)
+        if not tags:
+            raise ValueError(f"Unknown tag name: {tag}")
+        return tags[0]
+
+    def find_by_index(
+        self, tag: "int | str", key: "int | str", name: "str | bytes | int"
+    ) -> list[Tag]:
+        """The ``tag`` lists whose ``key`` child equals ``name``, in document order.
+
+        ``tag`` and ``key`` are TAG numbers or names, e.g. ``("EXE", "NAME",
+        "notepad.exe")``; strings compare case-insensitively. The lookup is a
+        binary search in the database's own INDEXES section when it has an
+        index for ``(tag, key)``, otherwise a scan of DATABASE (and its LIBRARY).
+        """
+        handle = self._handle
+        if handle is None:
+            raise ValueError("Database handle is not initialized")
+        tag, key = self._tag_number(tag), self._tag_number(key)
+        index = SdbGetIndex(handle, tag, key)
+        if index is not None:
+            tag_ids = sorted(SdbFindIndexedTags(handle, index, name))
+        else:
+            tag_ids = SdbScanForTags(handle, tag, key, name)
+        return [Tag(self, tag_id, tag) for tag_id in tag_ids]
+
+    def index(self) -> TagIndex:
+        """The flat tag index of this database, built on first use.
+
+        Once built, child iteration (``Tag.tags``) goes through the index too.
+        Pass ``with_index=True`` to build it when the database is opened.
+        """
+        handle = self._handle
+        if handle is None:
+            raise ValueError("Database handle is not initialized")
+        if handle.index is None:
+            return SdbBuildTagIndex(handle)
+        return handle.index
+
+    @property
+    def handle(self) -> SdbFile | None:
+        """The low-level ``SdbFile`` of this database, or ``None`` once closed."""
+        return self._handle
+
+    @property
+    def string_cache(self) -> StringCache | None:
+        """The decoded-string cache (with its hit / miss counts), if open."""
+        return self._handle.strings if self._handle is not None else None
+
     def close(self):
         if self._handle:
             apphelp.SdbCloseDatabase(self._handle)
             self._handle = None
+            self._root = None
 
     def __bool__(self):
         if self._handle is None:
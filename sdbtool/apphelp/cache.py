@@ -0,0 +1,83 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     Best-effort on-disk caches of precomputed data.
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+
+A cache file holds ``(key, data)`` as a ``marshal`` dump; it is only used when
+its key still matches, so a stale or damaged file just means computing the data
+again. Nothing is ever written into the installed package or next to the user's
+files: caches live in a per-user directory, see :func:`cache_dir`.
+"""
+
+from __future__ import annotations
+
+import marshal
+import os
+import sys
+
+# Where the caches go; set it to an empty value to disable them.
+CACHE_DIR_ENV = "SDBTOOL_CACHE_DIR"
+
+
+def cache_dir() -> str | None:
+    """The per-user cache directory, or ``None`` if caching is disabled.
+
+    ``$SDBTOOL_CACHE_DIR`` if set, otherwise the platform's user cache
+    directory: ``%LOCALAPPDATA%\\sdbtool\\Cache`` on Windows,
+    ``~/Library/Caches/sdbtool`` on macOS and ``$XDG_CACHE_HOME/sdbtool``
+    (default ``~/.cache/sdbtool``) elsewhere.
+    """
+    directory = os.environ.get(CACHE_DIR_ENV)
+    if directory is not None:
+        return directory or None
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser(
+            os.path.join("~", "AppData", "Local")
+        )
+        return os.path.join(base, "sdbtool", "Cache")
+    if sys.platform == "darwin":
+        return os.path.expanduser(os.path.join("~", "Library", "Caches", "sdbtool"))
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser(
+        os.path.join("~", ".cache")
+    )
+    return os.path.join(base, "sdbtool")
+
+
+def cache_path(*names: str) -> str | None:
+    """``names`` joined below :func:`cache_dir`, or ``None`` if caching is disabled."""
+    directory = cache_dir()
+    return None if directory is None else os.path.join(directory, *names)
+
+
+def read_cache(path: str | None, key: tuple):
+    """The data cached in ``path`` under ``key``, or ``None``."""
+    if path is None:
+        return None
+    try:
+        with open(path, "rb") as f:
+            cached = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(cached, tuple) or len(cached) != 2 or cached[0] != key:
+        return None
+    return cached[1]
+
+
+def write_cache(path: str | None, key: tuple, data) -> None:
+    """Cache ``data`` in ``path`` under ``key``; errors are ignored."""
+    if path is None:
+        return
+    # Write to a private name and rename, so concurrent processes never see a
+    # partial file.
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "wb") as f:
+            marshal.dump((key, data), f)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
@@ -0,0 +1,344 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     Lookups through the INDEXES section of an SDB file.
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+
+A compiled database carries its own lookup tables: INDEXES holds one INDEX per
+``(tag, key tag)`` pair (for example EXE by NAME), whose INDEX_BITS is an array
+of 12-byte records ``(QWORD key, DWORD tagid)`` sorted by key. This is a port
+of the apphelp functions that use them (``SdbGetIndex``,
+``SdbFindFirstIndexedTag`` / ``SdbFindNextIndexedTag``), including the key
+hashing:
+
+* a string key is its first 8 upper-cased characters, packed big-endian one
+  byte per character (two for a character with a non-zero high byte), or its
+  last 8 characters when the index has ``SHIMDB_INDEX_TRAILING_CHARACTERS``;
+* a binary key (a GUID) is the XOR of its little-endian QWORDs;
+* any other key is the value itself.
+
+Keys are lossy, so every candidate found through an index is confirmed by
+comparing its key tag against the searched value. INDEX_BITS is only decoded
+(into sorted ``array`` columns) the first time an index is searched; a search
+is then a binary search.
+"""
+
+from __future__ import annotations
+
+import struct
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterator
+
+from .sdb_reader import (
+    SdbFile,
+    SdbFindFirstTag,
+    SdbGetFirstChild,
+    SdbGetNextChild,
+    SdbGetStringTagPtr,
+    SdbGetTagFromTagID,
+    SdbpReadData,
+    SdbpReadTagHeader,
+    SdbReadBinaryTag,
+    TAG_TYPE_BINARY,
+    TAG_TYPE_BYTE,
+    TAG_TYPE_DWORD,
+    TAG_TYPE_MASK,
+    TAG_TYPE_QWORD,
+    TAG_TYPE_STRING,
+    TAG_TYPE_STRINGREF,
+    TAG_TYPE_WORD,
+    TAGID_NULL,
+    TAGID_ROOT,
+    _SIZEOF_DWORD,
+    _SIZEOF_TAG,
+    _TAG_DATABASE,
+    _UINT,
+    _sdbp_get_tag_size,
+)
+
+_TAG_LIBRARY = 0x7002
+_TAG_INDEXES = 0x7802
+_TAG_INDEX = 0x7803
+_TAG_INDEX_TAG = 0x3802
+_TAG_INDEX_KEY = 0x3803
+_TAG_INDEX_FLAGS = 0x4016
+_TAG_INDEX_BITS = 0x9801
+
+SHIMDB_INDEX_UNIQUE_KEY = 0x1
+SHIMDB_INDEX_TRAILING_CHARACTERS = 0x2
+
+_KEY_CHARS = 8
+_KEY_MASK = (1 << 64) - 1
+_RECORD = struct.Struct("<QI")
+_INT_TYPES = {TAG_TYPE_BYTE: 1, TAG_TYPE_WORD: 2, TAG_TYPE_DWORD: 4, TAG_TYPE_QWORD: 8}
+
+KeyValue = str | bytes | int
+
+
+def _upcase(value: str) -> str:
+    """Upper-case character by character, as ``RtlUpcaseUnicodeChar`` does."""
+    upper = value.upper()
+    if len(upper) == len(value):
+        return upper  # no character expanded (as "ß" does to "SS")
+    out = []
+    for ch in value:
+        upper = ch.upper()
+        out.append(upper if len(upper) == 1 else ch)
+    return "".join(out)
+
+
+def SdbMakeIndexKeyFromString(value: str, trailing: bool = False) -> int:
+    """The index key of a string (its first, or last, 8 characters)."""
+    # At most 8 characters contribute, as each takes at least one byte.
+    value = _upcase(value[-_KEY_CHARS:] if trailing else value[:_KEY_CHARS])
+    try:
+        # Every character below U+0100 takes exactly one byte.
+        return int.from_bytes(value.encode("latin-1").ljust(8, b"\0"), "big")
+    except UnicodeEncodeError:
+        pass
+    units = value.encode("utf-16-le", "surrogatepass")
+    key = 0
+    shift = 56
+    for i in range(0, len(units), 2):
+        low, high = units[i], units[i + 1]
+        if high:
+            key |= high << shift
+            shift -= 8
+            if shift < 0:
+                break
+        key |= low << shift
+        shift -= 8
+        if shift < 0:
+            break
+    return key
+
+
+def SdbMakeIndexKeyFromBinary(value: bytes) -> int:
+    """The index key of a binary value: the XOR of its little-endian QWORDs."""
+    key = 0
+    for i in range(0, len(value), 8):
+        key ^= int.from_bytes(value[i : i + 8], "little")
+    return key
+
+
+def SdbMakeIndexKey(value: KeyValue, flags: int = 0) -> int:
+    """The index key of ``value``, for an index with the given INDEX_FLAGS."""
+    if isinstance(value, str):
+        return SdbMakeIndexKeyFromString(
+            value, bool(flags & SHIMDB_INDEX_TRAILING_CHARACTERS)
+        )
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return SdbMakeIndexKeyFromBinary(bytes(value))
+    return int(value) & _KEY_MASK
+
+
+class SdbIndex:
+    """One INDEX of a database; its records are decoded on first use."""
+
+    __slots__ = ("tag", "key", "flags", "bits", "_keys", "_tagids")
+
+    def __init__(self, tag: int, key: int, flags: int, bits: int):
+        self.tag = tag  # the indexed TAG, e.g. EXE
+        self.key = key  # the TAG of the key child, e.g. NAME
+        self.flags = flags  # INDEX_FLAGS
+        self.bits = bits  # tagid of the INDEX_BITS tag
+        self._keys: array | None = None
+        self._tagids: array | None = None
+
+    def records(self, pdb: SdbFile) -> tuple[array, array]:
+        """The ``(keys, tagids)`` columns, sorted by key."""
+        if self._keys is None:
+            self._keys, self._tagids = _decode_bits(pdb, self.bits)
+        return self._keys, self._tagids
+
+    def __repr__(self) -> str:
+        return (
+            f"SdbIndex(tag=0x{self.tag:x}, key=0x{self.key:x}, "
+            f"flags=0x{self.flags:x}, bits=0x{self.bits:x})"
+        )
+
+
+def _decode_bits(pdb: SdbFile, bits: int) -> tuple[array, array]:
+    keys, tagids = array("Q"), array("I")
+    if bits == TAGID_NULL:
+        return keys, tagids
+    _, size = SdbpReadTagHeader(pdb, bits)
+    size -= size % _RECORD.size
+    raw = SdbpReadData(pdb, bits + _SIZEOF_TAG + _SIZEOF_DWORD, size) if size else None
+    if raw is None:
+        return keys, tagids
+    records = list(_RECORD.iter_unpack(raw))
+    if any(records[i][0] > records[i + 1][0] for i in range(len(records) - 1)):
+        # Not sorted (never the case for a compiled database); sort stably.
+        records.sort(key=lambda record: record[0])
+    keys.extend(key for key, _ in records)
+    tagids.extend(tagid for _, tagid in records)
+    return keys, tagids
+
+
+def SdbLoadIndexes(pdb: SdbFile) -> dict[tuple[int, int], SdbIndex]:
+    """The INDEX entries of ``pdb`` by ``(tag, key tag)``, read once per handle.
+
+    Only the INDEX headers are read here; see :meth:`SdbIndex.records`.
+    """
+    if pdb.indexes is not None:
+        return pdb.indexes
+    indexes: dict[tuple[int, int], SdbIndex] = {}
+    root = SdbFindFirstTag(pdb, TAGID_ROOT, _TAG_INDEXES)
+    index = SdbGetFirstChild(pdb, root) if root != TAGID_NULL else TAGID_NULL
+    while index != TAGID_NULL:
+        if SdbGetTagFromTagID(pdb, index) == _TAG_INDEX:
+            fields = {}
+            child = SdbGetFirstChild(pdb, index)
+            while child != TAGID_NULL:
+                fields.setdefault(SdbGetTagFromTagID(pdb, child), child)
+                child = SdbGetNextChild(pdb, index, child)
+            tag = _read_int(pdb, fields.get(_TAG_INDEX_TAG, TAGID_NULL))
+            key = _read_int(pdb, fields.get(_TAG_INDEX_KEY, TAGID_NULL))
+            flags = _read_int(pdb, fields.get(_TAG_INDEX_FLAGS, TAGID_NULL))
+            bits = fields.get(_TAG_INDEX_BITS, TAGID_NULL)
+            # Like SdbGetIndex, the first INDEX for a pair wins.
+            if tag and key and bits != TAGID_NULL:
+                indexes.setdefault((tag, key), SdbIndex(tag, key, flags or 0, bits))
+        index = SdbGetNextChild(pdb, root, index)
+    pdb.indexes = indexes
+    return indexes
+
+
+def SdbGetIndex(pdb: SdbFile, tag: int, key: int) -> SdbIndex | None:
+    """The INDEX of ``tag`` by its ``key`` child, or ``None`` when there is none."""
+    return SdbLoadIndexes(pdb).get((tag, key))
+
+
+class FindInfo:
+    """Search state of :func:`SdbFindFirstIndexedTag` / :func:`SdbFindNextIndexedTag`."""
+
+    __slots__ = ("index", "key", "position", "tagid")
+
+    def __init__(self, index: SdbIndex, key: int):
+        self.index = index
+        self.key = key  # from SdbMakeIndexKey
+        self.position = 0  # current record
+        self.tagid = TAGID_NULL  # last tag found
+
+
+def SdbFindFirstIndexedTag(pdb: SdbFile, find: FindInfo) -> int:
+    """The first tag whose index key equals ``find.key``, or ``TAGID_NULL``."""
+    keys, tagids = find.index.records(pdb)
+    position = bisect_left(keys, find.key)
+    find.position = position
+    if position < len(keys) and keys[position] == find.key:
+        find.tagid = tagids[position]
+    else:
+        find.tagid = TAGID_NULL
+    return find.tagid
+
+
+def SdbFindNextIndexedTag(pdb: SdbFile, find: FindInfo) -> int:
+    """The next tag whose index key equals ``find.key``, or ``TAGID_NULL``.
+
+    An index with ``SHIMDB_INDEX_UNIQUE_KEY`` has one record per key, pointing
+    at the first of the tags sharing it; the others are the tags right after
+    it, so those are visited instead of the next record.
+    """
+    if find.tagid == TAGID_NULL:
+        return TAGID_NULL
+    index = find.index
+    if index.flags & SHIMDB_INDEX_UNIQUE_KEY:
+        size = _sdbp_get_tag_size(pdb, find.tagid)
+        tagid = find.tagid + size if size else TAGID_NULL
+        if (
+            tagid != TAGID_NULL
+            and SdbGetTagFromTagID(pdb, tagid) == index.tag
+            and _tag_key(pdb, tagid, index) == find.key
+        ):
+            find.tagid = tagid
+        else:
+            find.tagid = TAGID_NULL
+        return find.tagid
+    keys, tagids = index.records(pdb)
+    find.position += 1
+    if find.position < len(keys) and keys[find.position] == find.key:
+        find.tagid = tagids[find.position]
+    else:
+        find.tagid = TAGID_NULL
+    return find.tagid
+
+
+def SdbFindIndexedTags(pdb: SdbFile, index: SdbIndex, value: KeyValue) -> Iterator[int]:
+    """Yield every tag of ``index`` whose key child equals ``value``."""
+    find = FindInfo(index, SdbMakeIndexKey(value, index.flags))
+    tagid = SdbFindFirstIndexedTag(pdb, find)
+    while tagid != TAGID_NULL:
+        if _key_matches(pdb, tagid, index.key, value):
+            yield tagid
+        tagid = SdbFindNextIndexedTag(pdb, find)
+
+
+def SdbScanForTags(pdb: SdbFile, tag: int, key: int, value: KeyValue) -> list[int]:
+    """Every ``tag`` whose ``key`` child equals ``value``, in document order.
+
+    The unindexed equivalent of :func:`SdbFindIndexedTags`: like
+    ``SdbFindFirstNamedTag`` it compares the children of the lists that indexes
+    cover, DATABASE and its LIBRARY.
+    """
+    found = []
+    database = SdbFindFirstTag(pdb, TAGID_ROOT, _TAG_DATABASE)
+    parents = [database] if database != TAGID_NULL else []
+    while parents:
+        parent = parents.pop()
+        child = SdbGetFirstChild(pdb, parent)
+        while child != TAGID_NULL:
+            child_tag = SdbGetTagFromTagID(pdb, child)
+            if child_tag == tag and _key_matches(pdb, child, key, value):
+                found.append(child)
+            elif child_tag == _TAG_LIBRARY and parent == database:
+                parents.append(child)
+            child = SdbGetNextChild(pdb, parent, child)
+    return sorted(found)
+
+
+def _read_int(pdb: SdbFile, tagid: int) -> int | None:
+    if tagid == TAGID_NULL:
+        return None
+    tag, _ = SdbpReadTagHeader(pdb, tagid)
+    num = _INT_TYPES.get(tag & TAG_TYPE_MASK)
+    if num is None:
+        return None
+    raw = SdbpReadData(pdb, tagid + _SIZEOF_TAG, num)
+    return None if raw is None else _UINT[num].unpack(raw)[0]
+
+
+def _key_value(pdb: SdbFile, tagid: int, key: int) -> KeyValue | None:
+    """The value of the ``key`` child of ``tagid``, or ``None``."""
+    child = SdbFindFirstTag(pdb, tagid, key)
+    if child == TAGID_NULL:
+        return None
+    ttype = key & TAG_TYPE_MASK
+    if ttype in (TAG_TYPE_STRING, TAG_TYPE_STRINGREF):
+        return SdbGetStringTagPtr(pdb, child)
+    if ttype == TAG_TYPE_BINARY:
+        try:
+            return SdbReadBinaryTag(pdb, child)
+        except ValueError:
+            return None
+    return _read_int(pdb, child)
+
+
+def _tag_key(pdb: SdbFile, tagid: int, index: SdbIndex) -> int | None:
+    value = _key_value(pdb, tagid, index.key)
+    return None if value is None else SdbMakeIndexKey(value, index.flags)
+
+
+def _key_matches(pdb: SdbFile, tagid: int, key: int, value: KeyValue) -> bool:
+    found = _key_value(pdb, tagid, key)
+    if found is None:
+        return False
+    if isinstance(found, str):
+        return isinstance(value, str) and _upcase(found) == _upcase(value)
+    if isinstance(found, bytes):
+        return isinstance(value, (bytes, bytearray, memoryview)) and found == value
+    return not isinstance(value, (str, bytes, bytearray, memoryview)) and (
+        found == int(value)
+    )
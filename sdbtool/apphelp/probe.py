@@ -0,0 +1,226 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     Read the header and database metadata without loading the file.
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+
+:func:`SdbOpenDatabase` reads (or maps) the whole file. To report what
+``sdbtool info`` shows, only the header, the top-level tags and the leading
+children of DATABASE are needed. :func:`SdbProbeDatabase` reads exactly those,
+seeking over everything else, and resolves the NAME STRINGREF by seeking into
+the STRINGTABLE. Reads go through a few aligned blocks, so a probe costs a
+handful of kilobytes however large the database is.
+
+The lookups follow ``SdbFindFirstTag`` / ``_resolve_metadata``, except that
+the metadata is only searched for among the leading children of DATABASE:
+those before its first LIST child (EXE, LIBRARY, ...), and at most
+:data:`MAX_LEADING_CHILDREN` of them. The compilers write the metadata first,
+so a probe reports the same values as a full open unless a database stores
+them after its lists; a missing tag (say RUNTIME_PLATFORM) then costs no more
+than a present one.
+"""
+
+from __future__ import annotations
+
+import os
+
+from .sdb_reader import (
+    TAG_NULL,
+    TAG_TYPE_LIST,
+    TAG_TYPE_MASK,
+    TAG_TYPE_STRINGREF,
+    TAGID_NULL,
+    TAGID_ROOT,
+    _FIXED_SIZES,
+    _SIZEOF_DWORD,
+    _SIZEOF_TAG,
+    _TAG_DATABASE,
+    _TAG_DATABASE_ID,
+    _TAG_NAME,
+    _TAG_STRINGTABLE,
+    _TAGID_ROOT,
+    _U16,
+    _U32,
+)
+
+_TAG_RUNTIME_PLATFORM = 0x4021
+_BLOCK_SIZE = 4096
+# Blocks kept by a _BlockReader; a tag header spans at most two.
+_MAX_BLOCKS = 4
+
+# The most DATABASE children searched for the metadata.
+MAX_LEADING_CHILDREN = 64
+
+
+class SdbProbe:
+    """The header and DATABASE metadata of an SDB file, as found by a probe."""
+
+    def __init__(self, major: int, minor: int, size: int):
+        self.major = major
+        self.minor = minor
+        self.size = size  # of the whole file
+        self.stringtable = TAGID_NULL
+        self.database_id: bytes | None = None  # 16 bytes (GUID, little endian)
+        self.database_name: str | None = None
+        self.runtime_platform: int | None = None  # RUNTIME_PLATFORM, if present
+        self.bytes_read = 0
+
+
+class _BlockReader:
+    """Random-access reads through a small cache of the last few aligned blocks."""
+
+    def __init__(self, fp, size: int):
+        self._fp = fp
+        self.size = size
+        self._blocks: dict[int, bytes] = {}
+        self.bytes_read = 0
+
+    def _block(self, index: int) -> bytes:
+        block = self._blocks.get(index)
+        if block is None:
+            self._fp.seek(index * _BLOCK_SIZE)
+            block = self._fp.read(_BLOCK_SIZE) or b""
+            self.bytes_read += len(block)
+            if len(self._blocks) >= _MAX_BLOCKS:
+                del self._blocks[next(iter(self._blocks))]  # the oldest
+            self._blocks[index] = block
+        return block
+
+    def read(self, offset: int, num: int) -> bytes | None:
+        """``num`` bytes at ``offset``, or ``None`` when out of bounds."""
+        end = offset + num
+        if offset < 0 or end <= offset or end > self.size:
+            return None
+        first, last = offset // _BLOCK_SIZE, (end - 1) // _BLOCK_SIZE
+        start = offset - first * _BLOCK_SIZE
+        if first == last:
+            return self._block(first)[start : start + num]
+        data = b"".join(self._block(i) for i in range(first, last + 1))
+        return data[start : start + num]
+
+    def header(self, tagid: int) -> tuple[int, int]:
+        """``(TAG, data size)`` at ``tagid``, as :func:`SdbpReadTagHeader`."""
+        if tagid < 0 or tagid + _SIZEOF_TAG > self.size:
+            return TAG_NULL, 0
+        raw = self.read(tagid, min(_SIZEOF_TAG + _SIZEOF_DWORD, self.size - tagid))
+        tag = _U16.unpack_from(raw)[0]
+        ttype = tag & TAG_TYPE_MASK
+        if ttype == TAG_NULL:
+            return tag, 0
+        if ttype <= TAG_TYPE_STRINGREF:
+            return tag, _FIXED_SIZES[(ttype >> 12) - 1]
+        return tag, _U32.unpack_from(raw, _SIZEOF_TAG)[0] if len(raw) == 6 else 0
+
+    def tag_size(self, tag: int, data_size: int) -> int:
+        """On-disk size of a tag, as ``_sdbp_get_tag_size``."""
+        ttype = tag & TAG_TYPE_MASK
+        if ttype == TAG_NULL:
+            return 0
+        size = (data_size + 1) & ~1
+        if ttype <= TAG_TYPE_STRINGREF:
+            return size + _SIZEOF_TAG
+        return size + _SIZEOF_TAG + _SIZEOF_DWORD
+
+    def find_first(
+        self, parent: int, tags: set[int], leading: bool = False
+    ) -> dict[int, int]:
+        """The first child of ``parent`` with each TAG in ``tags``.
+
+        One pass of the ``SdbGetFirstChild`` / ``SdbGetNextChild`` loop of
+        ``SdbFindFirstTag``, stopping as soon as every TAG has been seen. With
+        ``leading`` it also stops at the first LIST child, or after
+        :data:`MAX_LEADING_CHILDREN` children.
+        """
+        found: dict[int, int] = {}
+        budget = MAX_LEADING_CHILDREN if leading else -1
+        if parent == TAGID_ROOT:
+            if self.size <= _TAGID_ROOT:
+                return found
+            child, end = _TAGID_ROOT, self.size
+        else:
+            tag, data_size = self.header(parent)
+            if (tag & TAG_TYPE_MASK) != TAG_TYPE_LIST or data_size == 0:
+                return found
+            child = parent + _SIZEOF_TAG + _SIZEOF_DWORD
+            end = min(self.size, parent + self.tag_size(tag, data_size))
+        while True:
+            tag, data_size = self.header(child)
+            if leading and ((tag & TAG_TYPE_MASK) == TAG_TYPE_LIST or budget == 0):
+                return found
+            budget -= 1
+            if tag in tags and tag not in found:
+                found[tag] = child
+                if len(found) == len(tags):
+                    return found
+            child_size = self.tag_size(tag, data_size)
+            if child_size == 0 or child + child_size >= end:
+                return found
+            child += child_size
+
+    def dword(self, offset: int) -> int | None:
+        raw = self.read(offset, _SIZEOF_DWORD)
+        return None if raw is None else _U32.unpack_from(raw)[0]
+
+
+def _string_ref(reader: _BlockReader, stringtable: int, tagid: int) -> str | None:
+    """Resolve the STRINGREF at ``tagid``, as :func:`SdbGetStringTagPtr`."""
+    if stringtable == TAGID_NULL:
+        return None
+    stored = reader.dword(tagid + _SIZEOF_TAG)
+    if stored is None:
+        return None
+    offset = stringtable + stored + _SIZEOF_TAG + _SIZEOF_DWORD
+    size = reader.dword(offset - _SIZEOF_DWORD)
+    raw = None if size is None else reader.read(offset, size)
+    if raw is None:
+        return None
+    try:
+        return raw.decode("utf-16-le").rstrip("\x00")
+    except UnicodeDecodeError:
+        return None
+
+
+def SdbProbeDatabase(path: str) -> SdbProbe | None:
+    """Read the header and DATABASE metadata of ``path``. ``None`` on failure.
+
+    Accepts and rejects exactly the files :func:`SdbOpenDatabase` does.
+    """
+    try:
+        # Unbuffered: every read is exactly one block, nothing is read ahead.
+        with open(path, "rb", buffering=0) as fp:
+            size = os.fstat(fp.fileno()).st_size
+            reader = _BlockReader(fp, size)
+            header = reader.read(0, _TAGID_ROOT)
+            if header is None or header[8:12] != b"sdbf":
+                return None
+            major = int.from_bytes(header[0:4], "little")
+            minor = int.from_bytes(header[4:8], "little")
+            if major not in (2, 3):
+                return None
+
+            probe = SdbProbe(major, minor, size)
+            top = reader.find_first(TAGID_ROOT, {_TAG_STRINGTABLE, _TAG_DATABASE})
+            probe.stringtable = top.get(_TAG_STRINGTABLE, TAGID_NULL)
+            database = top.get(_TAG_DATABASE, TAGID_NULL)
+            if database != TAGID_NULL:
+                wanted = {_TAG_DATABASE_ID, _TAG_NAME, _TAG_RUNTIME_PLATFORM}
+                children = reader.find_first(database, wanted, leading=True)
+                if _TAG_DATABASE_ID in children:
+                    tagid = children[_TAG_DATABASE_ID]
+                    if reader.header(tagid)[1] == 16:
+                        probe.database_id = reader.read(tagid + 6, 16)
+                if _TAG_NAME in children:
+                    tagid = children[_TAG_NAME]
+                    # SdbGetStringTagPtr needs room for the TAG and the offset.
+                    if reader.read(tagid, 6) is not None:
+                        probe.database_name = _string_ref(
+                            reader, probe.stringtable, tagid
+                        )
+                if _TAG_RUNTIME_PLATFORM in children:
+                    probe.runtime_platform = reader.dword(
+                        children[_TAG_RUNTIME_PLATFORM] + _SIZEOF_TAG
+                    )
+            probe.bytes_read = reader.bytes_read
+            return probe
+    except OSError:
+        return None
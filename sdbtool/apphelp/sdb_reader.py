@@ -11,6 +11,17 @@ apphelp.dll. The function names and semantics mirror the original Win32 API.
 
 from __future__ import annotations
 
+import mmap
+import struct
+import sys
+from collections import OrderedDict
+from itertools import repeat
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .indexes import SdbIndex
+    from .tag_index import TagIndex
+
 # Tag type nibble (high 4 bits of a TAG)
 TAG_TYPE_MASK = 0xF000
 TAG_TYPE_NULL = 0x1000
@@ -41,21 +52,117 @@ _TAG_DATABASE_ID = 0x9007
 _FIXED_SIZES = (0, 1, 2, 4, 8, 4)  # NULL, BYTE, WORD, DWORD, QWORD, STRINGREF
 
 
+# Precompiled decoders. A tag header (the TAG word) is decoded together with
+# the value or size dword that follows it, in a single unpack_from call.
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_UINT = {1: struct.Struct("<B"), 2: _U16, 4: _U32, 8: struct.Struct("<Q")}
+_TAG_BYTE = struct.Struct("<HB")
+_TAG_WORD = struct.Struct("<HH")
+_TAG_DWORD = struct.Struct("<HI")  # also: TAG + size of a variable-sized tag
+_TAG_QWORD = struct.Struct("<HQ")
+
+
+# Default number of decoded strings kept per database by StringCache.
+DEFAULT_STRING_CACHE_SIZE = 4096
+
+_MISSING = object()
+
+
+class StringCache:
+    """Decoded string-table strings, keyed by their offset in the STRINGTABLE.
+
+    Large databases reference the same vendor / module / shim names from
+    thousands of STRINGREF tags, so the decoded (and interned) string is kept
+    instead of decoding it again on every reference. The cache holds at most
+    ``maxsize`` strings, evicting the least recently used one (``0`` disables
+    it), unless it is ``eager``: then :func:`SdbLoadStringTable` has decoded the
+    whole table up front and nothing is evicted. ``hits`` / ``misses`` count
+    lookups.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_STRING_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.eager = False
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[int, str | None] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, offset: int):
+        """The cached string at ``offset`` (``None`` if it failed to decode).
+
+        Returns a private sentinel on a miss.
+        """
+        try:
+            value = self._entries[offset]
+        except KeyError:
+            self.misses += 1
+            return _MISSING
+        self.hits += 1
+        if not self.eager:
+            self._entries.move_to_end(offset)
+        return value
+
+    def store(self, offset: int, value: str | None) -> None:
+        if self.eager:
+            self._entries[offset] = value
+        elif self.maxsize > 0:
+            self._entries[offset] = value
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.eager = False
+
+
 class SdbFile:
     """An opened shim database, holding the raw bytes and cached metadata.
 
     Instances are returned by :func:`SdbOpenDatabase` and act as the opaque
     handle (``PDB``) that the rest of the reading API operates on.
+
+    ``data`` is either the file contents or a read-only ``mmap`` of the file;
+    both slice to ``bytes``, so the reading functions work on either. ``view``
+    is a ``memoryview`` over it, used to decode values without copying.
     """
 
-    def __init__(self, data: bytes, major: int, minor: int):
+    def __init__(self, data: bytes | mmap.mmap, major: int, minor: int):
         self.data = data
+        self.view = memoryview(data)
         self.size = len(data)
         self.major = major
         self.minor = minor
         self.stringtable: int = TAGID_NULL
         self.database_id: bytes | None = None
         self.database_name: str | None = None
+        # Optional flat tag index, see tag_index.SdbBuildTagIndex.
+        self.index: TagIndex | None = None
+        # The INDEXES section by (tag, key tag), see indexes.SdbLoadIndexes.
+        self.indexes: dict[tuple[int, int], SdbIndex] | None = None
+        self.strings = StringCache()
+
+    @property
+    def is_mapped(self) -> bool:
+        """Whether the database is backed by a memory mapping of the file."""
+        return isinstance(self.data, mmap.mmap)
+
+    def close(self) -> None:
+        """Release the file mapping (if any). The handle is unusable afterwards."""
+        data = self.data
+        # The view must be released before the mapping can be closed.
+        self.view.release()
+        self.data = b""
+        self.view = memoryview(self.data)
+        self.size = 0
+        self.index = None
+        self.indexes = None
+        self.strings.clear()
+        if isinstance(data, mmap.mmap):
+            data.close()
 
 
 def SdbpReadData(pdb: SdbFile, offset: int, num: int) -> bytes | None:
@@ -70,30 +177,57 @@ def SdbpReadData(pdb: SdbFile, offset: int, num: int) -> bytes | None:
 
 
 def _read_uint(pdb: SdbFile, offset: int, num: int) -> int | None:
-    raw = SdbpReadData(pdb, offset, num)
-    if raw is None:
+    if offset < 0 or offset + num > pdb.size:
+        return None
+    return _UINT[num].unpack_from(pdb.view, offset)[0]
+
+
+def _read_typed(pdb: SdbFile, tagid: int, ttype: int, decoder: struct.Struct):
+    """Decode the TAG at ``tagid`` and the value following it in one call.
+
+    Returns ``None`` when the tag is not of type ``ttype`` or the value is
+    truncated (a TAG_NULL tag never matches, as ``ttype`` is non-zero).
+    """
+    if tagid < 0 or tagid + decoder.size > pdb.size:
+        return None
+    tag, value = decoder.unpack_from(pdb.view, tagid)
+    if (tag & TAG_TYPE_MASK) != ttype:
         return None
-    return int.from_bytes(raw, "little")
+    return value
+
+
+def SdbpReadTagHeader(pdb: SdbFile, tagid: int) -> tuple[int, int]:
+    """Return ``(TAG, data size)`` for the tag at ``tagid``.
+
+    The TAG is :data:`TAG_NULL` when ``tagid`` is out of bounds; the data size
+    follows :func:`SdbGetTagDataSize`.
+    """
+    size = pdb.size
+    if tagid < 0 or tagid + _SIZEOF_TAG > size:
+        return TAG_NULL, 0
+    if tagid + _TAG_DWORD.size <= size:
+        tag, dword = _TAG_DWORD.unpack_from(pdb.view, tagid)
+    else:
+        tag, dword = _U16.unpack_from(pdb.view, tagid)[0], 0
+    ttype = tag & TAG_TYPE_MASK
+    if ttype == TAG_NULL:
+        return tag, 0
+    if ttype <= TAG_TYPE_STRINGREF:
+        return tag, _FIXED_SIZES[(ttype >> 12) - 1]
+    # Dynamically-sized tag (list / string / binary): the size follows the tag.
+    return tag, dword
 
 
 def SdbGetTagFromTagID(pdb: SdbFile, tagid: int) -> int:
     """Return the TAG stored at ``tagid``, or :data:`TAG_NULL` on failure."""
-    value = _read_uint(pdb, tagid, _SIZEOF_TAG)
-    return TAG_NULL if value is None else value
+    if tagid < 0 or tagid + _SIZEOF_TAG > pdb.size:
+        return TAG_NULL
+    return _U16.unpack_from(pdb.view, tagid)[0]
 
 
 def SdbGetTagDataSize(pdb: SdbFile, tagid: int) -> int:
     """Return the size in bytes of the data stored at ``tagid``."""
-    ttype = SdbGetTagFromTagID(pdb, tagid) & TAG_TYPE_MASK
-    if ttype == TAG_NULL:
-        return 0
-
-    if ttype <= TAG_TYPE_STRINGREF:
-        return _FIXED_SIZES[(ttype >> 12) - 1]
-
-    # Dynamically-sized tag (list / string / binary): the size follows the tag.
-    size = _read_uint(pdb, tagid + _SIZEOF_TAG, _SIZEOF_DWORD)
-    return 0 if size is None else size
+    return SdbpReadTagHeader(pdb, tagid)[1]
 
 
 def _sdbp_get_tag_size(pdb: SdbFile, tagid: int) -> int:
@@ -103,11 +237,12 @@ def _sdbp_get_tag_size(pdb: SdbFile, tagid: int) -> int:
     occupies a 2-byte data slot (the trailing pad byte is uninitialized). This
     rounding is required to correctly walk databases written by apphelp.
     """
-    ttype = SdbGetTagFromTagID(pdb, tagid) & TAG_TYPE_MASK
+    tag, data_size = SdbpReadTagHeader(pdb, tagid)
+    ttype = tag & TAG_TYPE_MASK
     if ttype == TAG_NULL:
         return 0
 
-    size = (SdbGetTagDataSize(pdb, tagid) + 1) & ~1
+    size = (data_size + 1) & ~1
     if ttype <= TAG_TYPE_STRINGREF:
         return size + _SIZEOF_TAG
     return size + _SIZEOF_TAG + _SIZEOF_DWORD
@@ -122,12 +257,13 @@ def SdbGetFirstChild(pdb: SdbFile, parent: int) -> int:
         return _TAGID_ROOT
 
     # Only list tags can have children.
-    if (SdbGetTagFromTagID(pdb, parent) & TAG_TYPE_MASK) != TAG_TYPE_LIST:
+    tag, data_size = SdbpReadTagHeader(pdb, parent)
+    if (tag & TAG_TYPE_MASK) != TAG_TYPE_LIST:
         return TAGID_NULL
 
     # An empty list has no children. (Native Windows apphelp.dll returns NULL
     # here; ReactOS' sdbread.c omits this check and relies on the caller.)
-    if SdbGetTagDataSize(pdb, parent) == 0:
+    if data_size == 0:
         return TAGID_NULL
 
     return parent + _SIZEOF_TAG + _SIZEOF_DWORD
@@ -175,35 +311,79 @@ def _check_type(pdb: SdbFile, tagid: int, ttype: int) -> bool:
 
 
 def SdbReadBYTETag(pdb: SdbFile, tagid: int, default: int = 0) -> int:
-    if _check_type(pdb, tagid, TAG_TYPE_BYTE):
-        value = _read_uint(pdb, tagid + _SIZEOF_TAG, 1)
-        if value is not None:
-            return value
-    return default
+    value = _read_typed(pdb, tagid, TAG_TYPE_BYTE, _TAG_BYTE)
+    return default if value is None else value
 
 
 def SdbReadWORDTag(pdb: SdbFile, tagid: int, default: int = 0) -> int:
-    if _check_type(pdb, tagid, TAG_TYPE_WORD):
-        value = _read_uint(pdb, tagid + _SIZEOF_TAG, 2)
-        if value is not None:
-            return value
-    return default
+    value = _read_typed(pdb, tagid, TAG_TYPE_WORD, _TAG_WORD)
+    return default if value is None else value
 
 
 def SdbReadDWORDTag(pdb: SdbFile, tagid: int, default: int = 0) -> int:
-    if _check_type(pdb, tagid, TAG_TYPE_DWORD):
-        value = _read_uint(pdb, tagid + _SIZEOF_TAG, 4)
-        if value is not None:
-            return value
-    return default
+    value = _read_typed(pdb, tagid, TAG_TYPE_DWORD, _TAG_DWORD)
+    return default if value is None else value
 
 
 def SdbReadQWORDTag(pdb: SdbFile, tagid: int, default: int = 0) -> int:
-    if _check_type(pdb, tagid, TAG_TYPE_QWORD):
-        value = _read_uint(pdb, tagid + _SIZEOF_TAG, 8)
-        if value is not None:
-            return value
-    return default
+    value = _read_typed(pdb, tagid, TAG_TYPE_QWORD, _TAG_QWORD)
+    return default if value is None else value
+
+
+def _unpack_many(pdb: SdbFile, tagids, decoder: struct.Struct, missing: tuple):
+    """``decoder.unpack_from`` at every tagid, or ``missing`` where it does not fit.
+
+    When every tagid is in range (the usual case) the whole run is decoded by a
+    single ``map``, without a Python-level step per tag.
+    """
+    if not isinstance(tagids, (list, tuple)):
+        tagids = list(tagids)
+    view, limit = pdb.view, pdb.size - decoder.size
+    if not tagids or (min(tagids) >= 0 and max(tagids) <= limit):
+        return map(decoder.unpack_from, repeat(view), tagids)
+    return (
+        decoder.unpack_from(view, tagid) if 0 <= tagid <= limit else missing
+        for tagid in tagids
+    )
+
+
+def _read_typed_many(
+    pdb: SdbFile, tagids, ttype: int, decoder: struct.Struct, default: int
+) -> list[int]:
+    return [
+        value if (tag & TAG_TYPE_MASK) == ttype else default
+        for tag, value in _unpack_many(pdb, tagids, decoder, (TAG_NULL, default))
+    ]
+
+
+def SdbGetTagsFromTagIDs(pdb: SdbFile, tagids) -> list[int]:
+    """Bulk :func:`SdbGetTagFromTagID`: the TAG of every tag in ``tagids``."""
+    return [tag for (tag,) in _unpack_many(pdb, tagids, _U16, (TAG_NULL,))]
+
+
+def SdbReadBYTETags(pdb: SdbFile, tagids, default: int = 0) -> list[int]:
+    """Bulk :func:`SdbReadBYTETag`: the value of every tag in ``tagids``."""
+    return _read_typed_many(pdb, tagids, TAG_TYPE_BYTE, _TAG_BYTE, default)
+
+
+def SdbReadWORDTags(pdb: SdbFile, tagids, default: int = 0) -> list[int]:
+    """Bulk :func:`SdbReadWORDTag`: the value of every tag in ``tagids``."""
+    return _read_typed_many(pdb, tagids, TAG_TYPE_WORD, _TAG_WORD, default)
+
+
+def SdbReadDWORDTags(pdb: SdbFile, tagids, default: int = 0) -> list[int]:
+    """Bulk :func:`SdbReadDWORDTag`: the value of every tag in ``tagids``."""
+    return _read_typed_many(pdb, tagids, TAG_TYPE_DWORD, _TAG_DWORD, default)
+
+
+def SdbReadQWORDTags(pdb: SdbFile, tagids, default: int = 0) -> list[int]:
+    """Bulk :func:`SdbReadQWORDTag`: the value of every tag in ``tagids``."""
+    return _read_typed_many(pdb, tagids, TAG_TYPE_QWORD, _TAG_QWORD, default)
+
+
+def SdbpReadTagHeaders(pdb: SdbFile, tagids) -> list[tuple[int, int]]:
+    """Bulk :func:`SdbpReadTagHeader`: ``(TAG, data size)`` for every tag in ``tagids``."""
+    return [SdbpReadTagHeader(pdb, tagid) for tagid in tagids]
 
 
 def SdbReadBinaryTag(pdb: SdbFile, tagid: int) -> bytes:
@@ -221,11 +401,40 @@ def SdbReadBinaryTag(pdb: SdbFile, tagid: int) -> bytes:
     return raw
 
 
+def _decode_string(pdb: SdbFile, offset: int, size: int) -> str | None:
+    """Decode the UTF-16 string of ``size`` bytes at ``offset``."""
+    end = offset + size
+    if end <= offset or end > pdb.size:
+        return None
+    try:
+        return str(pdb.view[offset:end], "utf-16-le").rstrip("\x00")
+    except UnicodeDecodeError:
+        # Corrupt / malformed string data: treat as a read failure.
+        return None
+
+
+def _string_table_entry(pdb: SdbFile, stored: int) -> str | None:
+    """Decode (through the cache) the string table entry at table offset ``stored``."""
+    cache = pdb.strings
+    value = cache.lookup(stored)
+    if value is not _MISSING:
+        return value
+    offset = pdb.stringtable + stored + _SIZEOF_TAG + _SIZEOF_DWORD
+    # The byte size (including the terminating NUL) precedes the string data.
+    size = _read_uint(pdb, offset - _SIZEOF_DWORD, _SIZEOF_DWORD)
+    value = None if size is None else _decode_string(pdb, offset, size)
+    if value is not None:
+        value = sys.intern(value)
+    cache.store(stored, value)
+    return value
+
+
 def SdbGetStringTagPtr(pdb: SdbFile, tagid: int) -> str | None:
     """Return the string for a STRING / STRINGREF tag, or ``None`` on failure."""
-    tag = SdbGetTagFromTagID(pdb, tagid)
-    if tag == TAG_NULL:
+    if tagid < 0 or tagid + _TAG_DWORD.size > pdb.size:
+        # Too short for a TAG plus its size / string-table offset.
         return None
+    tag, value = _TAG_DWORD.unpack_from(pdb.view, tagid)
 
     ttype = tag & TAG_TYPE_MASK
     if ttype == TAG_TYPE_STRINGREF:
@@ -233,27 +442,44 @@ def SdbGetStringTagPtr(pdb: SdbFile, tagid: int) -> str | None:
         if pdb.stringtable == TAGID_NULL:
             return None
         # A STRINGREF stores the offset of the string relative to the table.
-        stored = _read_uint(pdb, tagid + _SIZEOF_TAG, _SIZEOF_DWORD)
-        if stored is None:
-            return None
-        offset = pdb.stringtable + stored + _SIZEOF_TAG + _SIZEOF_DWORD
-    elif ttype == TAG_TYPE_STRING:
-        offset = tagid + _SIZEOF_TAG + _SIZEOF_DWORD
-    else:
-        return None
+        return _string_table_entry(pdb, value)
+    if ttype == TAG_TYPE_STRING:
+        return _decode_string(pdb, tagid + _SIZEOF_TAG + _SIZEOF_DWORD, value)
+    return None
+
+
+def SdbSetStringCache(pdb: SdbFile, maxsize: int, eager: bool = False) -> None:
+    """Replace the string cache of ``pdb`` by one holding ``maxsize`` strings.
+
+    ``maxsize=0`` disables caching; ``eager`` decodes the whole string table
+    right away (see :func:`SdbLoadStringTable`), ignoring ``maxsize``.
+    """
+    pdb.strings = StringCache(maxsize)
+    if eager:
+        SdbLoadStringTable(pdb)
 
-    # The byte size (including the terminating NUL) precedes the string data.
-    size = _read_uint(pdb, offset - _SIZEOF_DWORD, _SIZEOF_DWORD)
-    if size is None:
-        return None
-    raw = SdbpReadData(pdb, offset, size)
-    if raw is None:
-        return None
-    try:
-        return raw.decode("utf-16-le").rstrip("\x00")
-    except UnicodeDecodeError:
-        # Corrupt / malformed string data: treat as a read failure.
-        return None
+
+def SdbLoadStringTable(pdb: SdbFile) -> int:
+    """Decode every STRINGTABLE entry of ``pdb`` into its string cache at once.
+
+    Afterwards the cache is eager: it keeps every entry and never evicts.
+    Returns the number of entries decoded.
+    """
+    cache = pdb.strings
+    cache.eager = True
+    table = pdb.stringtable
+    if table == TAGID_NULL:
+        return 0
+    count = 0
+    item = SdbGetFirstChild(pdb, table)
+    while item != TAGID_NULL:
+        tag, size = SdbpReadTagHeader(pdb, item)
+        if (tag & TAG_TYPE_MASK) == TAG_TYPE_STRING:
+            value = _decode_string(pdb, item + _SIZEOF_TAG + _SIZEOF_DWORD, size)
+            cache.store(item - table, None if value is None else sys.intern(value))
+            count += 1
+        item = SdbGetNextChild(pdb, table, item)
+    return count
 
 
 def _resolve_metadata(pdb: SdbFile) -> None:
@@ -275,22 +501,46 @@ def _resolve_metadata(pdb: SdbFile) -> None:
             pdb.database_name = SdbGetStringTagPtr(pdb, name_tag)
 
 
-def SdbOpenDatabase(path: str) -> SdbFile | None:
-    """Open and validate a shim database file. Returns ``None`` on failure."""
+def _map_file(fp) -> mmap.mmap | bytes:
+    """Map ``fp`` read-only. An empty file cannot be mapped; return no data."""
+    try:
+        return mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:
+        return b""
+
+
+def SdbOpenDatabase(path: str, use_mmap: bool = False) -> SdbFile | None:
+    """Open and validate a shim database file. Returns ``None`` on failure.
+
+    With ``use_mmap`` the file is mapped instead of read: opening is O(1),
+    pages are only faulted in as they are touched, and processes opening the
+    same database share the page cache. The mapping is released by
+    :func:`SdbCloseDatabase`.
+    """
     try:
         with open(path, "rb") as fp:
-            data = fp.read()
+            data = _map_file(fp) if use_mmap else fp.read()
     except OSError:
         return None
 
     if len(data) < 12 or data[8:12] != b"sdbf":
+        if isinstance(data, mmap.mmap):
+            data.close()
         return None
 
     major = int.from_bytes(data[0:4], "little")
     minor = int.from_bytes(data[4:8], "little")
     if major not in (2, 3):
+        if isinstance(data, mmap.mmap):
+            data.close()
         return None
 
     pdb = SdbFile(data, major, minor)
     _resolve_metadata(pdb)
     return pdb
+
+
+def SdbCloseDatabase(pdb: SdbFile | None) -> None:
+    """Close a database opened with :func:`SdbOpenDatabase`."""
+    if pdb is not None:
+        pdb.close()
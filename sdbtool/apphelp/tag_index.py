@@ -0,0 +1,235 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     Flat, one-pass index of every tag in an SDB file.
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+
+Walking children with :func:`~sdbtool.apphelp.sdb_reader.SdbGetNextChild`
+re-reads and re-sizes both the previous child and the parent on every step.
+:class:`TagIndex` instead records the whole tree in a single linear scan, as a
+struct-of-arrays: one compact ``array`` column per field, one row per tag (row 0
+is the virtual root). Tags always start at even offsets, so one more column,
+indexed by ``tagid // 2``, maps a tagid to its row. Tree navigation is then a
+couple of array reads.
+
+The scan follows the exact child-iteration rules of ``SdbGetFirstChild`` /
+``SdbGetNextChild``, so the indexed tree is identical to the one the reader
+API walks, including for malformed databases.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterator
+
+from .sdb_reader import (
+    SdbFile,
+    TAG_NULL,
+    TAG_TYPE_LIST,
+    TAG_TYPE_MASK,
+    TAG_TYPE_STRINGREF,
+    TAGID_NULL,
+    TAGID_ROOT,
+    _FIXED_SIZES,
+    _SIZEOF_DWORD,
+    _SIZEOF_TAG,
+    _TAGID_ROOT,
+    _U16,
+    _U32,
+)
+
+# Row 0 always holds the virtual root, so row 0 doubles as "no row" in the
+# first_children / next_siblings columns (the root is never a child or sibling).
+_ROOT_ROW = 0
+_NO_ROW = 0
+
+
+class TagIndex:
+    """Struct-of-arrays index over every tag of an :class:`SdbFile`.
+
+    Build it with :func:`SdbBuildTagIndex`. All lookups take and return tagids;
+    asking about a tagid that is not the start of a tag raises ``ValueError``.
+    """
+
+    def __init__(self):
+        self.tagids = array("I")  # offset of the tag in the file
+        self.tags = array("H")  # TAG number
+        self.parents = array("I")  # row of the parent
+        self.next_siblings = array("I")  # row of the next sibling, or _NO_ROW
+        self.first_children = array("I")  # row of the first child, or _NO_ROW
+        self.data_offsets = array("I")  # offset of the tag's data
+        self.data_sizes = array("I")  # size of the tag's data (unpadded)
+        self.depths = array("I")  # 0 for the root, 1 for top-level tags
+        # Row of the tag at tagid 2 * i, or _NO_ROW; sized by SdbBuildTagIndex.
+        self._rows = array("I")
+        self._contents: dict[int, frozenset[int]] | None = None
+
+    def __len__(self) -> int:
+        """Number of tags, excluding the virtual root."""
+        return len(self.tagids) - 1
+
+    def __contains__(self, tagid: int) -> bool:
+        try:
+            self.row(tagid)
+        except ValueError:
+            return False
+        return True
+
+    def row(self, tagid: int) -> int:
+        """The row holding ``tagid``.
+
+        Lists whose size overruns their parent make the reader visit some tags
+        twice, under different parents; those map to the first row.
+        """
+        slot, odd = divmod(tagid, 2)
+        if not odd and slot < len(self._rows):
+            row = self._rows[slot]
+            if row != _NO_ROW or tagid == TAGID_ROOT:
+                return row
+        raise ValueError(f"0x{tagid:x} is not a tag in this database")
+
+    def get_tag(self, tagid: int) -> int:
+        """TAG number stored at ``tagid``."""
+        return self.tags[self.row(tagid)]
+
+    def first_child(self, tagid: int) -> int:
+        """First child of ``tagid``, or :data:`TAGID_NULL`."""
+        row = self.first_children[self.row(tagid)]
+        return self.tagids[row] if row != _NO_ROW else TAGID_NULL
+
+    def next_sibling(self, tagid: int) -> int:
+        """Next sibling of ``tagid``, or :data:`TAGID_NULL`."""
+        row = self.next_siblings[self.row(tagid)]
+        return self.tagids[row] if row != _NO_ROW else TAGID_NULL
+
+    def parent(self, tagid: int) -> int:
+        """Parent of ``tagid`` (:data:`TAGID_ROOT` for top-level tags and the root)."""
+        return self.tagids[self.parents[self.row(tagid)]]
+
+    def depth(self, tagid: int) -> int:
+        """Nesting depth of ``tagid``: 0 for the root, 1 for top-level tags."""
+        return self.depths[self.row(tagid)]
+
+    def children(self, tagid: int) -> Iterator[int]:
+        """The tagids of the children of ``tagid``, in file order."""
+        row = self.first_children[self.row(tagid)]
+        while row != _NO_ROW:
+            yield self.tagids[row]
+            row = self.next_siblings[row]
+
+    def contents(self) -> dict[int, frozenset[int]]:
+        """Per TAG number of a list: the TAG numbers found anywhere below such lists.
+
+        Top-level tags are below :data:`TAG_NULL` (the root). Computed once, from
+        the parent / child TAG pairs that occur, so it may include a tag that no
+        single list of that number holds, but never misses one.
+        """
+        if self._contents is None:
+            tags = self.tags
+            parent_tags = map(tags.__getitem__, self.parents[1:])
+            direct: dict[int, set[int]] = {}
+            for parent_tag, tag in set(zip(parent_tags, tags[1:])):
+                direct.setdefault(parent_tag, set()).add(tag)
+            contents = {}
+            for list_tag, children in direct.items():
+                found = set(children)
+                pending = [t for t in children if t in direct]
+                while pending:
+                    for tag in direct[pending.pop()]:
+                        if tag not in found:
+                            found.add(tag)
+                            if tag in direct:
+                                pending.append(tag)
+                contents[list_tag] = frozenset(found)
+            self._contents = contents
+        return self._contents
+
+    def path(self, tagid: int) -> list[int]:
+        """The tagids from the top-level ancestor down to ``tagid`` itself.
+
+        The root's path is empty.
+        """
+        row = self.row(tagid)
+        rows = []
+        while row != _ROOT_ROW:
+            rows.append(row)
+            row = self.parents[row]
+        return [self.tagids[r] for r in reversed(rows)]
+
+
+def _append(index: TagIndex, tagid: int, tag: int, parent: int, depth: int) -> int:
+    row = len(index.tagids)
+    index.tagids.append(tagid)
+    index.tags.append(tag)
+    index.parents.append(parent)
+    index.next_siblings.append(_NO_ROW)
+    index.first_children.append(_NO_ROW)
+    index.data_offsets.append(0)
+    index.data_sizes.append(0)
+    index.depths.append(depth)
+    if index._rows[tagid >> 1] == _NO_ROW:
+        index._rows[tagid >> 1] = row
+    return row
+
+
+def SdbBuildTagIndex(pdb: SdbFile) -> TagIndex:
+    """Scan ``pdb`` once and return (and cache as ``pdb.index``) its :class:`TagIndex`."""
+    view = pdb.view
+    size = pdb.size
+    index = TagIndex()
+    # Every tagid is even and at most ``size``.
+    index._rows = array("I", [_NO_ROW]) * (size // 2 + 1)
+    _append(index, TAGID_ROOT, TAG_NULL, _ROOT_ROW, 0)
+
+    if size > _TAGID_ROOT:
+        # One frame per open list: (row, end of its children, tagid, on-disk size).
+        stack: list[tuple[int, int, int, int]] = []
+        parent, end, depth = _ROOT_ROW, size, 1
+        tagid, prev = _TAGID_ROOT, _NO_ROW
+        while True:
+            tag = _U16.unpack_from(view, tagid)[0] if tagid + 2 <= size else TAG_NULL
+            row = _append(index, tagid, tag, parent, depth)
+            if prev != _NO_ROW:
+                index.next_siblings[prev] = row
+            else:
+                index.first_children[parent] = row
+
+            # Same sizing rules as SdbGetTagDataSize / _sdbp_get_tag_size.
+            ttype = tag & TAG_TYPE_MASK
+            if ttype == TAG_NULL:
+                data_size = tag_size = 0
+            elif ttype <= TAG_TYPE_STRINGREF:
+                data_size = _FIXED_SIZES[(ttype >> 12) - 1]
+                tag_size = ((data_size + 1) & ~1) + _SIZEOF_TAG
+            else:
+                pos = tagid + _SIZEOF_TAG
+                data_size = _U32.unpack_from(view, pos)[0] if pos + 4 <= size else 0
+                tag_size = ((data_size + 1) & ~1) + _SIZEOF_TAG + _SIZEOF_DWORD
+            index.data_offsets[row] = tagid + (
+                _SIZEOF_TAG
+                if ttype <= TAG_TYPE_STRINGREF
+                else _SIZEOF_TAG + _SIZEOF_DWORD
+            )
+            index.data_sizes[row] = data_size
+
+            if ttype == TAG_TYPE_LIST and data_size != 0:
+                # Descend: the first child directly follows the list header.
+                stack.append((row, end, tagid, tag_size))
+                parent, end, depth = row, min(size, tagid + tag_size), depth + 1
+                tagid, prev = tagid + _SIZEOF_TAG + _SIZEOF_DWORD, _NO_ROW
+                continue
+
+            # Advance to the next sibling, closing every list that ran out.
+            while tag_size == 0 or tagid + tag_size >= end:
+                if not stack:
+                    return _finish(pdb, index)
+                row, end, tagid, tag_size = stack.pop()
+                parent, depth = index.parents[row], depth - 1
+            tagid, prev = tagid + tag_size, row
+
+    return _finish(pdb, index)
+
+
+def _finish(pdb: SdbFile, index: TagIndex) -> TagIndex:
+    pdb.index = index
+    return index
@@ -12,50 +12,159 @@ dependency on apphelp at runtime.
 Tag names change meaning between Windows versions (e.g. ``0x4022`` is ``OS_SKU`` on
 XP but unused on Win11; ``0x4023`` was ``OS_PLATFORM`` and is now
 ``GUEST_TARGET_PLATFORM``), so resolution is parameterised by a target OS.
+
+Nothing is loaded at import time. The version list and deltas are read on first
+use (``KNOWN_VERSIONS`` / ``DEFAULT_VERSION`` are resolved lazily through the
+module ``__getattr__``), and a version's table is only built when a name is
+resolved for it. The parsed document is kept as ``tags.cache`` in the user
+cache directory (a ``marshal`` dump keyed by a CRC of ``tags.json``, see
+:mod:`sdbtool.apphelp.cache`), so later processes skip the JSON parse; the
+cache is best-effort, and off when ``SDBTOOL_CACHE_DIR`` is set but empty.
 """
 
 from __future__ import annotations
 
-import json
-from importlib.resources import files
+import os
+import zlib
 
+from ..cache import cache_path, read_cache, write_cache
 from .well_known import WellKnownTags
 
 __all__ = [
     "WellKnownTags",
     "tag_id_to_string",
+    "tag_ids_for_name",
+    "tag_ids_for_output_name",
     "KNOWN_VERSIONS",
     "DEFAULT_VERSION",
 ]
 
+_SOURCE_FILE = os.path.join(os.path.dirname(__file__), "tags.json")
+# None (caching disabled) to neither read nor write the cache.
+_CACHE_FILE: str | None = cache_path("tags.cache")
+_CACHE_FORMAT = 1
 
-def _load() -> tuple[dict[str, dict[int, str]], list[str]]:
-    """Reconstruct the full per-version tables from the base + delta document."""
-    doc = json.loads(
-        files(__package__).joinpath("tags.json").read_text(encoding="utf-8")
-    )
-    base = {int(k, 16): v for k, v in doc["base"].items()}
+# Filled in by _load(): versions oldest -> newest, the base table, and per
+# version the (added / overridden names, removed tags) delta against it.
+_VERSIONS: list[str] | None = None
+_BASE: dict[int, str] = {}
+_DELTAS: dict[str, tuple[dict[int, str], tuple[int, ...]]] = {}
+# Built on demand, per version.
+_TABLES: dict[str, dict[int, str]] = {}
+_RESOLVED: dict[str | None, "_NameTable"] = {}
+_REVERSE: dict[str, dict[str, tuple[int, ...]]] = {}
+_OUTPUT_REVERSE: dict[str, dict[str, tuple[int, ...]]] = {}
+
+
+def _read_source() -> bytes:
+    try:
+        with open(_SOURCE_FILE, "rb") as f:
+            return f.read()
+    except OSError:
+        # Not a plain directory (e.g. a zipped install): ask the loader.
+        from importlib.resources import files
+
+        return files(__package__).joinpath("tags.json").read_bytes()
 
-    tables: dict[str, dict[int, str]] = {}
+
+def _parse(raw: bytes) -> tuple:
+    """Turn the base + delta document into ``(versions, base, deltas)``."""
+    import json
+
+    doc = json.loads(raw)
+    base = {int(k, 16): v for k, v in doc["base"].items()}
+    deltas = {}
     order: list[tuple[int, int, str]] = []
     for entry in doc["versions"]:
-        table = dict(base)
-        for k, name in entry["add"].items():
-            table[int(k, 16)] = name
-        for k, name in entry["override"].items():
-            table[int(k, 16)] = name
-        for k in entry["remove"]:
-            table.pop(int(k, 16), None)
-        tables[entry["name"]] = table
+        changes = {int(k, 16): name for k, name in entry["add"].items()}
+        changes.update((int(k, 16), name) for k, name in entry["override"].items())
+        removed = tuple(int(k, 16) for k in entry["remove"])
+        deltas[entry["name"]] = (changes, removed)
         order.append((entry["version"], entry["build"], entry["name"]))
 
     order.sort()
-    return tables, [name for _, _, name in order]
+    return [name for _, _, name in order], base, deltas
+
+
+def _load() -> list[str]:
+    """Load the version list and deltas once; returns :data:`KNOWN_VERSIONS`."""
+    global _VERSIONS, _BASE, _DELTAS
+    if _VERSIONS is None:
+        raw = _read_source()
+        key = (_CACHE_FORMAT, zlib.crc32(raw), len(raw))
+        data = read_cache(_CACHE_FILE, key)
+        if not isinstance(data, tuple) or len(data) != 3:
+            data = _parse(raw)
+            write_cache(_CACHE_FILE, key, data)
+        versions, _BASE, _DELTAS = data
+        _VERSIONS = list(versions)
+    return _VERSIONS
+
+
+def _reset() -> None:
+    """Forget everything loaded (for tests)."""
+    global _VERSIONS
+    _VERSIONS = None
+    for cache in (_BASE, _DELTAS, _TABLES, _RESOLVED, _REVERSE, _OUTPUT_REVERSE):
+        cache.clear()
+
+
+def __getattr__(name: str):
+    # KNOWN_VERSIONS is ordered oldest -> newest; default to the newest (most
+    # complete).
+    if name == "KNOWN_VERSIONS":
+        return _load()
+    if name == "DEFAULT_VERSION":
+        return _load()[-1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _table(version: str) -> dict[int, str]:
+    """The names ``version`` itself knows (base + its delta)."""
+    table = _TABLES.get(version)
+    if table is None:
+        _load()
+        changes, removed = _DELTAS[version]
+        table = {**_BASE, **changes}
+        for tag in removed:
+            table.pop(tag, None)
+        _TABLES[version] = table
+    return table
+
+
+class _NameTable(dict):
+    """tag -> name for one version; unknown tags get (and keep) a placeholder."""
+
+    def __missing__(self, tag: int) -> str:
+        name = self[tag] = f"InvalidTag_0x{tag:04X}"
+        return name
 
 
-_TABLES, KNOWN_VERSIONS = _load()
-# KNOWN_VERSIONS is ordered oldest -> newest; default to the newest (most complete).
-DEFAULT_VERSION = KNOWN_VERSIONS[-1]
+def _merged(version: str) -> dict[int, str]:
+    """``version``'s names with the forward fallback already applied.
+
+    Every newer table is overlaid (newest first), then ``version``'s own names.
+    """
+    versions = _load()
+    merged: dict[int, str] = {}
+    for newer in reversed(versions[versions.index(version) :]):
+        merged.update(_table(newer))
+    return merged
+
+
+def _known_version(os_version: str | None) -> str:
+    versions = _load()
+    return os_version if os_version in versions else versions[-1]
+
+
+def _resolved(os_version: str | None) -> _NameTable:
+    version = _known_version(os_version)
+    table = _RESOLVED.get(version)
+    if table is None:
+        table = _RESOLVED[version] = _NameTable(_merged(version))
+    if os_version is None:
+        _RESOLVED[None] = table
+    return table
 
 
 def tag_id_to_string(tag: int, os_version: str | None = None) -> str:
@@ -69,17 +178,63 @@ def tag_id_to_string(tag: int, os_version: str | None = None) -> str:
     number visible in the output (and is a valid XML element name, unlike a
     parenthesised form).
     """
-    if os_version is None or os_version not in _TABLES:
-        os_version = DEFAULT_VERSION
+    table = _RESOLVED.get(os_version)
+    if table is None:
+        table = _resolved(os_version)
+    # The fallback is already applied and misses are memoized: one dict lookup.
+    return table[tag]
 
-    name = _TABLES[os_version].get(tag)
-    if name is not None:
-        return name
 
-    # Look only at versions newer than the target (forward compatibility).
-    for version in KNOWN_VERSIONS[KNOWN_VERSIONS.index(os_version) + 1 :]:
-        name = _TABLES[version].get(tag)
-        if name is not None:
-            return name
+def tag_ids_for_name(name: str, os_version: str | None = None) -> tuple[int, ...]:
+    """The tag ids that :func:`tag_id_to_string` resolves to ``name``.
 
-    return f"InvalidTag_0x{tag:04X}"
+    The reverse of :func:`tag_id_to_string` for the same ``os_version``, in
+    ascending order; empty when no tag has that name. ``name`` is the raw name
+    (e.g. ``"MSI TRANSFORM"``); ``InvalidTag_0xXXXX`` names map back to their
+    number. Older versions can have more than one id per name, as a few tags
+    were renumbered over time.
+    """
+    version = _known_version(os_version)
+    by_name = _REVERSE.get(version)
+    if by_name is None:
+        by_name = _REVERSE[version] = {}
+        for tag, known in sorted(_merged(version).items()):
+            by_name[known] = by_name.get(known, ()) + (tag,)
+    tags = by_name.get(name)
+    if tags is not None:
+        return tags
+    if name.startswith("InvalidTag_0x") and len(name) == 17:
+        try:
+            tag = int(name[13:], 16)
+        except ValueError:
+            return ()
+        if tag_id_to_string(tag, version) == name:
+            return (tag,)
+    return ()
+
+
+def tag_ids_for_output_name(
+    name: str, os_version: str | None = None
+) -> tuple[int, ...]:
+    """The tag ids written as ``name`` in the JSON or XML output.
+
+    Like :func:`tag_ids_for_name`, but ``name`` may also be the normalized form
+    used in JSON (``MSI_TRANSFORM`` for ``"MSI TRANSFORM"``) or the XML element
+    name (``S16BIT_DESCRIPTION``). A raw name wins over another tag's
+    normalized form. This is how users name tags they copied from the output.
+    """
+    tags = tag_ids_for_name(name, os_version)
+    if tags:
+        return tags
+    version = _known_version(os_version)
+    by_form = _OUTPUT_REVERSE.get(version)
+    if by_form is None:
+        # Defined in the parent package, which imports this module first.
+        from .. import normalize_tag_name, xml_tag_name
+
+        by_form = _OUTPUT_REVERSE[version] = {}
+        for tag, known in sorted(_merged(version).items()):
+            for form in dict.fromkeys((normalize_tag_name(known), xml_tag_name(known))):
+                if form != known:
+                    by_form[form] = by_form.get(form, ()) + (tag,)
+    return by_form.get(name, ())
@@ -0,0 +1,125 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     Iterative (explicit-stack) traversal of the SDB tag tree.
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+
+:func:`walk_tags` flattens the tag tree into a stream of ``(event, tagid,
+depth, item)`` records in document order, where ``event`` is
+:attr:`WalkEvent.BEGIN` / :attr:`WalkEvent.END` for a list and
+:attr:`WalkEvent.LEAF` for any other tag. It keeps one small stack entry per
+open list instead of a Python frame and a child generator, and being a
+generator it can be stopped early or suspended and resumed at will.
+
+Children are enumerated with the same rules as ``SdbGetFirstChild`` /
+``SdbGetNextChild``, but each tag header is decoded only once and the end of
+every open list is remembered instead of being re-read for every child.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator, Mapping
+from enum import IntEnum
+from typing import Any
+
+from .sdb_reader import (
+    SdbFile,
+    SdbpReadTagHeader,
+    TAG_NULL,
+    TAG_TYPE_LIST,
+    TAG_TYPE_MASK,
+    TAG_TYPE_STRINGREF,
+    TAGID_ROOT,
+    _SIZEOF_DWORD,
+    _SIZEOF_TAG,
+    _TAGID_ROOT,
+)
+
+_LIST_HEADER = _SIZEOF_TAG + _SIZEOF_DWORD
+
+
+class WalkEvent(IntEnum):
+    """Kind of a traversal record."""
+
+    BEGIN = 0  # a list is entered; its children follow
+    END = 1  # a list is left
+    LEAF = 2  # a non-list tag
+
+
+BEGIN = WalkEvent.BEGIN
+END = WalkEvent.END
+LEAF = WalkEvent.LEAF
+
+WalkRecord = tuple[WalkEvent, int, int, Any]
+
+
+def walk_tags(
+    pdb: SdbFile,
+    start: int = TAGID_ROOT,
+    make: Callable[[int, int], Any] | None = None,
+    excluded: Mapping[int, bool] | None = None,
+) -> Iterator[WalkRecord]:
+    """Yield ``(event, tagid, depth, item)`` for ``start`` and all its descendants.
+
+    ``depth`` is relative to ``start`` (0). ``item`` is ``make(tagid, tag)``,
+    or the TAG number when ``make`` is ``None``; the END record of a list
+    carries the same item as its BEGIN record.
+
+    Descendants whose TAG number maps to true in ``excluded`` produce no
+    records; an excluded list is stepped over using its size, so nothing
+    below it is read.
+    """
+    if start == TAGID_ROOT:
+        tag, data_size = TAG_NULL, pdb.size - _TAGID_ROOT
+        list_size = pdb.size
+        first = _TAGID_ROOT
+    else:
+        tag, data_size = SdbpReadTagHeader(pdb, start)
+        list_size = ((data_size + 1) & ~1) + _LIST_HEADER
+        first = start + _LIST_HEADER
+    item = tag if make is None else make(start, tag)
+    if start != TAGID_ROOT and (tag & TAG_TYPE_MASK) != TAG_TYPE_LIST:
+        yield LEAF, start, 0, item
+        return
+    yield BEGIN, start, 0, item
+    if data_size <= 0:
+        yield END, start, 0, item
+        return
+
+    read_header = SdbpReadTagHeader
+    size = pdb.size
+    # One entry per open list: (tagid, item, end of its children, on-disk size).
+    stack = [(start, item, min(size, start + list_size), list_size)]
+    child = first
+    while True:
+        tag, data_size = read_header(pdb, child)
+        ttype = tag & TAG_TYPE_MASK
+        if ttype == TAG_TYPE_LIST:
+            tag_size = ((data_size + 1) & ~1) + _LIST_HEADER
+            if excluded is None or not excluded[tag]:
+                depth = len(stack)
+                item = tag if make is None else make(child, tag)
+                yield BEGIN, child, depth, item
+                if data_size != 0:
+                    stack.append((child, item, min(size, child + tag_size), tag_size))
+                    child += _LIST_HEADER
+                    continue
+                yield END, child, depth, item
+        else:
+            if excluded is None or not excluded[tag]:
+                item = tag if make is None else make(child, tag)
+                yield LEAF, child, len(stack), item
+            if ttype == TAG_NULL:
+                tag_size = 0
+            elif ttype <= TAG_TYPE_STRINGREF:
+                tag_size = ((data_size + 1) & ~1) + _SIZEOF_TAG
+            else:
+                tag_size = ((data_size + 1) & ~1) + _LIST_HEADER
+
+        # Move to the next sibling, leaving every list that has run out.
+        while tag_size == 0 or child + tag_size >= stack[-1][2]:
+            child, item, _, tag_size = stack.pop()
+            yield END, child, len(stack), item
+            if not stack:
+                return
+        child += tag_size
@@ -13,17 +13,21 @@ from sdbtool.apphelp import sdb_reader
 from sdbtool.apphelp.sdb_reader import SdbFile
 
 
-def SdbOpenDatabase(path: str, path_type: int = 0) -> SdbFile | None:
+def SdbOpenDatabase(
+    path: str, path_type: int = 0, use_mmap: bool = False
+) -> SdbFile | None:
     """Open a database at the specified path.
 
     ``path_type`` (DOS_PATH / NT_PATH) is accepted for API compatibility; the
-    file is always read directly through the filesystem.
+    file is always read directly through the filesystem. ``use_mmap`` maps the
+    file instead of reading it into memory.
     """
-    return sdb_reader.SdbOpenDatabase(path)
+    return sdb_reader.SdbOpenDatabase(path, use_mmap)
 
 
 def SdbCloseDatabase(db: SdbFile | None) -> None:
-    """Close the specified database (no-op; kept for API compatibility)."""
+    """Close the specified database, releasing its file mapping (if any)."""
+    sdb_reader.SdbCloseDatabase(db)
 
 
 def SdbGetFirstChild(db: SdbFile, parent: int) -> int:
@@ -0,0 +1,118 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     Audit a directory tree against an SDB file.
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+
+:func:`audit` walks a tree and matches every executable in it against the EXE
+entries of a database, compiled once (see :mod:`sdbtool.compiled_match`).
+Files are first filtered by name against the EXE names of the database, so only
+files that could match are ever opened. Matching the rest (mostly: reading
+their attributes) is spread in batches over a process pool. With the compiled
+matcher kept in the user cache directory, every worker loads it from there
+instead of compiling it again.
+
+Results come back in walk order, with only a few batches in flight at any
+time: memory use does not grow with the size of the tree.
+"""
+
+from __future__ import annotations
+
+import os
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING
+
+from sdbtool.compiled_match import CompiledMatcher, load_matcher
+from sdbtool.files import iter_files
+
+if TYPE_CHECKING:
+    from sdbtool.match import ExeMatcher, MatchedExe
+
+# Files matched per task, and the number of tasks in flight per worker.
+BATCH_SIZE = 32
+_IN_FLIGHT = 2
+# Attributes of this many files are kept per matcher (see FileAttributeCache).
+_MAX_CACHED = 256
+
+# The matcher of a pool worker, set up by _init_worker.
+_worker_matcher: CompiledMatcher | None = None
+
+
+def _batched(items: Iterable[str], size: int) -> Iterator[list[str]]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _exe_record(exe: MatchedExe) -> dict:
+    return {
+        "tagid": exe.tag_id,
+        "name": exe.name,
+        "app_name": exe.app_name,
+        "vendor": exe.vendor,
+        "exe_id": str(exe.exe_id) if exe.exe_id is not None else None,
+        "refs": [
+            {"kind": ref.kind, "tagid": ref.tag_id, "name": ref.name}
+            for ref in exe.refs
+        ],
+    }
+
+
+def audit_file(matcher: CompiledMatcher | ExeMatcher, path: str) -> dict:
+    """The audit record of one file: its matches, or the error matching it."""
+    try:
+        matches = matcher.match(path)
+    except (OSError, ValueError) as e:
+        return {"path": path, "error": str(e)}
+    return {"path": path, "matches": [_exe_record(exe) for exe in matches]}
+
+
+def _init_worker(sdb_file: str, cache: bool) -> None:
+    global _worker_matcher
+    _worker_matcher = load_matcher(sdb_file, cache, max_cached=_MAX_CACHED)
+
+
+def _audit_batch(paths: list[str]) -> list[dict]:
+    return [audit_file(_worker_matcher, path) for path in paths]
+
+
+def audit(
+    root: str | os.PathLike,
+    sdb_file: str | os.PathLike,
+    jobs: int = 1,
+    batch_size: int = BATCH_SIZE,
+    cache: bool = True,
+) -> Iterator[dict]:
+    """Yield an audit record for every file below ``root`` that could match.
+
+    A record is ``{"path": ..., "matches": [...]}`` (possibly empty: the name
+    matched, the file did not), or ``{"path": ..., "error": ...}``. Records come
+    in :func:`iter_files` order whatever ``jobs`` is; with ``jobs`` above 1
+    files are matched in that many worker processes. ``cache`` is passed on to
+    :func:`~sdbtool.compiled_match.load_matcher`.
+    """
+    sdb_file = os.fspath(sdb_file)
+    matcher = load_matcher(sdb_file, cache, max_cached=_MAX_CACHED)
+    candidates = (path for path in iter_files(root) if matcher.may_match(path))
+    if jobs <= 1:
+        for path in candidates:
+            yield audit_file(matcher, path)
+        return
+
+    with ProcessPoolExecutor(
+        jobs, initializer=_init_worker, initargs=(sdb_file, cache)
+    ) as pool:
+        pending = deque()
+        for batch in _batched(candidates, batch_size):
+            pending.append(pool.submit(_audit_batch, batch))
+            if len(pending) >= jobs * _IN_FLIGHT:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
@@ -0,0 +1,188 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     Convert many SDB files to XML / JSON in one process.
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+
+:func:`convert_files` converts every database into its own output file,
+sharing one interpreter (and its tag tables) between them, optionally on a
+process pool that takes the largest files first. A database that cannot be
+converted is reported and skipped; its partial output is removed.
+"""
+
+import os
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+
+from sdbtool.apphelp import SdbDatabase
+from sdbtool.files import iter_files
+from sdbtool.sdb2json import (
+    convert as sdb2json_convert,
+    convert_ndjson as sdb2json_convert_ndjson,
+)
+from sdbtool.sdb2xml import XmlAnnotations, convert as sdb2xml_convert
+
+SUFFIXES = {"xml": ".xml", "json": ".json", "ndjson": ".ndjson"}
+
+
+@dataclass(frozen=True)
+class ConvertOptions:
+    """The options of a conversion, as the sdb2xml / sdb2json commands take them."""
+
+    output_format: str  # "xml", "json" or "ndjson"
+    exclude_tags: tuple[str, ...] = ()
+    annotations: bool = True
+    with_tagid: bool = False
+    with_tag: bool = False
+    target_os: str | None = None
+    use_mmap: bool = False
+    compact: bool = False  # JSON only
+    typed_values: bool = False  # JSON and JSON Lines only
+
+
+@dataclass
+class ConvertResult:
+    """The outcome of converting one file."""
+
+    input_file: str
+    output_file: str
+    seconds: float
+    error: str | None = None
+
+
+def _sdb_files(directory: str, recursive: bool) -> list[str]:
+    if recursive:
+        files = iter_files(directory)
+    else:
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+        files = (entry.path for entry in entries if entry.is_file())
+    return [path for path in files if path.lower().endswith(".sdb")]
+
+
+def plan_outputs(
+    inputs: Iterable[str | os.PathLike],
+    out_dir: str | os.PathLike,
+    output_format: str,
+    recursive: bool = False,
+) -> list[tuple[str, str]]:
+    """Pair every database in ``inputs`` with the file it is converted to.
+
+    Files are written to ``out_dir`` under their own name; the ``*.sdb`` files
+    of a directory (and, with ``recursive``, of its subdirectories) keep their
+    path relative to it. Two inputs that would be written to the same file
+    raise a ValueError.
+    """
+    suffix = SUFFIXES[output_format]
+    planned: dict[str, str] = {}
+    for path in inputs:
+        path = os.fspath(path)
+        if os.path.isdir(path):
+            pairs = [
+                (file_name, os.path.relpath(file_name, path))
+                for file_name in _sdb_files(path, recursive)
+            ]
+        else:
+            pairs = [(path, os.path.basename(path))]
+        for file_name, relative in pairs:
+            output = str(Path(out_dir, relative).with_suffix(suffix))
+            other = planned.get(output)
+            if other is not None and other != file_name:
+                raise ValueError(
+                    f"Both '{other}' and '{file_name}' would be written to '{output}'"
+                )
+            planned[output] = file_name
+    return [(file_name, output) for output, file_name in planned.items()]
+
+
+def convert_file(input_file: str, output_file: str, options: ConvertOptions):
+    """Convert ``input_file`` into ``output_file``; never raises."""
+    start = time.perf_counter()
+    try:
+        db = SdbDatabase(
+            input_file, target_os=options.target_os, use_mmap=options.use_mmap
+        )
+        try:
+            if not db:
+                raise ValueError(f"Failed to open database at '{input_file}'")
+            os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+            with open(output_file, "w", encoding="utf-8") as output:
+                if options.output_format == "xml":
+                    sdb2xml_convert(
+                        db,
+                        output,
+                        list(options.exclude_tags),
+                        (
+                            XmlAnnotations.Comment
+                            if options.annotations
+                            else XmlAnnotations.Disabled
+                        ),
+                        options.with_tagid,
+                        options.with_tag,
+                    )
+                elif options.output_format == "ndjson":
+                    sdb2json_convert_ndjson(
+                        db,
+                        output,
+                        list(options.exclude_tags),
+                        options.annotations,
+                        typed_values=options.typed_values,
+                    )
+                else:
+                    sdb2json_convert(
+                        db,
+                        output,
+                        list(options.exclude_tags),
+                        options.annotations,
+                        options.with_tagid,
+                        options.with_tag,
+                        compact=options.compact,
+                        typed_values=options.typed_values,
+                    )
+        finally:
+            db.close()
+    except Exception as e:
+        try:
+            os.remove(output_file)
+        except OSError:
+            pass
+        return ConvertResult(
+            input_file, output_file, time.perf_counter() - start, str(e) or repr(e)
+        )
+    return ConvertResult(input_file, output_file, time.perf_counter() - start)
+
+
+def _by_size(pairs: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    def size(pair):
+        try:
+            return os.stat(pair[0]).st_size
+        except OSError:
+            return 0
+
+    return sorted(pairs, key=size, reverse=True)
+
+
+def convert_files(
+    pairs: list[tuple[str, str]], options: ConvertOptions, jobs: int = 1
+) -> Iterator[ConvertResult]:
+    """Convert every ``(input, output)`` pair, yielding the results.
+
+    With ``jobs`` at most 1 the files are converted in order, in this process.
+    Above that, they are converted in that many worker processes, largest
+    first, and results come as the files are done.
+    """
+    if jobs <= 1:
+        for input_file, output_file in pairs:
+            yield convert_file(input_file, output_file, options)
+        return
+
+    with ProcessPoolExecutor(jobs) as pool:
+        futures = [
+            pool.submit(convert_file, input_file, output_file, options)
+            for input_file, output_file in _by_size(pairs)
+        ]
+        for future in as_completed(futures):
+            yield future.result()
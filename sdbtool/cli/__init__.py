@@ -5,20 +5,71 @@ PURPOSE:     Entrypoint of the sdbtool tool
 COPYRIGHT:   Copyright 2025 Mark Jansen <mark.jansen@reactos.org>
 """
 
-from sdbtool.cli.sdb2xml import command as sdb2xml_command
-from sdbtool.cli.sdb2json import command as sdb2json_command
-from sdbtool.cli.attributes import command as attributes_command
-from sdbtool.cli.info import command as info_command
-from sdbtool.cli.gui import command as gui_command
+from importlib import import_module
 import click
 
 CONTEXT_SETTINGS = dict(
     max_content_width=200,
 )
 
+# Subcommands as name -> "module:attribute". A command's module is only imported
+# when the command is dispatched (or listed by --help), so e.g. `sdbtool info`
+# does not pay for tkinter (gui) or pefile (attributes).
+COMMANDS = {
+    "sdb2xml": "sdbtool.cli.sdb2xml:command",
+    "sdb2json": "sdbtool.cli.sdb2json:command",
+    "attributes": "sdbtool.cli.attributes:command",
+    "audit": "sdbtool.cli.audit:command",
+    "grep": "sdbtool.cli.grep:command",
+    "index": "sdbtool.cli.index:command",
+    "info": "sdbtool.cli.info:command",
+    "match": "sdbtool.cli.match:command",
+    "query": "sdbtool.cli.query:command",
+    "stats": "sdbtool.cli.stats:command",
+    "gui": "sdbtool.cli.gui:command",
+}
+
+# Module attributes used by the [project.scripts] entry points.
+_ENTRY_POINTS = {
+    "sdb2xml_command": "sdb2xml",
+    "sdb2json_command": "sdb2json",
+    "attributes_command": "attributes",
+    "audit_command": "audit",
+    "grep_command": "grep",
+    "index_command": "index",
+    "info_command": "info",
+    "match_command": "match",
+    "query_command": "query",
+    "stats_command": "stats",
+    "gui_command": "gui",
+}
+
+
+def _load_command(spec: str) -> click.Command:
+    module, _, attr = spec.partition(":")
+    return getattr(import_module(module), attr)
+
+
+class LazyGroup(click.Group):
+    """A click group that imports its ``lazy_commands`` on first use."""
+
+    def __init__(self, *args, lazy_commands: dict[str, str] | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = dict(lazy_commands or {})
+
+    def list_commands(self, ctx):
+        return sorted({*super().list_commands(ctx), *self.lazy_commands})
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name not in self.commands and cmd_name in self.lazy_commands:
+            self.add_command(_load_command(self.lazy_commands[cmd_name]), cmd_name)
+        return super().get_command(ctx, cmd_name)
+
 
 @click.group(
     name="sdbtool",
+    cls=LazyGroup,
+    lazy_commands=COMMANDS,
     help="A command-line tool for working with SDB files.",
     context_settings=CONTEXT_SETTINGS,
 )
@@ -28,8 +79,8 @@ def sdbtool_command():
     pass  # pragma: no cover
 
 
-sdbtool_command.add_command(sdb2xml_command)
-sdbtool_command.add_command(sdb2json_command)
-sdbtool_command.add_command(attributes_command)
-sdbtool_command.add_command(info_command)
-sdbtool_command.add_command(gui_command)
+def __getattr__(name: str):
+    command = _ENTRY_POINTS.get(name)
+    if command is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return _load_command(COMMANDS[command])
@@ -0,0 +1,58 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     cli handling for the audit command
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+"""
+
+import json
+import os
+
+import click
+from sdbtool.audit import audit
+
+
+@click.command("audit")
+@click.argument("directory", type=click.Path(exists=True, file_okay=False))
+@click.option(
+    "--sdb",
+    "sdb_file",
+    type=click.Path(exists=True, dir_okay=False),
+    required=True,
+    help="The SDB file to match against.",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Worker processes to match files in (0: one per CPU).",
+)
+@click.option(
+    "--cache/--no-cache",
+    default=True,
+    show_default=True,
+    help="Keep the compiled matcher in the user cache directory and reuse it.",
+)
+@click.option(
+    "--output",
+    type=click.File("w", encoding="utf-8"),
+    default="-",
+    help="Path to the output NDJSON file, or '-' for stdout.",
+)
+@click.pass_context
+def command(ctx, directory, sdb_file, jobs, cache, output):
+    """Match every executable below a directory against an SDB file.
+
+    Writes one JSON object per line for each file whose name matches an EXE
+    entry, with the entries that match it.
+    """
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    try:
+        for record in audit(directory, sdb_file, jobs, cache=cache):
+            output.write(json.dumps(record) + "\n")
+    except ValueError as e:
+        click.echo(f"Error auditing {directory}: {e}", err=True)
+        ctx.exit(1)
@@ -5,12 +5,15 @@ PURPOSE:     Shared CLI options and utilities for sdbtool commands
 COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
 """
 
-import click
+import time
 
-from sdbtool.apphelp.tags import KNOWN_VERSIONS
+import click
 
 AUTO_EXCLUDE = ["INDEXES", "STRINGTABLE"]
 
+# ctx.meta key through which --mmap reaches the SDB_DATABASE parameter type.
+USE_MMAP_META = "sdbtool.use_mmap"
+
 
 def expand_exclude(exclude: str) -> list[str]:
     """Parse and expand the --exclude option value, resolving the 'auto' alias."""
@@ -21,8 +24,57 @@ def expand_exclude(exclude: str) -> list[str]:
     return tags
 
 
+def _store_use_mmap(ctx, param, value):
+    ctx.meta[USE_MMAP_META] = value
+    return value
+
+
+def mmap_option(f):
+    """--mmap/--no-mmap, deciding how SDB_DATABASE arguments are opened.
+
+    The option is eager so it is processed before the database argument is
+    converted (and the file opened); its value is not passed to the command.
+    """
+    return click.option(
+        "--mmap/--no-mmap",
+        default=False,
+        is_eager=True,
+        expose_value=False,
+        callback=_store_use_mmap,
+        help="Memory-map the SDB file instead of reading it into memory.",
+    )(f)
+
+
+def _check_target_os(ctx, param, value):
+    if value is None:
+        return None
+    # Only now: the version list comes from tags.json, which is slow to load.
+    from sdbtool.apphelp.tags import KNOWN_VERSIONS
+
+    for version in KNOWN_VERSIONS:
+        if version.lower() == value.lower():
+            return version
+    raise click.BadParameter(
+        f"{value!r} is not one of {', '.join(map(repr, KNOWN_VERSIONS))}.",
+        ctx,
+        param,
+    )
+
+
+def target_os_option(f):
+    """--target-os, checked against the known Windows versions when given."""
+    return click.option(
+        "--target-os",
+        default=None,
+        metavar="VERSION",
+        callback=_check_target_os,
+        help="Resolve tag names as of this Windows version, for older databases"
+        " (e.g. 0501 for XP) [default: newest].",
+    )(f)
+
+
 def common_sdb_options(f):
-    """Shared --exclude, --tagid, and --tag options for SDB conversion commands."""
+    """Shared --exclude, --tagid, --tag, --target-os and --mmap options for SDB conversion commands."""
     f = click.option(
         "--exclude",
         type=click.STRING,
@@ -39,12 +91,71 @@ def common_sdb_options(f):
     f = click.option(
         "--tag/--no-tag", default=False, help="Include tag number in the output."
     )(f)
+    f = target_os_option(f)
+    f = mmap_option(f)
+    return f
+
+
+def batch_options(f):
+    """Shared --out-dir and --recursive options for converting many SDB files."""
     f = click.option(
-        "--target-os",
-        type=click.Choice(KNOWN_VERSIONS, case_sensitive=False),
+        "--out-dir",
+        type=click.Path(file_okay=False, writable=True),
         default=None,
-        metavar="VERSION",
-        help="Resolve tag names as of this Windows version, for older databases"
-        f" (one of: {', '.join(KNOWN_VERSIONS)}) [default: newest].",
+        help="Convert every INPUT_FILE (or *.sdb in an INPUT_FILE directory)"
+        " into its own file in this directory.",
+    )(f)
+    f = click.option(
+        "--recursive",
+        "-r",
+        is_flag=True,
+        default=False,
+        help="With --out-dir, also convert the *.sdb files in subdirectories.",
     )(f)
     return f
+
+
+def open_single_database(ctx: click.Context, input_files: tuple[str, ...]):
+    """The SdbDatabase of the one INPUT_FILE of a conversion without --out-dir."""
+    from sdbtool.cli.types import SDB_DATABASE
+
+    if len(input_files) != 1:
+        raise click.UsageError("Converting several files requires --out-dir.", ctx)
+    if ctx.params.get("recursive"):
+        raise click.UsageError("--recursive requires --out-dir.", ctx)
+    param = next(p for p in ctx.command.params if p.name == "input_files")
+    return SDB_DATABASE.convert(input_files[0], param, ctx)
+
+
+def run_batch(ctx: click.Context, input_files, out_dir, recursive, options, jobs):
+    """Convert ``input_files`` into ``out_dir`` and echo a summary with timings."""
+    from sdbtool.batch import convert_files, plan_outputs
+
+    if ctx.get_parameter_source("output") != click.core.ParameterSource.DEFAULT:
+        raise click.UsageError("--output and --out-dir are mutually exclusive.", ctx)
+    try:
+        pairs = plan_outputs(input_files, out_dir, options.output_format, recursive)
+    except ValueError as e:
+        raise click.UsageError(str(e), ctx)
+    start = time.perf_counter()
+    results = {
+        result.input_file: result for result in convert_files(pairs, options, jobs)
+    }
+    elapsed = time.perf_counter() - start
+
+    failed = 0
+    for input_file, _ in pairs:
+        result = results[input_file]
+        if result.error is None:
+            click.echo(
+                f"{result.seconds * 1000:10.1f} ms  {input_file} -> {result.output_file}"
+            )
+        else:
+            failed += 1
+            click.echo(f"{'FAILED':>13}  {input_file}: {result.error}")
+    click.echo(
+        f"Converted {len(pairs) - failed} of {len(pairs)} files in {elapsed:.2f} s"
+        + (f" ({failed} failed)" if failed else "")
+    )
+    if failed:
+        ctx.exit(1)
@@ -0,0 +1,68 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     cli handling for the grep command
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+"""
+
+import json
+import os
+
+import click
+from sdbtool.grep import grep
+
+
+def _format_hit(hit: dict) -> str:
+    line = f"{hit['path']}:0x{hit['tagid']:x}:{hit['tag']}: {hit['value']}"
+    record = hit["record"]
+    if record is not None:
+        line += f"  ({record['tag']} {record['name'] or 'N/A'}, 0x{record['tagid']:x})"
+    return line
+
+
+@click.command("grep")
+@click.argument("pattern")
+@click.argument(
+    "files", type=click.Path(exists=True, dir_okay=False), nargs=-1, required=True
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Worker processes to search files in (0: one per CPU).",
+)
+@click.option("--ignore-case", "-i", is_flag=True, help="Match case-insensitively.")
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["text", "ndjson"], case_sensitive=False),
+    default="text",
+    show_default=True,
+    help="One line per hit, or one JSON object per hit.",
+)
+@click.pass_context
+def command(ctx, pattern, files, jobs, ignore_case, output_format):
+    """Search the strings of SDB files with a regular expression.
+
+    Every hit is shown with the tag that holds the string and the EXE, SHIM or
+    LAYER it belongs to. With --jobs the order of the files is not kept.
+    """
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    failed = False
+    try:
+        for hit in grep(files, pattern, jobs, ignore_case):
+            if "error" in hit:
+                click.echo(f"Error searching {hit['path']}: {hit['error']}", err=True)
+                failed = True
+            elif output_format == "ndjson":
+                click.echo(json.dumps(hit))
+            else:
+                click.echo(_format_hit(hit))
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+        ctx.exit(1)
+    if failed:
+        ctx.exit(1)
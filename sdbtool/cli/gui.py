@@ -7,11 +7,13 @@ COPYRIGHT:   Copyright 2025 Mark Jansen <mark.jansen@reactos.org>
 
 import click
 from sdbtool.gui import show_gui
+from .common import mmap_option
 from .types import SDB_DATABASE
 
 
 @click.command("gui")
 @click.argument("input_file", type=SDB_DATABASE, required=True)
+@mmap_option
 @click.pass_context
 def command(ctx, input_file):
     """Launch the GUI for the SDB tool."""
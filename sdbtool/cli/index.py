@@ -0,0 +1,81 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     cli handling for the index commands
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+"""
+
+import click
+from sdbtool.cli.common import target_os_option
+from sdbtool.corpus import build_index, search
+
+
+@click.group("index")
+def command():
+    """Index the tag values of many SDB files in a sqlite database and search it."""
+
+
+@command.command("build")
+@click.argument("directory", type=click.Path(exists=True, file_okay=False))
+@click.option(
+    "--db",
+    "corpus_file",
+    type=click.Path(dir_okay=False),
+    required=True,
+    help="The index to create or update.",
+)
+@click.pass_context
+def build_command(ctx, directory, corpus_file):
+    """Index the SDB files below a directory.
+
+    Only files that are new or changed since the last build are read.
+    """
+    try:
+        stats = build_index(directory, corpus_file)
+    except ValueError as e:
+        click.echo(f"Error indexing {directory}: {e}", err=True)
+        ctx.exit(1)
+    click.echo(
+        f"{stats.added} added, {stats.updated} updated, {stats.unchanged} unchanged, "
+        f"{stats.removed} removed, {stats.failed} unreadable; "
+        f"{stats.values} values indexed"
+    )
+
+
+@command.command("search")
+@click.argument("value")
+@click.option(
+    "--db",
+    "corpus_file",
+    type=click.Path(exists=True, dir_okay=False),
+    required=True,
+    help="The index to search.",
+)
+@click.option("--tag", help="Only search this tag (a name or a number).")
+@click.option("--prefix", is_flag=True, help="Find values starting with VALUE as well.")
+@click.option(
+    "--files", "files_only", is_flag=True, help="Only list the matching files."
+)
+@target_os_option
+@click.pass_context
+def search_command(ctx, value, corpus_file, tag, prefix, files_only, target_os):
+    """Find the indexed SDB files with a tag whose value is VALUE (ignoring case).
+
+    Prints the file, tagid, tag name and value of every hit.
+    """
+    if tag is not None:
+        try:
+            tag = int(tag, 0)
+        except ValueError:
+            pass
+    try:
+        hits = search(corpus_file, value, tag, prefix, target_os)
+    except ValueError as e:
+        click.echo(f"Error searching {corpus_file}: {e}", err=True)
+        ctx.exit(1)
+    if files_only:
+        for path in dict.fromkeys(hit.path for hit in hits):
+            click.echo(path)
+        return
+    for hit in hits:
+        click.echo(f"{hit.path}\t0x{hit.tag_id:x}\t{hit.tag_name}\t{hit.value}")
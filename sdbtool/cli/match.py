@@ -0,0 +1,76 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     cli handling for the match command
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+"""
+
+import click
+from sdbtool.apphelp import SdbDatabase
+from sdbtool.compiled_match import load_matcher
+from sdbtool.match import ExeMatcher
+
+
+@click.command("match")
+@click.argument("files", type=click.Path(exists=True, dir_okay=False), nargs=-1)
+@click.option(
+    "--sdb",
+    "sdb_file",
+    type=click.Path(exists=True, dir_okay=False),
+    required=True,
+    help="The SDB file to match against.",
+)
+@click.option(
+    "--cache/--no-cache",
+    default=True,
+    show_default=True,
+    help="Keep the compiled matcher in the user cache directory and reuse it."
+    " Without it, look the files up through the indexes of the sdb file.",
+)
+def command(files, sdb_file, cache):
+    """Show the EXE entries of an sdb file that match executables."""
+    if cache:
+        try:
+            matcher = load_matcher(sdb_file)
+        except ValueError as e:
+            _echo_error(files, e)
+            return
+        _echo_matches(matcher, files)
+        return
+    # Compiling every EXE entry only pays off when the result is kept: a few
+    # index lookups are cheaper.
+    with SdbDatabase(sdb_file, use_mmap=True) as db:
+        if not db:
+            _echo_error(files, f"Failed to open database '{sdb_file}'")
+            return
+        _echo_matches(ExeMatcher(db), files)
+
+
+def _echo_error(files, error) -> None:
+    for file_name in files:
+        click.echo(f"Error matching {file_name}: {error}")
+
+
+def _echo_matches(matcher, files) -> None:
+    for file_name in files:
+        try:
+            matches = matcher.match(file_name)
+        except (OSError, ValueError) as e:
+            click.echo(f"Error matching {file_name}: {e}")
+            continue
+        click.echo(f"Matches for {file_name}:")
+        if not matches:
+            click.echo("  No matching EXE entries.")
+            continue
+        for exe in matches:
+            click.echo(f"  EXE {exe.name} (tagid {exe.tag_id:#x})")
+            if exe.app_name:
+                click.echo(f"    App: {exe.app_name}")
+            if exe.vendor:
+                click.echo(f"    Vendor: {exe.vendor}")
+            if exe.exe_id is not None:
+                click.echo(f"    ID: {exe.exe_id}")
+            for ref in exe.refs:
+                click.echo(
+                    f"    {ref.kind}: {ref.name or 'N/A'} (tagid {ref.tag_id:#x})"
+                )
@@ -0,0 +1,70 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     cli handling for the query command
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+"""
+
+import click
+from sdbtool.cli.types import SDB_DATABASE
+from sdbtool.cli.common import common_sdb_options, expand_exclude
+from sdbtool.query import FORMATS, parse_selector, select
+
+
+@click.command("query")
+@click.argument("input_file", type=SDB_DATABASE, required=True)
+@click.argument("selector")
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(sorted(FORMATS), case_sensitive=False),
+    default="json",
+    show_default=True,
+    help="Write the selected tags as JSON or XML (like sdb2json / sdb2xml), or"
+    " their values as text, one per line.",
+)
+@click.option(
+    "--output",
+    type=click.File("w", encoding="utf-8"),
+    default="-",
+    help="Path to the output file, or '-' for stdout.",
+)
+@click.option(
+    "--annotations/--no-annotations",
+    default=True,
+    help="Include annotations (e.g. decoded flag names, UUIDs) [default: enabled].",
+)
+@common_sdb_options
+@click.pass_context
+def command(
+    ctx,
+    input_file,
+    selector,
+    output_format,
+    output,
+    annotations,
+    exclude,
+    tagid,
+    tag,
+    target_os,
+):
+    """Show the tags of an SDB file selected by SELECTOR.
+
+    For example 'DATABASE/EXE[NAME="setup.exe"]/SHIM_REF/NAME' or
+    '//LAYER[NAME~"WIN95"]'.
+    """
+    try:
+        input_file.target_os = target_os
+        steps = parse_selector(selector, target_os)
+        FORMATS[output_format.lower()](
+            input_file,
+            select(input_file, steps),
+            output,
+            exclude_tags=expand_exclude(exclude),
+            with_annotations=annotations,
+            with_tagid=tagid,
+            with_tag=tag,
+        )
+    except Exception as e:
+        click.echo(f"Error querying SDB: {e}")
+        ctx.exit(1)
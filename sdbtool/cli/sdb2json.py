@@ -5,31 +5,130 @@ PURPOSE:     cli handling for the sdb2json command
 COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
 """
 
+import os
+
 import click
-from sdbtool.cli.types import SDB_DATABASE
-from sdbtool.cli.common import common_sdb_options, expand_exclude
-from sdbtool.sdb2json import convert as sdb2json_convert
+from sdbtool.batch import ConvertOptions
+from sdbtool.cli.common import (
+    USE_MMAP_META,
+    batch_options,
+    common_sdb_options,
+    expand_exclude,
+    open_single_database,
+    run_batch,
+)
+from sdbtool.sdb2json import (
+    convert as sdb2json_convert,
+    convert_ndjson as sdb2json_convert_ndjson,
+)
 
 
 @click.command("sdb2json")
-@click.argument("input_file", type=SDB_DATABASE, required=True)
+@click.argument(
+    "input_files",
+    metavar="INPUT_FILE",
+    type=click.Path(exists=True),
+    nargs=-1,
+    required=True,
+)
 @click.option(
     "--output",
     type=click.File("w", encoding="utf-8"),
     default="-",
     help="Path to the output JSON file, or '-' for stdout.",
 )
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["json", "ndjson"], case_sensitive=False),
+    default="json",
+    show_default=True,
+    help="One JSON document, or one JSON object per tag and line (ndjson);"
+    " the ndjson records always have the tagid and tag number.",
+)
 @click.option(
     "--annotations/--no-annotations",
     default=True,
     help="Include annotations (e.g. decoded flag names, UUIDs) as 'comment' fields [default: enabled].",
 )
+@click.option(
+    "--compact",
+    is_flag=True,
+    default=False,
+    help="Write the JSON document without any whitespace (smaller and faster);"
+    " not available with --format ndjson.",
+)
+@click.option(
+    "--typed-values",
+    is_flag=True,
+    default=False,
+    help="Write BYTE, WORD, DWORD and QWORD values as JSON numbers instead of"
+    " strings (QWORDs above 2**53 stay strings).",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Worker processes to convert in (0: one per CPU); the output is the same."
+    " With --out-dir they convert whole files, largest first.",
+)
+@batch_options
 @common_sdb_options
 @click.pass_context
-def command(ctx, input_file, output, annotations, exclude, tagid, tag, target_os):
-    """Convert an SDB file to JSON format."""
+def command(
+    ctx,
+    input_files,
+    output,
+    output_format,
+    annotations,
+    compact,
+    typed_values,
+    jobs,
+    out_dir,
+    recursive,
+    exclude,
+    tagid,
+    tag,
+    target_os,
+):
+    """Convert an SDB file to JSON format.
+
+    With --out-dir, convert any number of files (and directories of them),
+    each to its own file, and print how long every file took.
+    """
+    if compact and output_format == "ndjson":
+        raise click.UsageError("--compact cannot be used with --format ndjson.", ctx)
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    if out_dir is not None:
+        options = ConvertOptions(
+            output_format=output_format,
+            exclude_tags=tuple(expand_exclude(exclude)),
+            annotations=annotations,
+            with_tagid=tagid,
+            with_tag=tag,
+            target_os=target_os,
+            compact=compact,
+            typed_values=typed_values,
+            use_mmap=ctx.meta.get(USE_MMAP_META, False),
+        )
+        run_batch(ctx, input_files, out_dir, recursive, options, jobs)
+        return
+    input_file = open_single_database(ctx, input_files)
     try:
         input_file.target_os = target_os
+        if output_format == "ndjson":
+            sdb2json_convert_ndjson(
+                db=input_file,
+                output_stream=output,
+                exclude_tags=expand_exclude(exclude),
+                with_annotations=annotations,
+                jobs=jobs,
+                typed_values=typed_values,
+            )
+            return
         sdb2json_convert(
             db=input_file,
             output_stream=output,
@@ -37,6 +136,9 @@ def command(ctx, input_file, output, annotations, exclude, tagid, tag, target_os
             with_annotations=annotations,
             with_tagid=tagid,
             with_tag=tag,
+            jobs=jobs,
+            compact=compact,
+            typed_values=typed_values,
         )
     except Exception as e:
         click.echo(f"Error converting SDB to JSON: {e}")
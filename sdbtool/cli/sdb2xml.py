@@ -5,14 +5,29 @@ PURPOSE:     cli handling for the sdb2xml command
 COPYRIGHT:   Copyright 2025 Mark Jansen <mark.jansen@reactos.org>
 """
 
+import os
+
 import click
-from sdbtool.cli.types import SDB_DATABASE
-from sdbtool.cli.common import common_sdb_options, expand_exclude
+from sdbtool.batch import ConvertOptions
+from sdbtool.cli.common import (
+    USE_MMAP_META,
+    batch_options,
+    common_sdb_options,
+    expand_exclude,
+    open_single_database,
+    run_batch,
+)
 from sdbtool.sdb2xml import convert as sdb2xml_convert, XmlAnnotations
 
 
 @click.command("sdb2xml")
-@click.argument("input_file", type=SDB_DATABASE, required=True)
+@click.argument(
+    "input_files",
+    metavar="INPUT_FILE",
+    type=click.Path(exists=True),
+    nargs=-1,
+    required=True,
+)
 @click.option(
     "--output",
     type=click.File("w", encoding="utf-8"),
@@ -28,10 +43,51 @@ from sdbtool.sdb2xml import convert as sdb2xml_convert, XmlAnnotations
     " - Disabled: no annotations.\n"
     " - Comment: annotations as comments.",
 )
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Worker processes to convert in (0: one per CPU); the output is the same."
+    " With --out-dir they convert whole files, largest first.",
+)
+@batch_options
 @common_sdb_options
 @click.pass_context
-def command(ctx, input_file, output, annotations, exclude, tagid, tag, target_os):
-    """Convert an SDB file to XML format."""
+def command(
+    ctx,
+    input_files,
+    output,
+    annotations,
+    jobs,
+    out_dir,
+    recursive,
+    exclude,
+    tagid,
+    tag,
+    target_os,
+):
+    """Convert an SDB file to XML format.
+
+    With --out-dir, convert any number of files (and directories of them),
+    each to its own file, and print how long every file took.
+    """
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    if out_dir is not None:
+        options = ConvertOptions(
+            output_format="xml",
+            exclude_tags=tuple(expand_exclude(exclude)),
+            annotations=annotations != XmlAnnotations.Disabled,
+            with_tagid=tagid,
+            with_tag=tag,
+            target_os=target_os,
+            use_mmap=ctx.meta.get(USE_MMAP_META, False),
+        )
+        run_batch(ctx, input_files, out_dir, recursive, options, jobs)
+        return
+    input_file = open_single_database(ctx, input_files)
     try:
         input_file.target_os = target_os
         sdb2xml_convert(
@@ -41,6 +97,7 @@ def command(ctx, input_file, output, annotations, exclude, tagid, tag, target_os
             annotations=annotations,
             with_tagid=tagid,
             with_tag=tag,
+            jobs=jobs,
         )
     except Exception as e:
         click.echo(f"Error converting SDB to XML: {e}")
@@ -0,0 +1,69 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     cli handling for the stats command
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+"""
+
+import json
+
+import click
+from sdbtool.apphelp import normalize_tag_name, tag_id_to_string
+from sdbtool.cli.common import target_os_option
+from sdbtool.stats import TOP_BINARIES, DatabaseStats, get_stats, sorted_by_size
+
+
+def _echo_table(stats: DatabaseStats, target_os: str | None) -> None:
+    def name(tag: int) -> str:
+        return normalize_tag_name(tag_id_to_string(tag, target_os))
+
+    click.echo(f"  Size: {stats.size} bytes, {stats.tags} tags")
+    depths = ", ".join(
+        f"{depth}: {count}" for depth, count in enumerate(stats.depths) if depth
+    )
+    click.echo(f"  Tags per depth: {depths or 'N/A'}")
+    click.echo(
+        f"  String table: {stats.stringtable_bytes} bytes, {stats.strings} strings,"
+        f" {stats.unique_strings} unique ({stats.duplicate_ratio:.1%} duplicates,"
+        f" {stats.duplicate_string_bytes} bytes)"
+    )
+    click.echo(f"  {'Tag':<32} {'Number':>8} {'Count':>8} {'Bytes':>10}")
+    for tag, (count, size) in sorted_by_size(stats.by_tag):
+        click.echo(f"  {name(tag):<32} {f'0x{tag:x}':>8} {count:>8} {size:>10}")
+    if stats.largest_binaries:
+        click.echo("  Largest BINARY tags:")
+        for tagid, tag, size in stats.largest_binaries:
+            click.echo(f"    {name(tag)} (tagid {tagid:#x}): {size} bytes")
+
+
+@click.command("stats")
+@click.argument("files", type=click.Path(exists=True, dir_okay=False), nargs=-1)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["table", "json"], case_sensitive=False),
+    default="table",
+    show_default=True,
+    help="A table per file, or one JSON object per file and line.",
+)
+@click.option(
+    "--top",
+    type=click.IntRange(min=0),
+    default=TOP_BINARIES,
+    show_default=True,
+    help="How many of the largest BINARY tags to show.",
+)
+@target_os_option
+def command(files, output_format, top, target_os):
+    """Show tag counts, sizes and string table statistics of sdb files."""
+    for file_name in files:
+        try:
+            stats = get_stats(file_name, top)
+        except ValueError as e:
+            click.echo(f"Error getting stats for {file_name}: {e}")
+            continue
+        if output_format == "json":
+            click.echo(json.dumps({"file": file_name, **stats.as_dict(target_os)}))
+            continue
+        click.echo(f"Stats for {file_name}:")
+        _echo_table(stats, target_os)
@@ -8,6 +8,7 @@ COPYRIGHT:   Copyright 2025 Mark Jansen <mark.jansen@reactos.org>
 import click
 
 from sdbtool.apphelp import PathType, SdbDatabase
+from sdbtool.cli.common import USE_MMAP_META
 
 
 class SdbDatabaseParamType(click.ParamType):
@@ -17,8 +18,9 @@ class SdbDatabaseParamType(click.ParamType):
         if isinstance(value, SdbDatabase):
             return value
 
+        use_mmap = ctx.meta.get(USE_MMAP_META, False) if ctx else False
         try:
-            db = SdbDatabase(value, PathType.DOS_PATH)
+            db = SdbDatabase(value, PathType.DOS_PATH, use_mmap=use_mmap)
             if not db:
                 db.close()
                 raise ValueError(f"Failed to open database at '{value}'")
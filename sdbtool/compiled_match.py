@@ -0,0 +1,320 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     A precompiled EXE matcher, cached per SDB file.
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+
+:class:`~sdbtool.match.ExeMatcher` works on the tag tree: every lookup goes
+through the indexes and re-reads the EXE and MATCHING_FILE tags it finds. For
+millions of lookups against the same database, :func:`compile_matcher` turns
+all EXE entries into plain data once:
+
+* a table from upper-cased EXE NAME to the entries with that name, plus the
+  list of wildcard names;
+* per entry, what a match reports (names, EXE_ID, references) and per
+  MATCHING_FILE its file name, the attributes that must match and the
+  FROM_ / UPTO_ bounds merged into one interval per attribute.
+
+An entry that can never match (an unsupported attribute type, an unparsable
+version bound, an empty interval) is compiled as such, and costs nothing.
+
+:func:`load_matcher` keeps the compiled matcher in a ``marshal`` file in the
+user cache directory (see :mod:`sdbtool.apphelp.cache`), named after the path
+of the database and keyed by its size, modification time and DATABASE_ID, so
+later runs load it instead of compiling. Like the tag-name cache, it is
+best-effort: a stale, damaged or unwritable file just means compiling again.
+"""
+
+import hashlib
+import os
+from uuid import UUID
+
+from sdbtool.apphelp import SdbDatabase, TagType
+from sdbtool.apphelp.cache import cache_path, read_cache, write_cache
+from sdbtool.apphelp.fileattr import (
+    TAG_BIN_FILE_VERSION,
+    TAG_BIN_PRODUCT_VERSION,
+    TAG_FILE_VERSION,
+    TAG_FROM_BIN_FILE_VERSION,
+    TAG_FROM_BIN_PRODUCT_VERSION,
+    TAG_FROM_FILE_VERSION,
+    TAG_FROM_LINK_DATE,
+    TAG_FROM_PRODUCT_VERSION,
+    TAG_LINK_DATE,
+    TAG_PRODUCT_VERSION,
+    TAG_UPTO_BIN_FILE_VERSION,
+    TAG_UPTO_BIN_PRODUCT_VERSION,
+    TAG_UPTO_FILE_VERSION,
+    TAG_UPTO_LINK_DATE,
+    TAG_UPTO_PRODUCT_VERSION,
+)
+from sdbtool.apphelp.probe import SdbProbeDatabase
+from sdbtool.match import (
+    REF_TAGS,
+    TAG_APP_NAME,
+    TAG_DATABASE,
+    TAG_EXE,
+    TAG_EXE_ID,
+    TAG_MATCHING_FILE,
+    TAG_NAME,
+    TAG_VENDOR,
+    ExeRef,
+    FileAttributeCache,
+    MatchedExe,
+    attribute_matches,
+    attribute_value,
+    child_string,
+    first_children,
+    matching_file_path,
+    pattern_match,
+    upper_name,
+    version_tuple,
+)
+
+_FORMAT = 1
+
+# The attribute a FROM_ / UPTO_ bound applies to. get_file_attributes reports
+# the bound tags with the value of this attribute.
+_LOWER_BOUNDS = {
+    TAG_FROM_BIN_FILE_VERSION: TAG_BIN_FILE_VERSION,
+    TAG_FROM_BIN_PRODUCT_VERSION: TAG_BIN_PRODUCT_VERSION,
+    TAG_FROM_FILE_VERSION: TAG_FILE_VERSION,
+    TAG_FROM_PRODUCT_VERSION: TAG_PRODUCT_VERSION,
+    TAG_FROM_LINK_DATE: TAG_LINK_DATE,
+}
+_UPPER_BOUNDS = {
+    TAG_UPTO_BIN_FILE_VERSION: TAG_BIN_FILE_VERSION,
+    TAG_UPTO_BIN_PRODUCT_VERSION: TAG_BIN_PRODUCT_VERSION,
+    TAG_UPTO_FILE_VERSION: TAG_FILE_VERSION,
+    TAG_UPTO_PRODUCT_VERSION: TAG_PRODUCT_VERSION,
+    TAG_UPTO_LINK_DATE: TAG_LINK_DATE,
+}
+
+# A compiled MATCHING_FILE: (file name, ((tag, value), ...), ((tag, low, high), ...)).
+# Bounds are ints, or tuples of ints for string versions; None is unbounded.
+CompiledFile = tuple[str, tuple, tuple]
+# A compiled EXE: (tagid, name, app name, vendor, EXE_ID, refs, files), with
+# refs as (kind, tagid, name) tuples and files None if it can never match.
+CompiledExe = tuple
+
+
+def _in_interval(actual, low, high) -> bool:
+    if isinstance(low if low is not None else high, tuple):
+        if not isinstance(actual, str):
+            return False
+        actual = version_tuple(actual)
+        if actual is None:
+            return False
+    elif actual is None or isinstance(actual, str):
+        return False
+    return (low is None or actual >= low) and (high is None or actual <= high)
+
+
+def _compile_file(matching_file) -> CompiledFile | None:
+    """A MATCHING_FILE as plain data, or ``None`` if it can never match."""
+    name = None
+    exact = []
+    intervals: dict[int, list] = {}
+    for child in matching_file.tags():
+        if child.tag == TAG_NAME:
+            name = child.read_string()
+            continue
+        if child.type == TagType.NULL:
+            continue
+        value = attribute_value(child)
+        if value is None:
+            return None
+        attribute = _LOWER_BOUNDS.get(child.tag, _UPPER_BOUNDS.get(child.tag))
+        if attribute is None:
+            exact.append((child.tag, value))
+            continue
+        if isinstance(value, str):
+            value = version_tuple(value)
+            if value is None:
+                return None
+        interval = intervals.setdefault(attribute, [None, None])
+        known = interval[0] if interval[0] is not None else interval[1]
+        if known is not None and isinstance(known, tuple) != isinstance(value, tuple):
+            return None  # a string bound and a numeric one: nothing is both
+        if child.tag in _LOWER_BOUNDS:
+            interval[0] = value if interval[0] is None else max(interval[0], value)
+        else:
+            interval[1] = value if interval[1] is None else min(interval[1], value)
+    if not name:
+        return None
+    ranges = []
+    for attribute, (low, high) in intervals.items():
+        if low is not None and high is not None and low > high:
+            return None
+        ranges.append((attribute, low, high))
+    return (name, tuple(exact), tuple(ranges))
+
+
+def _compile_exe(exe) -> CompiledExe:
+    children = list(exe.tags())
+    first = first_children(exe)
+    exe_id = first.get(TAG_EXE_ID)
+    exe_id = exe_id.read_bytes() if exe_id is not None else b""
+    refs = tuple(
+        (
+            REF_TAGS[child.tag],
+            child.tag_id,
+            child_string(first_children(child), TAG_NAME),
+        )
+        for child in children
+        if child.tag in REF_TAGS
+    )
+    files = []
+    for child in children:
+        if child.tag == TAG_MATCHING_FILE:
+            compiled = _compile_file(child)
+            if compiled is None:
+                files = None
+                break
+            files.append(compiled)
+    return (
+        exe.tag_id,
+        child_string(first, TAG_NAME) or "",
+        child_string(first, TAG_APP_NAME),
+        child_string(first, TAG_VENDOR),
+        exe_id if len(exe_id) == 16 else None,
+        refs,
+        tuple(files) if files is not None else None,
+    )
+
+
+class CompiledMatcher:
+    """Matches executables against compiled EXE entries (see :func:`compile_matcher`).
+
+    Has the matching API of :class:`~sdbtool.match.ExeMatcher`, without needing
+    the database.
+    """
+
+    def __init__(self, data: tuple, max_cached: int | None = None):
+        names, wildcards, entries = data
+        self.data = data
+        self.max_cached = max_cached
+        self._names: dict[str, tuple[int, ...]] = names
+        self._wildcards: tuple[tuple[str, int], ...] = wildcards
+        self._entries: list[CompiledExe] = entries
+        self._files = FileAttributeCache(max_cached)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def attributes(self, path: str):
+        """The available attributes of ``path``, or ``None`` if it is missing."""
+        return self._files.get(path)
+
+    def may_match(self, file_name: str) -> bool:
+        """Whether an EXE entry could match ``file_name``, judging by its name only."""
+        name = os.path.basename(file_name)
+        if upper_name(name) in self._names:
+            return True
+        return any(pattern_match(pattern, name) for pattern, _ in self._wildcards)
+
+    def candidates(self, file_name: str) -> list[int]:
+        """The entries (in document order) whose NAME matches the name of ``file_name``."""
+        name = os.path.basename(file_name)
+        found = set(self._names.get(upper_name(name), ()))
+        found.update(
+            i for pattern, i in self._wildcards if pattern_match(pattern, name)
+        )
+        return sorted(found)
+
+    def _file_matches(self, compiled: CompiledFile, exe_path: str) -> bool:
+        name, exact, ranges = compiled
+        attrs = self.attributes(matching_file_path(name, exe_path))
+        if attrs is None:
+            return False
+        return all(
+            attribute_matches(tag, value, attrs.get(tag)) for tag, value in exact
+        ) and all(_in_interval(attrs.get(tag), low, high) for tag, low, high in ranges)
+
+    def match(self, file_name: str | os.PathLike) -> list[MatchedExe]:
+        """The EXE entries matching ``file_name``, in document order."""
+        exe_path = os.path.abspath(os.fspath(file_name))
+        matches = []
+        for i in self.candidates(exe_path):
+            tag_id, name, app_name, vendor, exe_id, refs, files = self._entries[i]
+            if files is None or not all(
+                self._file_matches(compiled, exe_path) for compiled in files
+            ):
+                continue
+            matches.append(
+                MatchedExe(
+                    tag_id=tag_id,
+                    name=name,
+                    app_name=app_name,
+                    vendor=vendor,
+                    exe_id=UUID(bytes_le=exe_id) if exe_id is not None else None,
+                    refs=[ExeRef(*ref) for ref in refs],
+                )
+            )
+        return matches
+
+
+def compile_matcher(db: SdbDatabase, max_cached: int | None = None) -> CompiledMatcher:
+    """Compile the EXE entries of the DATABASE of ``db``."""
+    database = next((t for t in db.root().tags() if t.tag == TAG_DATABASE), None)
+    exes = [] if database is None else [t for t in database.tags() if t.tag == TAG_EXE]
+    entries = [_compile_exe(exe) for exe in exes]
+    names: dict[str, list[int]] = {}
+    wildcards = []
+    for i, entry in enumerate(entries):
+        name = entry[1]
+        if not name:
+            continue
+        names.setdefault(upper_name(name), []).append(i)
+        if "*" in name or "?" in name:
+            wildcards.append((name, i))
+    names = {name: tuple(found) for name, found in names.items()}
+    return CompiledMatcher((names, tuple(wildcards), entries), max_cached)
+
+
+def matcher_cache_path(sdb_file: str | os.PathLike) -> str | None:
+    """Where the compiled matcher of ``sdb_file`` is cached (None: caching is off)."""
+    path = os.path.normcase(os.path.abspath(os.fspath(sdb_file)))
+    digest = hashlib.sha256(os.fsencode(path)).hexdigest()[:32]
+    return cache_path("matchers", f"{digest}.matcher")
+
+
+def _cache_key(sdb_file: str) -> tuple:
+    try:
+        st = os.stat(sdb_file)
+    except OSError as e:
+        raise ValueError(f"Failed to open database '{sdb_file}'") from e
+    probe = SdbProbeDatabase(sdb_file)
+    if probe is None:
+        raise ValueError(f"Failed to open database '{sdb_file}'")
+    return (_FORMAT, st.st_size, st.st_mtime_ns, probe.database_id)
+
+
+def _read_matcher(path: str | None, key: tuple) -> tuple | None:
+    data = read_cache(path, key)
+    if not isinstance(data, tuple) or len(data) != 3:
+        return None
+    return data
+
+
+def load_matcher(
+    sdb_file: str | os.PathLike, cache: bool = True, max_cached: int | None = None
+) -> CompiledMatcher:
+    """The compiled matcher of ``sdb_file``.
+
+    With ``cache`` it is read from :func:`matcher_cache_path` when that is up
+    to date, and (re)written there otherwise.
+    """
+    sdb_file = os.fspath(sdb_file)
+    key = _cache_key(sdb_file)
+    path = matcher_cache_path(sdb_file) if cache else None
+    if path is not None:
+        data = _read_matcher(path, key)
+        if data is not None:
+            return CompiledMatcher(data, max_cached)
+    with SdbDatabase(sdb_file, use_mmap=True) as db:
+        if not db:
+            raise ValueError(f"Failed to open database '{sdb_file}'")
+        matcher = compile_matcher(db, max_cached)
+    write_cache(path, key, matcher.data)
+    return matcher
@@ -0,0 +1,322 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     A sqlite index of the tag values of many SDB files.
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+
+:func:`build_index` finds the SDB files below a directory and stores every
+string, GUID and numeric tag value of them as a ``(file, tagid, tag, value)``
+row in a sqlite database, with an index on the value. :func:`search` then
+answers "which databases mention X" from sqlite alone, without opening any
+SDB file.
+
+Values are stored as text, as they are written in the output: strings as they
+are, numbers in decimal and 16-byte ``*_ID`` binaries as ``{GUID}``. The
+STRINGTABLE and INDEXES sections are left out (their contents are reachable
+through the tags that refer to them).
+
+Building is incremental: a file is only read again when its size,
+modification time or DATABASE_ID changed since it was indexed, and files that
+disappeared are dropped. The rows of a file are inserted in bulk, in one
+transaction per file, so an interrupted build leaves every file either fully
+indexed or not at all.
+"""
+
+import os
+import sqlite3
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from uuid import UUID
+
+from sdbtool.apphelp import (
+    normalize_tag_name,
+    tag_id_to_string,
+    tag_ids_for_output_name,
+)
+from sdbtool.apphelp.probe import SdbProbeDatabase
+from sdbtool.apphelp.sdb_reader import (
+    SdbCloseDatabase,
+    SdbFile,
+    SdbGetFirstChild,
+    SdbGetNextChild,
+    SdbGetStringTagPtr,
+    SdbGetTagFromTagID,
+    SdbOpenDatabase,
+    SdbReadBinaryTag,
+    SdbReadBYTETag,
+    SdbReadDWORDTag,
+    SdbReadQWORDTag,
+    SdbReadWORDTag,
+    TAG_TYPE_BINARY,
+    TAG_TYPE_BYTE,
+    TAG_TYPE_DWORD,
+    TAG_TYPE_MASK,
+    TAG_TYPE_QWORD,
+    TAG_TYPE_STRING,
+    TAG_TYPE_STRINGREF,
+    TAG_TYPE_WORD,
+    TAGID_ROOT,
+)
+from sdbtool.apphelp.walk import LEAF, walk_tags
+from sdbtool.files import iter_files
+
+_FORMAT = 1  # kept in PRAGMA user_version
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    database_id BLOB,
+    tags INTEGER NOT NULL  -- rows in tags; -1 if the file could not be read
+);
+CREATE TABLE IF NOT EXISTS tags (
+    file_id INTEGER NOT NULL REFERENCES files (id),
+    tagid INTEGER NOT NULL,
+    tag INTEGER NOT NULL,
+    value TEXT NOT NULL COLLATE NOCASE
+);
+CREATE INDEX IF NOT EXISTS tags_by_value ON tags (value);
+CREATE INDEX IF NOT EXISTS tags_by_file ON tags (file_id);
+"""
+
+_TAG_STRINGTABLE = 0x7801
+_TAG_INDEXES = 0x7802
+_SKIPPED_SECTIONS = frozenset({_TAG_STRINGTABLE, _TAG_INDEXES})
+
+_NUMBER_READERS = {
+    TAG_TYPE_BYTE: SdbReadBYTETag,
+    TAG_TYPE_WORD: SdbReadWORDTag,
+    TAG_TYPE_DWORD: SdbReadDWORDTag,
+    TAG_TYPE_QWORD: SdbReadQWORDTag,
+}
+
+
+@dataclass
+class BuildStats:
+    """What :func:`build_index` did."""
+
+    added: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    failed: int = 0  # files that are not SDB files (indexed without values)
+    values: int = 0  # rows inserted
+
+
+@dataclass
+class SearchHit:
+    """A tag value found by :func:`search`."""
+
+    path: str
+    tag_id: int
+    tag: int
+    value: str
+
+    @property
+    def tag_name(self) -> str:
+        return normalize_tag_name(tag_id_to_string(self.tag))
+
+
+def _is_guid_tag(tag: int, cache: dict[int, bool]) -> bool:
+    known = cache.get(tag)
+    if known is None:
+        known = cache[tag] = normalize_tag_name(tag_id_to_string(tag)).endswith("_ID")
+    return known
+
+
+def extract_values(pdb: SdbFile) -> Iterator[tuple[int, int, str]]:
+    """Yield ``(tagid, tag, value)`` for the string, GUID and numeric tags of ``pdb``.
+
+    Tags are yielded in document order, leaving out the STRINGTABLE and
+    INDEXES sections; empty strings and unreadable values are skipped.
+    """
+    guid_tags: dict[int, bool] = {}
+    section = SdbGetFirstChild(pdb, TAGID_ROOT)
+    while section != 0:
+        if SdbGetTagFromTagID(pdb, section) not in _SKIPPED_SECTIONS:
+            for event, tagid, _, tag in walk_tags(pdb, section):
+                if event is not LEAF:
+                    continue
+                ttype = tag & TAG_TYPE_MASK
+                if ttype == TAG_TYPE_STRINGREF or ttype == TAG_TYPE_STRING:
+                    value = SdbGetStringTagPtr(pdb, tagid)
+                    if value:
+                        yield tagid, tag, value
+                elif ttype in _NUMBER_READERS:
+                    yield tagid, tag, str(_NUMBER_READERS[ttype](pdb, tagid))
+                elif ttype == TAG_TYPE_BINARY and _is_guid_tag(tag, guid_tags):
+                    try:
+                        data = SdbReadBinaryTag(pdb, tagid)
+                    except ValueError:
+                        continue
+                    if len(data) == 16:
+                        yield tagid, tag, f"{{{UUID(bytes_le=data)}}}"
+        section = SdbGetNextChild(pdb, TAGID_ROOT, section)
+
+
+def connect(corpus_file: str | os.PathLike, create: bool = False) -> sqlite3.Connection:
+    """Open the index ``corpus_file``; with ``create`` it is made if missing.
+
+    Without ``create`` the index is opened read-only.
+    """
+    try:
+        if create:
+            conn = sqlite3.connect(corpus_file)
+        else:
+            uri = Path(corpus_file).resolve().as_uri() + "?mode=ro"
+            conn = sqlite3.connect(uri, uri=True)
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, _FORMAT) or (version == 0 and not create):
+            conn.close()
+            raise ValueError(f"'{corpus_file}' is not an sdbtool index")
+        if create and version == 0:
+            with conn:
+                conn.executescript(_SCHEMA)
+                conn.execute(f"PRAGMA user_version = {_FORMAT}")
+    except sqlite3.Error as e:
+        raise ValueError(f"Failed to open index '{corpus_file}': {e}") from e
+    return conn
+
+
+def _index_file(
+    conn: sqlite3.Connection, path: str, key: tuple, file_id: int | None
+) -> int:
+    """(Re)index ``path`` in one transaction; the number of values, or -1."""
+    size, mtime_ns, database_id = key
+    pdb = SdbOpenDatabase(path, use_mmap=True) if database_id is not None else None
+    with conn:
+        if file_id is not None:
+            conn.execute("DELETE FROM tags WHERE file_id = ?", (file_id,))
+            conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+        cursor = conn.execute(
+            "INSERT INTO files (path, size, mtime_ns, database_id, tags)"
+            " VALUES (?, ?, ?, ?, -1)",
+            (path, size, mtime_ns, database_id),
+        )
+        if pdb is None:
+            return -1
+        file_id = cursor.lastrowid
+        try:
+            rows = (
+                (file_id, tagid, tag, value)
+                for tagid, tag, value in extract_values(pdb)
+            )
+            count = conn.executemany(
+                "INSERT INTO tags (file_id, tagid, tag, value) VALUES (?, ?, ?, ?)",
+                rows,
+            ).rowcount
+        finally:
+            SdbCloseDatabase(pdb)
+        conn.execute("UPDATE files SET tags = ? WHERE id = ?", (count, file_id))
+    return count
+
+
+def build_index(root: str | os.PathLike, corpus_file: str | os.PathLike) -> BuildStats:
+    """Index the ``*.sdb`` files below ``root`` into ``corpus_file``.
+
+    Files indexed before are only read again when they changed; files below
+    ``root`` that are gone are removed from the index. Files outside ``root``
+    are left alone, so one index can collect several directories.
+    """
+    root = os.path.abspath(os.fspath(root))
+    prefix = os.path.join(root, "")
+    stats = BuildStats()
+    conn = connect(corpus_file, create=True)
+    try:
+        known = {
+            path: (file_id, (size, mtime_ns, database_id))
+            for file_id, path, size, mtime_ns, database_id in conn.execute(
+                "SELECT id, path, size, mtime_ns, database_id FROM files"
+            )
+        }
+        seen = set()
+        for path in iter_files(root):
+            if not path.lower().endswith(".sdb"):
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            seen.add(path)
+            probe = SdbProbeDatabase(path)
+            database_id = None if probe is None else probe.database_id or b""
+            key = (st.st_size, st.st_mtime_ns, database_id)
+            file_id, old_key = known.get(path, (None, None))
+            if old_key == key:
+                stats.unchanged += 1
+                continue
+            count = _index_file(conn, path, key, file_id)
+            if count < 0:
+                stats.failed += 1
+            else:
+                stats.values += count
+            if file_id is None:
+                stats.added += 1
+            else:
+                stats.updated += 1
+
+        gone = [
+            file_id
+            for path, (file_id, _) in known.items()
+            if path.startswith(prefix) and path not in seen
+        ]
+        with conn:
+            for file_id in gone:
+                conn.execute("DELETE FROM tags WHERE file_id = ?", (file_id,))
+                conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+        stats.removed = len(gone)
+    except sqlite3.Error as e:
+        raise ValueError(f"Failed to update index '{corpus_file}': {e}") from e
+    finally:
+        conn.close()
+    return stats
+
+
+def _like_pattern(prefix: str) -> str:
+    escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped + "%"
+
+
+def search(
+    corpus_file: str | os.PathLike,
+    value: str,
+    tag: "int | str | None" = None,
+    prefix: bool = False,
+    target_os: str | None = None,
+) -> list[SearchHit]:
+    """The indexed tag values equal to ``value`` (case-insensitive).
+
+    With ``prefix`` values starting with ``value`` match as well. ``tag``
+    (a TAG number, or a name as in the output of ``target_os``, see
+    :func:`~sdbtool.apphelp.tag_ids_for_output_name`) limits the search to
+    that tag. Hits are sorted by file, then tagid.
+    """
+    sql = (
+        "SELECT files.path, tags.tagid, tags.tag, tags.value"
+        " FROM tags JOIN files ON files.id = tags.file_id"
+    )
+    if prefix:
+        sql += " WHERE tags.value LIKE ? ESCAPE '\\'"
+        args: list = [_like_pattern(value)]
+    else:
+        sql += " WHERE tags.value = ?"
+        args = [value]
+    if tag is not None:
+        tags = (
+            tag_ids_for_output_name(tag, target_os) if isinstance(tag, str) else (tag,)
+        )
+        if not tags:
+            raise ValueError(f"Unknown tag name: {tag}")
+        sql += f" AND tags.tag IN ({', '.join('?' * len(tags))})"
+        args.extend(tags)
+    sql += " ORDER BY files.path, tags.tagid"
+    conn = connect(corpus_file)
+    try:
+        return [SearchHit(*row) for row in conn.execute(sql, args)]
+    except sqlite3.Error as e:
+        raise ValueError(f"Failed to search index '{corpus_file}': {e}") from e
+    finally:
+        conn.close()
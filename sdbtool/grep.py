@@ -0,0 +1,244 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     Search the strings of SDB files with a regular expression.
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+
+:func:`grep_file` does not decode the STRING / STRINGREF tags of a database
+one by one. The STRINGTABLE, which holds every string a compiled database
+refers to, is decoded as one blob (every item header and terminating NUL
+turned into a line break) and searched with a single regex pass. Only when
+that finds something is the tag tree walked, once, to map the matched strings
+back to the STRINGREF tags that use them and to their enclosing EXE, SHIM or
+LAYER record. Databases without a STRINGTABLE keep their strings inline in
+STRING tags; those are searched while walking.
+
+Since every string ends with a line break, ``^`` and ``$`` anchor at the
+start and end of a string and ``.`` never runs into the next one. A match
+that runs past the end of its string anyway (e.g. through ``\\s`` or
+``[^a]``) is dropped, and the strings it touched are searched one by one
+instead, so the hits are those of searching every string on its own.
+
+:func:`grep` spreads files over a process pool, largest first, and yields the
+hits of each file as soon as it is done.
+"""
+
+import bisect
+import os
+import re
+import struct
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from sdbtool.apphelp import normalize_tag_name, tag_id_to_string
+from sdbtool.apphelp.sdb_reader import (
+    SdbCloseDatabase,
+    SdbFile,
+    SdbFindFirstTag,
+    SdbGetFirstChild,
+    SdbGetNextChild,
+    SdbGetStringTagPtr,
+    SdbGetTagFromTagID,
+    SdbOpenDatabase,
+    SdbpReadTagHeader,
+    TAG_TYPE_MASK,
+    TAG_TYPE_STRING,
+    TAG_TYPE_STRINGREF,
+    TAGID_NULL,
+    TAGID_ROOT,
+)
+from sdbtool.apphelp.walk import BEGIN, END, LEAF, walk_tags
+
+_TAG_NAME = 0x6001
+_TAG_STRINGTABLE = 0x7801
+_TAG_INDEXES = 0x7802
+_TAG_STRINGTABLE_ITEM = 0x8801
+_SKIPPED_SECTIONS = frozenset({_TAG_STRINGTABLE, _TAG_INDEXES})
+# The records a hit is reported in: SHIM, EXE, LAYER.
+RECORD_TAGS = frozenset({0x7004, 0x7007, 0x700B})
+
+_HEADER_SIZE = 6  # TAG + DWORD size
+# A character outside the BMP: one character, but two UTF-16 code units.
+_ASTRAL = re.compile("[\U00010000-\U0010ffff]")
+_STRINGREF = struct.Struct("<HI")
+
+
+def compile_pattern(pattern: str, ignore_case: bool = False) -> re.Pattern:
+    """Compile ``pattern`` the way :func:`grep_file` expects it."""
+    flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+    try:
+        return re.compile(pattern, flags)
+    except re.error as e:
+        raise ValueError(f"Invalid pattern '{pattern}': {e}") from e
+
+
+def _search_stringtable(pdb: SdbFile, regex: re.Pattern) -> dict[int, str]:
+    """Search the STRINGTABLE of ``pdb``: ``{item tagid: match}``."""
+    table = pdb.stringtable
+    _, size = SdbpReadTagHeader(pdb, table)
+    start = table + _HEADER_SIZE
+    end = min(start + size, pdb.size)
+    blob = bytearray(pdb.view[start:end])
+    # Blank out the item headers, remembering where each string starts / ends
+    # (in characters, without the terminating NUL; every item starts at an
+    # even offset).
+    items, starts, ends = [], [], []
+    pos = 0
+    while pos + _HEADER_SIZE <= len(blob):
+        tag, item_size = _STRINGREF.unpack_from(blob, pos)
+        blob[pos : pos + _HEADER_SIZE] = b"\n\0\n\0\n\0"
+        if (tag & TAG_TYPE_MASK) == TAG_TYPE_STRING:
+            items.append(start + pos)
+            starts.append(pos // 2 + _HEADER_SIZE // 2)
+            ends.append(pos // 2 + _HEADER_SIZE // 2 + max(item_size // 2 - 1, 0))
+        pos += _HEADER_SIZE + ((item_size + 1) & ~1)
+    text = blob.decode("utf-16-le", "replace").replace("\0", "\n")
+    if len(text) != (len(blob) + 1) // 2:
+        # starts / ends count code units: move them back by the surrogate
+        # pairs before them (at code unit ``pairs[k]``).
+        pairs = [m.start() + k for k, m in enumerate(_ASTRAL.finditer(text))]
+        starts = [unit - bisect.bisect_left(pairs, unit) for unit in starts]
+        ends = [unit - bisect.bisect_left(pairs, unit) for unit in ends]
+
+    found: dict[int, str] = {}
+    searched: set[int] = set()  # the items searched on their own
+    for m in regex.finditer(text):
+        first = bisect.bisect_right(starts, m.start()) - 1
+        if first >= 0 and m.end() <= ends[first]:
+            if first not in searched:
+                found.setdefault(items[first], m.group(0))
+            continue
+        # The match runs past the end of a string: search every string it
+        # touched on its own.
+        last = max(bisect.bisect_right(starts, m.end() - 1) - 1, first)
+        for index in range(max(first, 0), last + 1):
+            if index in searched or items[index] in found:
+                continue
+            searched.add(index)
+            retry = regex.search(text[starts[index] : ends[index]])
+            if retry is not None:
+                found[items[index]] = retry.group(0)
+    return found
+
+
+def _record(pdb: SdbFile, tagid: int | None) -> dict | None:
+    if tagid is None:
+        return None
+    name_tag = SdbFindFirstTag(pdb, tagid, _TAG_NAME)
+    return {
+        "tagid": tagid,
+        "tag": normalize_tag_name(tag_id_to_string(SdbGetTagFromTagID(pdb, tagid))),
+        "name": SdbGetStringTagPtr(pdb, name_tag) if name_tag else None,
+    }
+
+
+def _hit(path: str, pdb: SdbFile, tagid: int, tag: int, match: str, record) -> dict:
+    return {
+        "path": path,
+        "tagid": tagid,
+        "tag": normalize_tag_name(tag_id_to_string(tag)),
+        "value": SdbGetStringTagPtr(pdb, tagid),
+        "match": match,
+        "record": _record(pdb, record),
+    }
+
+
+def _grep_database(path: str, pdb: SdbFile, regex: re.Pattern) -> Iterator[dict]:
+    table = pdb.stringtable
+    found = _search_stringtable(pdb, regex) if table != TAGID_NULL else {}
+    if table != TAGID_NULL and not found:
+        return
+    unused = dict(found)
+    section = SdbGetFirstChild(pdb, TAGID_ROOT)
+    while section != TAGID_NULL:
+        if SdbGetTagFromTagID(pdb, section) in _SKIPPED_SECTIONS:
+            section = SdbGetNextChild(pdb, TAGID_ROOT, section)
+            continue
+        records: list[int] = []
+        for event, tagid, _, tag in walk_tags(pdb, section):
+            if event is not LEAF:
+                if tag in RECORD_TAGS:
+                    if event is BEGIN:
+                        records.append(tagid)
+                    elif event is END:
+                        records.pop()
+                continue
+            ttype = tag & TAG_TYPE_MASK
+            if ttype == TAG_TYPE_STRINGREF and found:
+                item = table + _STRINGREF.unpack_from(pdb.view, tagid)[1]
+                match = found.get(item)
+                if match is None:
+                    continue
+                unused.pop(item, None)
+            elif ttype == TAG_TYPE_STRING and table == TAGID_NULL:
+                value = SdbGetStringTagPtr(pdb, tagid)
+                m = regex.search(value) if value else None
+                if m is None:
+                    continue
+                match = m.group(0)
+            else:
+                continue
+            record = records[-1] if records else None
+            yield _hit(path, pdb, tagid, tag, match, record)
+        section = SdbGetNextChild(pdb, TAGID_ROOT, section)
+    # Strings no tag refers to are reported as themselves.
+    for item, match in unused.items():
+        yield _hit(path, pdb, item, _TAG_STRINGTABLE_ITEM, match, None)
+
+
+def iter_grep_file(path: str, regex: re.Pattern) -> Iterator[dict]:
+    """Yield the hits of ``regex`` in the SDB file ``path``.
+
+    A hit is ``{"path", "tagid", "tag", "value", "match", "record"}``, where
+    ``record`` is the innermost enclosing EXE, SHIM or LAYER as ``{"tagid",
+    "tag", "name"}`` (or ``None``). A file that cannot be read yields a single
+    ``{"path": ..., "error": ...}``.
+    """
+    pdb = SdbOpenDatabase(path, use_mmap=True)
+    if pdb is None:
+        yield {"path": path, "error": f"Failed to open database '{path}'"}
+        return
+    try:
+        yield from _grep_database(path, pdb, regex)
+    finally:
+        SdbCloseDatabase(pdb)
+
+
+def grep_file(path: str, regex: re.Pattern) -> list[dict]:
+    """The hits of ``regex`` in ``path``, see :func:`iter_grep_file`."""
+    return list(iter_grep_file(path, regex))
+
+
+def _by_size(paths: Iterable[str]) -> list[str]:
+    def size(path):
+        try:
+            return os.stat(path).st_size
+        except OSError:
+            return 0
+
+    return sorted(paths, key=size, reverse=True)
+
+
+def grep(
+    files: Iterable[str | os.PathLike],
+    pattern: str,
+    jobs: int = 1,
+    ignore_case: bool = False,
+) -> Iterator[dict]:
+    """Yield the hits of ``pattern`` in ``files`` (see :func:`iter_grep_file`).
+
+    With ``jobs`` at most 1 files are searched in order, in this process. Above
+    that, they are searched in that many worker processes, largest first, and
+    the hits of a file are yielded as soon as it is done.
+    """
+    regex = compile_pattern(pattern, ignore_case)
+    paths = [os.fspath(path) for path in files]
+    if jobs <= 1:
+        for path in paths:
+            yield from iter_grep_file(path, regex)
+        return
+
+    with ProcessPoolExecutor(jobs) as pool:
+        futures = [pool.submit(grep_file, path, regex) for path in _by_size(paths)]
+        for future in as_completed(futures):
+            yield from future.result()
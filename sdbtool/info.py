@@ -9,6 +9,7 @@ import os
 from dataclasses import dataclass
 from uuid import UUID
 from sdbtool.apphelp import sdb_reader
+from sdbtool.apphelp.probe import SdbProbeDatabase
 
 DB_INFO_FLAGS_VALID_GUID = 1
 # Always set by the (Win10+) SdbGetDatabaseInformationByName implementation.
@@ -31,26 +32,42 @@ class DatabaseInformation:
     dwRuntimePlatform: int | None
 
 
-def _runtime_platform(pdb: sdb_reader.SdbFile) -> int:
+def _platform_bits(pdb: sdb_reader.SdbFile) -> int:
+    """The RUNTIME_PLATFORM value of the DATABASE, or 0 when absent."""
+    root = sdb_reader.SdbFindFirstTag(pdb, sdb_reader.TAGID_ROOT, _TAG_DATABASE)
+    if root != sdb_reader.TAGID_NULL:
+        tag = sdb_reader.SdbFindFirstTag(pdb, root, _TAG_RUNTIME_PLATFORM)
+        if tag != sdb_reader.TAGID_NULL:
+            return sdb_reader.SdbReadDWORDTag(pdb, tag)
+    return 0
+
+
+def _runtime_platform(value: int) -> int:
     """Reproduce the dwRuntimePlatform value reported by apphelp.dll.
 
     Windows derives this from the DATABASE's RUNTIME_PLATFORM tag, reporting the
     most significant platform bit (e.g. 0x25 -> 4, 0x82 -> 2), and defaults to 4
     (X86_ON_AMD64) when the tag is absent.
     """
-    root = sdb_reader.SdbFindFirstTag(pdb, sdb_reader.TAGID_ROOT, _TAG_DATABASE)
-    bits = 0
-    if root != sdb_reader.TAGID_NULL:
-        tag = sdb_reader.SdbFindFirstTag(pdb, root, _TAG_RUNTIME_PLATFORM)
-        if tag != sdb_reader.TAGID_NULL:
-            bits = sdb_reader.SdbReadDWORDTag(pdb, tag) & _PLATFORM_MASK
+    bits = value & _PLATFORM_MASK
     if not bits:
         return 4
     return 1 << (bits.bit_length() - 1)
 
 
-def get_info(file_name: str | os.PathLike) -> DatabaseInformation:
-    pdb = sdb_reader.SdbOpenDatabase(os.fspath(file_name))
+def get_info(file_name: str | os.PathLike, probe: bool = True) -> DatabaseInformation:
+    """Read the information ``sdbtool info`` shows for ``file_name``.
+
+    By default the file is probed: only the header, the top-level tags and the
+    leading DATABASE children are read (see
+    :func:`~sdbtool.apphelp.probe.SdbProbeDatabase`). ``probe=False`` opens the
+    whole database instead; both report the same values unless the database
+    stores its metadata after its first list.
+    """
+    if probe:
+        pdb = SdbProbeDatabase(os.fspath(file_name))
+    else:
+        pdb = sdb_reader.SdbOpenDatabase(os.fspath(file_name))
     if pdb is None:
         raise ValueError(f"Failed to get database information for '{file_name}'")
 
@@ -66,5 +83,7 @@ def get_info(file_name: str | os.PathLike) -> DatabaseInformation:
         dwMinor=pdb.minor,
         dwFlags=flags,
         Id=id_value,
-        dwRuntimePlatform=_runtime_platform(pdb),
+        dwRuntimePlatform=_runtime_platform(
+            (pdb.runtime_platform or 0) if probe else _platform_bits(pdb)
+        ),
     )
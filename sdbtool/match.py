@@ -0,0 +1,366 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     Find the EXE entries of an SDB file that match an executable.
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+
+Modeled on apphelp's SdbGetMatchingExe. The candidate EXE entries are the ones
+whose NAME is the file name, found through the database's EXE / NAME index
+(see :meth:`SdbDatabase.find_by_index`), plus the EXEs with a wildcard NAME
+(from the EXE / WILDCARD_NAME index). A candidate matches when every one of its
+MATCHING_FILE entries matches: the named file (``*`` is the executable itself,
+anything else is relative to its directory) must exist and every attribute in
+the entry must match the file's attributes (see
+:func:`~sdbtool.apphelp.fileattr.get_file_attributes`):
+
+* ``FROM_*`` attributes are lower bounds and ``UPTO_*`` attributes upper
+  bounds (versions and link dates);
+* strings compare case-insensitively, with ``*`` and ``?`` wildcards;
+* a 0xFFFF part of BIN_FILE_VERSION / BIN_PRODUCT_VERSION matches any value;
+* everything else must be equal.
+"""
+
+import functools
+import os
+import re
+from dataclasses import dataclass, field
+from uuid import UUID
+
+from sdbtool.apphelp import SdbDatabase, Tag, TagType
+from sdbtool.apphelp.fileattr import (
+    ATTRIBUTE_AVAILABLE,
+    TAG_BIN_FILE_VERSION,
+    TAG_BIN_PRODUCT_VERSION,
+    TAG_FROM_BIN_FILE_VERSION,
+    TAG_FROM_BIN_PRODUCT_VERSION,
+    TAG_FROM_FILE_VERSION,
+    TAG_FROM_LINK_DATE,
+    TAG_FROM_PRODUCT_VERSION,
+    TAG_UPTO_BIN_FILE_VERSION,
+    TAG_UPTO_BIN_PRODUCT_VERSION,
+    TAG_UPTO_FILE_VERSION,
+    TAG_UPTO_LINK_DATE,
+    TAG_UPTO_PRODUCT_VERSION,
+    get_file_attributes,
+)
+from sdbtool.apphelp.indexes import SdbGetIndex
+
+TAG_DATABASE = 0x7001
+TAG_EXE = 0x7007
+TAG_MATCHING_FILE = 0x7008
+TAG_SHIM_REF = 0x7009
+TAG_LAYER = 0x700B
+TAG_FLAG_REF = 0x7015
+TAG_NAME = 0x6001
+TAG_VENDOR = 0x6005
+TAG_APP_NAME = 0x6006
+TAG_WILDCARD_NAME = 0x600B
+TAG_EXE_ID = 0x9004
+
+# The references reported for a matched EXE.
+REF_TAGS = {TAG_SHIM_REF: "SHIM_REF", TAG_LAYER: "LAYER", TAG_FLAG_REF: "FLAG_REF"}
+
+_LOWER_BOUNDS = frozenset(
+    {
+        TAG_FROM_BIN_FILE_VERSION,
+        TAG_FROM_BIN_PRODUCT_VERSION,
+        TAG_FROM_FILE_VERSION,
+        TAG_FROM_PRODUCT_VERSION,
+        TAG_FROM_LINK_DATE,
+    }
+)
+_UPPER_BOUNDS = frozenset(
+    {
+        TAG_UPTO_BIN_FILE_VERSION,
+        TAG_UPTO_BIN_PRODUCT_VERSION,
+        TAG_UPTO_FILE_VERSION,
+        TAG_UPTO_PRODUCT_VERSION,
+        TAG_UPTO_LINK_DATE,
+    }
+)
+_MASKED_VERSIONS = frozenset({TAG_BIN_FILE_VERSION, TAG_BIN_PRODUCT_VERSION})
+
+Attributes = dict[int, object]
+
+
+@dataclass
+class ExeRef:
+    """A SHIM_REF, LAYER or FLAG_REF of a matched EXE."""
+
+    kind: str
+    tag_id: int
+    name: str | None
+
+
+@dataclass
+class MatchedExe:
+    """An EXE entry that matches a file."""
+
+    tag_id: int
+    name: str
+    app_name: str | None
+    vendor: str | None
+    exe_id: UUID | None
+    refs: list[ExeRef] = field(default_factory=list)
+
+
+def upper_name(value: str) -> str:
+    """``value`` upper-cased for comparing, unless that changes its length."""
+    upper = value.upper()
+    return upper if len(upper) == len(value) else value
+
+
+@functools.lru_cache(maxsize=1024)
+def _pattern_regex(pattern: str) -> re.Pattern:
+    regex = "".join(
+        ".*" if ch == "*" else "." if ch == "?" else re.escape(ch)
+        for ch in upper_name(pattern)
+    )
+    return re.compile(regex, re.DOTALL)
+
+
+def pattern_match(pattern: str, value: str) -> bool:
+    """Case-insensitive match of ``value`` against ``pattern`` (``*``, ``?``)."""
+    if "*" not in pattern and "?" not in pattern:
+        return upper_name(pattern) == upper_name(value)
+    return _pattern_regex(pattern).fullmatch(upper_name(value)) is not None
+
+
+def version_tuple(value: str) -> tuple[int, ...] | None:
+    """A dotted version string as a tuple of ints, or ``None`` if it is not one."""
+    try:
+        return tuple(int(part) for part in value.strip().split("."))
+    except ValueError:
+        return None
+
+
+def _masked_version_match(expected: int, actual: int) -> bool:
+    for shift in (48, 32, 16, 0):
+        part = (expected >> shift) & 0xFFFF
+        if part != 0xFFFF and part != (actual >> shift) & 0xFFFF:
+            return False
+    return True
+
+
+def attribute_matches(tag: int, expected, actual) -> bool:
+    """Whether a file attribute ``actual`` satisfies the SDB value ``expected``."""
+    if actual is None:
+        return False
+    if isinstance(expected, str):
+        if not isinstance(actual, str):
+            return False
+        if tag in _LOWER_BOUNDS or tag in _UPPER_BOUNDS:
+            expected, actual = version_tuple(expected), version_tuple(actual)
+            if expected is None or actual is None:
+                return False
+        else:
+            return pattern_match(expected, actual)
+    elif isinstance(actual, str):
+        return False
+    if tag in _LOWER_BOUNDS:
+        return actual >= expected
+    if tag in _UPPER_BOUNDS:
+        return actual <= expected
+    if tag in _MASKED_VERSIONS:
+        return _masked_version_match(expected, actual)
+    return actual == expected
+
+
+def attribute_value(tag: Tag):
+    """The value of a MATCHING_FILE attribute tag, or ``None`` if unsupported."""
+    if tag.type == TagType.DWORD:
+        return tag.read_dword()
+    if tag.type == TagType.QWORD:
+        return tag.read_qword()
+    if tag.type == TagType.WORD:
+        return tag.read_word()
+    if tag.type in (TagType.STRING, TagType.STRINGREF):
+        return tag.read_string()
+    return None
+
+
+def first_children(tag: Tag) -> dict[int, Tag]:
+    """The first child of ``tag`` per TAG."""
+    children: dict[int, Tag] = {}
+    for child in tag.tags():
+        children.setdefault(child.tag, child)
+    return children
+
+
+def child_string(children: dict[int, Tag], tag: int) -> str | None:
+    """The string value of the ``tag`` child in ``children``, if there is one."""
+    child = children.get(tag)
+    return child.read_string() if child is not None else None
+
+
+def matching_file_path(name: str, exe_path: str) -> str:
+    """The file a MATCHING_FILE ``name`` refers to, for the executable ``exe_path``."""
+    if name == "*":
+        return exe_path
+    relative = name.replace("\\", os.sep).lstrip(os.sep)
+    return os.path.join(os.path.dirname(exe_path), relative)
+
+
+class FileAttributeCache:
+    """The available attributes of files, read once per file.
+
+    ``max_size`` bounds how many files are kept (oldest first out).
+    """
+
+    def __init__(self, max_size: int | None = None):
+        self.max_size = max_size
+        self._attributes: dict[str, Attributes | None] = {}
+
+    def get(self, path: str) -> Attributes | None:
+        """The available attributes of ``path``, or ``None`` if it is missing."""
+        path = os.path.normcase(os.path.abspath(path))
+        if path not in self._attributes:
+            try:
+                attrs = get_file_attributes(path)
+            except OSError:
+                attrs = None
+            else:
+                attrs = {
+                    attr.tag: attr.value
+                    for attr in attrs
+                    if attr.flags & ATTRIBUTE_AVAILABLE
+                }
+            if self.max_size is not None and len(self._attributes) >= self.max_size:
+                del self._attributes[next(iter(self._attributes))]
+            self._attributes[path] = attrs
+            return attrs
+        return self._attributes[path]
+
+
+class ExeMatcher:
+    """Matches executables against the EXE entries of an open database.
+
+    File attributes are read once per file and kept, so matching many
+    executables that share MATCHING_FILE entries does not re-read them.
+    ``max_cached`` bounds how many files are kept (oldest first out).
+    """
+
+    def __init__(self, db: SdbDatabase, max_cached: int | None = None):
+        self.db = db
+        self.max_cached = max_cached
+        self._files = FileAttributeCache(max_cached)
+        self._names: frozenset[str] | None = None
+        self._wildcards: list[tuple[str, Tag]] | None = None
+
+    def attributes(self, path: str) -> Attributes | None:
+        """The available attributes of ``path``, or ``None`` if it is missing."""
+        return self._files.get(path)
+
+    def _database_exes(self) -> list[Tag]:
+        database = next(
+            (t for t in self.db.root().tags() if t.tag == TAG_DATABASE), None
+        )
+        return (
+            [] if database is None else [t for t in database.tags() if t.tag == TAG_EXE]
+        )
+
+    def _wildcard_exes(self) -> list[tuple[str, Tag]]:
+        """The EXEs with a wildcard NAME, with that NAME."""
+        if self._wildcards is None:
+            handle = self.db._handle
+            index = SdbGetIndex(handle, TAG_EXE, TAG_WILDCARD_NAME)
+            if index is not None:
+                exes = [Tag(self.db, tag_id) for tag_id in index.records(handle)[1]]
+            else:
+                exes = self._database_exes()
+            self._wildcards = []
+            for exe in exes:
+                name = child_string(first_children(exe), TAG_NAME) or ""
+                if exe.tag == TAG_EXE and ("*" in name or "?" in name):
+                    self._wildcards.append((name, exe))
+        return self._wildcards
+
+    def may_match(self, file_name: str) -> bool:
+        """Whether an EXE entry could match ``file_name``, judging by its name only.
+
+        Reads the database, never the file: use it to skip files cheaply.
+        """
+        if self._names is None:
+            names = (
+                child_string(first_children(exe), TAG_NAME)
+                for exe in self._database_exes()
+            )
+            self._names = frozenset(upper_name(name) for name in names if name)
+        name = os.path.basename(file_name)
+        if upper_name(name) in self._names:
+            return True
+        return any(pattern_match(pattern, name) for pattern, _ in self._wildcard_exes())
+
+    def candidates(self, file_name: str) -> list[Tag]:
+        """The EXE entries whose NAME matches the name of ``file_name``."""
+        name = os.path.basename(file_name)
+        exes = {
+            exe.tag_id: exe for exe in self.db.find_by_index(TAG_EXE, TAG_NAME, name)
+        }
+        for pattern, exe in self._wildcard_exes():
+            if exe.tag_id not in exes and pattern_match(pattern, name):
+                exes[exe.tag_id] = exe
+        return [exes[tag_id] for tag_id in sorted(exes)]
+
+    def _file_matches(self, matching_file: Tag, exe_path: str) -> bool:
+        name = None
+        predicates = []
+        for child in matching_file.tags():
+            if child.tag == TAG_NAME:
+                name = child.read_string()
+            elif child.type != TagType.NULL:
+                predicates.append(child)
+        if not name:
+            return False
+        attrs = self.attributes(matching_file_path(name, exe_path))
+        if attrs is None:
+            return False
+        return all(
+            attribute_matches(child.tag, attribute_value(child), attrs.get(child.tag))
+            for child in predicates
+        )
+
+    def match(self, file_name: str | os.PathLike) -> list[MatchedExe]:
+        """The EXE entries matching ``file_name``, in document order."""
+        exe_path = os.path.abspath(os.fspath(file_name))
+        matches = []
+        for exe in self.candidates(exe_path):
+            children = list(exe.tags())
+            if not all(
+                self._file_matches(child, exe_path)
+                for child in children
+                if child.tag == TAG_MATCHING_FILE
+            ):
+                continue
+            first = {}
+            for child in children:
+                first.setdefault(child.tag, child)
+            exe_id = first.get(TAG_EXE_ID)
+            exe_id = exe_id.read_bytes() if exe_id is not None else b""
+            matched = MatchedExe(
+                tag_id=exe.tag_id,
+                name=child_string(first, TAG_NAME) or "",
+                app_name=child_string(first, TAG_APP_NAME),
+                vendor=child_string(first, TAG_VENDOR),
+                exe_id=UUID(bytes_le=exe_id) if len(exe_id) == 16 else None,
+            )
+            for child in children:
+                kind = REF_TAGS.get(child.tag)
+                if kind is not None:
+                    name = child_string(first_children(child), TAG_NAME)
+                    matched.refs.append(ExeRef(kind, child.tag_id, name))
+            matches.append(matched)
+        return matches
+
+
+def get_matching_exes(
+    file_name: str | os.PathLike, sdb_file: str | os.PathLike
+) -> list[MatchedExe]:
+    """The EXE entries of ``sdb_file`` that match the executable ``file_name``."""
+    with SdbDatabase(sdb_file) as db:
+        if not db:
+            raise ValueError(f"Failed to open database '{sdb_file}'")
+        try:
+            return ExeMatcher(db).match(file_name)
+        except OSError as e:
+            raise ValueError(f"Failed to match '{file_name}'") from e
@@ -0,0 +1,419 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     Select tags of an SDB file with a path-like selector.
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+
+A selector is a list of steps from the root of the tag tree, in the spirit of
+XPath::
+
+    DATABASE/EXE[NAME="setup.exe"]/SHIM_REF/NAME
+    //LAYER[NAME~"WIN95"]
+    //MATCHING_FILE[SIZE=2048][COMPANY_NAME]/NAME
+
+* ``/TAG`` selects the children named TAG, ``//TAG`` all descendants named TAG
+  and ``*`` any tag; a leading ``/`` is optional. Tags are named as in the
+  JSON or XML output (``MSI_TRANSFORM``, ``S16BIT_DESCRIPTION``), by their raw
+  name (quoted when it is not a single word: ``//"MSI TRANSFORM"``), or given
+  as a number (e.g. ``0x7007``).
+* ``[CHILD]`` keeps the tags that have a CHILD child, ``[CHILD=value]`` those
+  with a CHILD whose value is ``value``, ``[CHILD!=value]`` those without
+  one and ``[CHILD~"text"]`` those with a CHILD that contains ``text``.
+  Strings (in single or double quotes) compare case-insensitively with the
+  value as written in the output, or with its annotation (so GUIDs can be
+  given as ``"{...}"``); numbers compare with integer values.
+
+:func:`select` evaluates a selector directly on the reader and yields the
+matching tags in document order, as it finds them. A ``/TAG`` step only reads
+the children of the current tags, never their subtrees. For a ``//TAG`` step
+the database's tag index is built (one linear scan), and its
+:meth:`~sdbtool.apphelp.tag_index.TagIndex.contents` tell which lists can hold
+TAG at all: no other subtree is entered.
+The ``write_*`` functions stream the selected tags out, as JSON or XML through
+the visitors of ``sdb2json`` / ``sdb2xml``, or as plain text.
+"""
+
+import re
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+from sdbtool.apphelp import (
+    SdbDatabase,
+    Tag,
+    TagType,
+    TAGID_ROOT,
+    is_excluded,
+    tag_ids_for_output_name,
+)
+from sdbtool.apphelp.sdb_reader import (
+    SdbFile,
+    SdbGetFirstChild,
+    SdbGetNextChild,
+    SdbGetTagFromTagID,
+    TAG_TYPE_LIST,
+    TAG_TYPE_MASK,
+)
+from sdbtool.sdb2json import FilteringVisitor, JsonStreamVisitor
+from sdbtool.sdb2xml import BLOCK_SIZE, XmlAnnotations, XmlTagVisitor
+from sdbtool.writeproxy import WriteProxy
+
+_INTEGER_TYPES = frozenset({TagType.BYTE, TagType.WORD, TagType.DWORD, TagType.QWORD})
+
+_TOKENS = re.compile(
+    r"""\s*(?:
+    (?P<axis>//|/)
+    |(?P<name>\*|\w+)
+    |(?P<open>\[)
+    |(?P<close>\])
+    |(?P<op>!=|=|~)
+    |(?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+    )""",
+    re.VERBOSE,
+)
+_NUMBER = re.compile(r"(?:0[xX][0-9a-fA-F]+|\d+)\Z")
+
+
+@dataclass(frozen=True)
+class Predicate:
+    """A ``[CHILD]`` / ``[CHILD op value]`` condition of a step."""
+
+    tags: frozenset[int]
+    op: str | None = None  # None: CHILD exists
+    value: str | int | None = None
+
+
+@dataclass(frozen=True)
+class Step:
+    """One ``/TAG[...]`` or ``//TAG[...]`` step of a selector."""
+
+    descendants: bool
+    tags: frozenset[int] | None  # None: any tag
+    predicates: tuple[Predicate, ...] = ()
+
+
+def _tokenize(selector: str) -> list[tuple[str, str, int]]:
+    tokens = []
+    pos = 0
+    selector = selector.rstrip()
+    while pos < len(selector):
+        m = _TOKENS.match(selector, pos)
+        if m is None or m.end() == pos:
+            raise ValueError(f"Invalid selector at position {pos}: {selector!r}")
+        kind = m.lastgroup
+        tokens.append((kind, m.group(kind), m.start(kind)))
+        pos = m.end()
+    return tokens
+
+
+def _tag_numbers(name: str, target_os: str | None) -> frozenset[int]:
+    if _NUMBER.match(name):
+        return frozenset({int(name, 0)})
+    tags = tag_ids_for_output_name(name, target_os)
+    if not tags:
+        raise ValueError(f"Unknown tag name: {name}")
+    return frozenset(tags)
+
+
+def _unquote(literal: str) -> str:
+    return re.sub(r"\\(.)", r"\1", literal[1:-1])
+
+
+def parse_selector(selector: str, target_os: str | None = None) -> list[Step]:
+    """Parse ``selector``, naming tags as on ``target_os`` (default: newest).
+
+    Raises ``ValueError`` for a malformed selector or an unknown tag name.
+    """
+    tokens = _tokenize(selector)
+    pos = 0
+
+    def take(*kinds: str) -> str:
+        nonlocal pos
+        if pos >= len(tokens):
+            raise ValueError(f"Unexpected end of selector: {selector!r}")
+        kind, text, at = tokens[pos]
+        if kind not in kinds:
+            raise ValueError(
+                f"Unexpected {text!r} at position {at} of selector {selector!r}"
+            )
+        pos += 1
+        return text
+
+    def peek() -> str | None:
+        return tokens[pos][0] if pos < len(tokens) else None
+
+    def tag_name() -> str:
+        name = take("name", "string")
+        return _unquote(name) if name[:1] in "\"'" else name
+
+    steps = []
+    while True:
+        descendants = False
+        if peek() == "axis":
+            descendants = take("axis") == "//"
+        elif steps:
+            take("axis")
+        if peek() == "name":
+            name = take("name")
+            tags = None if name == "*" else _tag_numbers(name, target_os)
+        else:
+            tags = _tag_numbers(tag_name(), target_os)
+        predicates = []
+        while peek() == "open":
+            take("open")
+            child = _tag_numbers(tag_name(), target_os)
+            if peek() == "op":
+                op = take("op")
+                literal = take("name", "string")
+                if literal[:1] in "\"'":
+                    value: str | int = _unquote(literal)
+                elif _NUMBER.match(literal):
+                    if op == "~":
+                        raise ValueError(f"'~' needs a string in selector {selector!r}")
+                    value = int(literal, 0)
+                else:
+                    raise ValueError(
+                        f"Expected a string or a number, not {literal!r}"
+                        f" in selector {selector!r}"
+                    )
+                predicates.append(Predicate(child, op, value))
+            else:
+                predicates.append(Predicate(child))
+            take("close")
+        steps.append(Step(descendants, tags, tuple(predicates)))
+        if peek() is None:
+            return steps
+
+
+def _children(pdb: SdbFile, parent: int, tag: int) -> Iterator[tuple[int, int]]:
+    """``(tagid, tag)`` of the children of ``parent`` (whose TAG is ``tag``)."""
+    if parent != TAGID_ROOT and (tag & TAG_TYPE_MASK) != TAG_TYPE_LIST:
+        return
+    index = pdb.index
+    if index is not None:
+        for child in index.children(parent):
+            yield child, index.get_tag(child)
+        return
+    child = SdbGetFirstChild(pdb, parent)
+    while child != 0:
+        yield child, SdbGetTagFromTagID(pdb, child)
+        child = SdbGetNextChild(pdb, parent, child)
+
+
+def _descendants(
+    pdb: SdbFile, parent: int, tag: int, wanted: frozenset[int] | None
+) -> Iterator[tuple[int, int]]:
+    """``(tagid, tag)`` of the descendants of ``parent``, in document order.
+
+    With the tag index built, lists that cannot hold a ``wanted`` tag are
+    yielded but not entered.
+    """
+    contents = pdb.index.contents() if pdb.index is not None else None
+    stack = [_children(pdb, parent, tag)]
+    while stack:
+        for child, child_tag in stack[-1]:
+            yield child, child_tag
+            if (child_tag & TAG_TYPE_MASK) != TAG_TYPE_LIST:
+                continue
+            if contents is not None and wanted is not None:
+                if wanted.isdisjoint(contents.get(child_tag, ())):
+                    continue
+            stack.append(_children(pdb, child, child_tag))
+            break
+        else:
+            stack.pop()
+
+
+def _value_matches(child: Tag, op: str, expected: str | int) -> bool:
+    if child.type in (TagType.LIST, TagType.NULL):
+        return False
+    if isinstance(expected, int):
+        if child.type not in _INTEGER_TYPES:
+            return False
+        value, _ = child.info.decode(child)
+        return int(value) == expected
+    value, comment = child.info.decode(child)
+    expected = expected.casefold()
+    texts = (value, comment) if comment is not None else (value,)
+    if op == "~":
+        return any(expected in text.casefold() for text in texts)
+    return any(expected == text.casefold() for text in texts)
+
+
+def _predicates_match(db: SdbDatabase, tagid: int, tag: int, step: Step) -> bool:
+    handle = db.handle
+    for predicate in step.predicates:
+        children = [
+            Tag(db, child, child_tag)
+            for child, child_tag in _children(handle, tagid, tag)
+            if child_tag in predicate.tags
+        ]
+        if predicate.op is None:
+            found = bool(children)
+        else:
+            op = "=" if predicate.op == "!=" else predicate.op
+            found = any(_value_matches(c, op, predicate.value) for c in children)
+            if predicate.op == "!=":
+                found = not found
+        if not found:
+            return False
+    return True
+
+
+def _apply(
+    db: SdbDatabase, contexts: Iterable[tuple[int, int]], step: Step
+) -> Iterator[tuple[int, int]]:
+    handle = db.handle
+    # Nested contexts of a // step find the same tags again; report them once.
+    seen: set[int] = set()
+    for parent, parent_tag in contexts:
+        if step.descendants:
+            found = _descendants(handle, parent, parent_tag, step.tags)
+        else:
+            found = _children(handle, parent, parent_tag)
+        for tagid, tag in found:
+            if step.tags is not None and tag not in step.tags:
+                continue
+            if step.descendants:
+                if tagid in seen:
+                    continue
+                seen.add(tagid)
+            if _predicates_match(db, tagid, tag, step):
+                yield tagid, tag
+
+
+def select(db: SdbDatabase, selector: str | list[Step]) -> Iterator[Tag]:
+    """Yield the tags of ``db`` selected by ``selector``, in document order.
+
+    ``selector`` is a selector string (parsed with the database's target OS) or
+    the result of :func:`parse_selector`.
+    """
+    if db.handle is None:
+        raise ValueError("Database handle is not initialized")
+    steps = (
+        parse_selector(selector, db.target_os)
+        if isinstance(selector, str)
+        else selector
+    )
+    if any(step.descendants and step.tags is not None for step in steps):
+        db.index()  # tells _descendants which subtrees to skip
+    found: Iterable[tuple[int, int]] = [(TAGID_ROOT, 0)]
+    for step in steps:
+        found = _apply(db, found, step)
+    for tagid, tag in found:
+        yield Tag(db, tagid, tag)
+
+
+def write_json(
+    db: SdbDatabase,
+    tags: Iterable[Tag],
+    output_stream,
+    exclude_tags: list[str],
+    with_annotations: bool,
+    with_tagid: bool,
+    with_tag: bool,
+) -> int:
+    """Write ``tags`` (and their subtrees) as the children of an sdb2json document.
+
+    The output is what ``json.dump(..., indent=2)`` would write for the whole
+    document, but every tag is written as soon as it is selected. Returns the
+    number of tags written.
+    """
+
+    out = WriteProxy(output_stream)
+    visitor = JsonStreamVisitor(
+        out,
+        db.name,
+        with_annotations=with_annotations,
+        with_tagid=with_tagid,
+        with_tag=with_tag,
+    )
+    filtering = FilteringVisitor(visitor, exclude_tags)
+    excluded = db.exclusions(exclude_tags)
+    root = db.root()
+    visitor.visit_list_begin(root)
+    count = 0
+    for tag in tags:
+        if is_excluded(tag.name, exclude_tags):
+            continue
+        tag.accept(filtering, excluded)
+        count += 1
+    visitor.visit_list_end(root)
+    out.write("\n")
+    return count
+
+
+def write_xml(
+    db: SdbDatabase,
+    tags: Iterable[Tag],
+    output_stream,
+    exclude_tags: list[str],
+    with_annotations: bool,
+    with_tagid: bool,
+    with_tag: bool,
+) -> int:
+    """Write ``tags`` (and their subtrees) as the children of an sdb2xml document.
+
+    Returns the number of tags written.
+    """
+    visitor = XmlTagVisitor(
+        output_stream,
+        db.name,
+        exclude_tags,
+        XmlAnnotations.Comment if with_annotations else XmlAnnotations.Disabled,
+        with_tagid=with_tagid,
+        with_tag=with_tag,
+        block_size=BLOCK_SIZE,
+    )
+    excluded = db.exclusions(exclude_tags)
+    root = db.root()
+    visitor.visit_list_begin(root)
+    count = 0
+    for tag in tags:
+        if is_excluded(tag.name, exclude_tags):
+            continue
+        tag.accept(visitor, excluded)
+        count += 1
+    visitor.visit_list_end(root)
+    visitor.writer.flush()
+    return count
+
+
+def write_text(
+    db: SdbDatabase,
+    tags: Iterable[Tag],
+    output_stream,
+    exclude_tags: list[str],
+    with_annotations: bool,
+    with_tagid: bool,
+    with_tag: bool,
+) -> int:
+    """Write one line per tag: its value, or its name for a list or NULL tag.
+
+    Tags named in ``exclude_tags`` are left out (their subtrees are not
+    written in any format).
+
+    Returns the number of tags written.
+    """
+    out = WriteProxy(output_stream)
+    count = 0
+    for tag in tags:
+        if is_excluded(tag.name, exclude_tags):
+            continue
+        info = tag.info
+        if info.type in (TagType.LIST, TagType.NULL):
+            line = info.normalized
+        else:
+            value, comment = info.decode(tag)
+            line = value
+            if with_annotations and comment is not None:
+                line += f" ({comment})"
+        if with_tag:
+            line = f"0x{tag.tag:x} {line}"
+        if with_tagid:
+            line = f"{tag.tag_id} {line}"
+        out.write(line + "\n")
+        count += 1
+    return count
+
+
+FORMATS = {"json": write_json, "xml": write_xml, "text": write_text}
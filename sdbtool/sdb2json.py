@@ -10,101 +10,405 @@ from sdbtool.apphelp import (
     TagVisitor,
     TagType,
     Tag,
-    tag_value_to_string,
     is_excluded,
-    normalize_tag_name,
+    tag_info,
+    TAG_TYPE_JSON_NAMES,
+    TAGID_ROOT,
 )
 from sdbtool.writeproxy import WriteProxy
 import json
+from json.encoder import encode_basestring_ascii
 
 
 def tagtype_to_jsontype(tag_type: TagType) -> str | None:
-    tagtype_map = {
-        TagType.BYTE: "byte",
-        TagType.WORD: "word",
-        TagType.DWORD: "dword",
-        TagType.QWORD: "qword",
-        TagType.STRINGREF: "string",
-        TagType.STRING: "string",
-        TagType.BINARY: "binary",
-    }
-    return tagtype_map.get(tag_type, None)
-
-
-class JsonTagVisitor(TagVisitor):
+    return TAG_TYPE_JSON_NAMES.get(tag_type, None)
+
+
+# The JSON types of the integer tags (compared by name: hashing TagType is slow).
+_INTEGER_TYPES = frozenset(("byte", "word", "dword", "qword"))
+# Larger integers lose precision in JavaScript (and other double-based) readers.
+_MAX_SAFE_INTEGER = 2**53
+
+
+def _typed_value(json_type: str, value: str):
+    """The decoded ``value`` as a JSON number if it is an integer tag that fits one."""
+    if json_type in _INTEGER_TYPES:
+        number = int(value)
+        if number <= _MAX_SAFE_INTEGER:
+            return number
+    return value
+
+
+class _JsonNodes(TagVisitor):
+    """The JSON objects of tags, shared by the tree and the streaming visitor."""
+
     def __init__(
         self,
         input_filename: str,
         with_annotations: bool,
         with_tagid: bool,
         with_tag: bool,
+        typed_values: bool = False,
     ):
         self._with_annotations = with_annotations
         self._with_tagid = with_tagid
         self._with_tag = with_tag
+        self._typed_values = typed_values
         self._root_meta: dict = {"file": input_filename}
-        self._top_children: list = []
-        # Dummy root keeps the stack non-empty so visit/visit_list_begin can
-        # always do _stack[-1]["children"].append(...) without an empty-stack check.
-        self._stack: list[dict] = [{"children": self._top_children}]
 
-    def visit_list_begin(self, tag: Tag):
-        if tag.tag_id == 0:
-            # Root SDB node - its attributes go on the root dict itself
-            if self._with_tagid:
-                self._root_meta["tagid"] = tag.tag_id
-            if self._with_tag:
-                self._root_meta["tag_num"] = f"0x{tag.tag:x}"
-            return
+    def _add_root_meta(self, tag: Tag):
+        # Root SDB node - its attributes go on the root dict itself
+        if self._with_tagid:
+            self._root_meta["tagid"] = tag.tag_id
+        if self._with_tag:
+            self._root_meta["tag_num"] = f"0x{tag.tag:x}"
 
-        node: dict = {"tag": normalize_tag_name(tag.name)}
+    def _list_node(self, tag: Tag) -> dict:
+        """The object of a LIST tag, without its "children"."""
+        node: dict = {"tag": tag_info(tag).normalized}
         if self._with_tagid:
             node["tagid"] = tag.tag_id
         if self._with_tag:
             node["tag_num"] = f"0x{tag.tag:x}"
-        node["children"] = []
-        self._stack[-1]["children"].append(node)
-        self._stack.append(node)
-
-    def visit_list_end(self, tag: Tag):
-        if tag.tag_id == 0:
-            return
-        self._stack.pop()
+        return node
 
-    def visit(self, tag: Tag):
-        if tag.type == TagType.NULL:
-            node: dict = {"tag": normalize_tag_name(tag.name), "type": "null"}
+    def _leaf_node(self, tag: Tag) -> dict:
+        info = tag_info(tag)
+        if info.type == TagType.NULL:
+            node: dict = {"tag": info.normalized, "type": "null"}
             if self._with_tagid:
                 node["tagid"] = tag.tag_id
             if self._with_tag:
                 node["tag_num"] = f"0x{tag.tag:x}"
-            self._stack[-1]["children"].append(node)
-            return
+            return node
 
-        typename = tagtype_to_jsontype(tag.type)
+        typename = info.json_type
         if typename is None:
             raise ValueError(
                 f"Unknown json tag type: {tag.type.name} for tag {tag.name}"
             )
 
-        value, comment = tag_value_to_string(tag)
-        node = {"tag": normalize_tag_name(tag.name), "type": typename, "value": value}
+        value, comment = info.decode(tag)
+        if self._typed_values:
+            value = _typed_value(typename, value)
+        node = {"tag": info.normalized, "type": typename, "value": value}
         if self._with_tagid:
             node["tagid"] = tag.tag_id
         if self._with_tag:
             node["tag_num"] = f"0x{tag.tag:x}"
         if self._with_annotations and comment is not None:
             node["comment"] = comment
+        return node
+
+
+class JsonTagVisitor(_JsonNodes):
+    """Builds the document as dicts and lists, see :meth:`result`."""
+
+    def __init__(
+        self,
+        input_filename: str,
+        with_annotations: bool,
+        with_tagid: bool,
+        with_tag: bool,
+        typed_values: bool = False,
+    ):
+        super().__init__(
+            input_filename, with_annotations, with_tagid, with_tag, typed_values
+        )
+        self._top_children: list = []
+        # Dummy root keeps the stack non-empty so visit/visit_list_begin can
+        # always do _stack[-1]["children"].append(...) without an empty-stack check.
+        self._stack: list[dict] = [{"children": self._top_children}]
+
+    def visit_list_begin(self, tag: Tag):
+        if tag.tag_id == 0:
+            self._add_root_meta(tag)
+            return
+
+        node = self._list_node(tag)
+        node["children"] = []
         self._stack[-1]["children"].append(node)
+        self._stack.append(node)
+
+    def visit_list_end(self, tag: Tag):
+        if tag.tag_id == 0:
+            return
+        self._stack.pop()
+
+    def visit(self, tag: Tag):
+        self._stack[-1]["children"].append(self._leaf_node(tag))
 
     def result(self) -> dict:
         return {**self._root_meta, "children": self._top_children}
 
 
-class _FilteringVisitor(TagVisitor):
-    """Wraps JsonTagVisitor to apply tag exclusion."""
+# json.dump(..., indent=2) indents the items of a "children" array by this much
+# more than the object that holds it.
+_ITEM_INDENT = " " * 4
+
+
+def _dumps(node: dict) -> str:
+    """``json.dumps(node, indent=2)``; objects of scalars skip the slow encoder."""
+    parts = []
+    for key, value in node.items():
+        if type(value) is str:
+            text = encode_basestring_ascii(value)
+        elif type(value) is int:
+            text = int.__repr__(value)
+        elif value is None or isinstance(value, (int, float)):
+            text = json.dumps(value)
+        else:
+            return json.dumps(node, indent=2)
+        parts.append(f"{encode_basestring_ascii(key)}: {text}")
+    if not parts:
+        return "{}"
+    return "{\n  " + ",\n  ".join(parts) + "\n}"
+
+
+def _dumps_open(node: dict) -> str:
+    """``node`` with "children" as json.dump writes it, up to the array's "["."""
+    return _dumps({**node, "children": []})[: -len("]\n}")]
 
-    def __init__(self, inner: JsonTagVisitor, exclude_tags: list[str]):
+
+class JsonStreamVisitor(_JsonNodes):
+    """Writes the document while visiting, exactly as JsonTagVisitor + json.dump would.
+
+    Only the open lists are kept (whether they have children yet), so memory
+    does not grow with the size of the database. Call :meth:`finish` after
+    the root to end the document.
+
+    With ``depth`` > 0 the visited tags are written as the items of a
+    "children" array that deep in the document (the top-level tags are at
+    depth 1), each preceded by its separator: "\\n" and its indentation for
+    the first item, ",\\n" for the next ones.
+    """
+
+    def __init__(
+        self,
+        output_stream,
+        input_filename: str,
+        with_annotations: bool,
+        with_tagid: bool,
+        with_tag: bool,
+        typed_values: bool = False,
+        depth: int = 0,
+    ):
+        super().__init__(
+            input_filename, with_annotations, with_tagid, with_tag, typed_values
+        )
+        self._write = output_stream.write
+        self._depth = depth
+        # Per open list: whether an item was written to it yet.
+        self._has_items: list[bool] = [False] if depth else []
+        self._started = depth > 0
+
+    def _item(self, text: str):
+        indent = _ITEM_INDENT * self._depth
+        self._write(",\n" if self._has_items[-1] else "\n")
+        self._write(indent)
+        self._write(text.replace("\n", "\n" + indent))
+        self._has_items[-1] = True
+
+    def visit_list_begin(self, tag: Tag):
+        if tag.tag_id == 0:
+            self._add_root_meta(tag)
+            self._write(_dumps_open(self._root_meta))
+            self._started = True
+        else:
+            self._item(_dumps_open(self._list_node(tag)))
+        self._has_items.append(False)
+        self._depth += 1
+
+    def visit_list_end(self, tag: Tag):
+        self._depth -= 1
+        indent = _ITEM_INDENT * self._depth
+        if self._has_items.pop():
+            self._write(f"\n{indent}  ]")
+        else:
+            self._write("]")
+        self._write(f"\n{indent}}}")
+
+    def visit(self, tag: Tag):
+        self._item(_dumps(self._leaf_node(tag)))
+
+    def finish(self):
+        """End the document; writes the empty one if the root was not visited."""
+        if not self._started:
+            self._write(_dumps({**self._root_meta, "children": []}))
+            self._started = True
+
+
+# The chunked visitors write their output in pieces of about this many characters.
+_CHUNK = 1 << 16
+
+# Serialize a value as JSON without any whitespace.
+compact_dumps = json.JSONEncoder(separators=(",", ":")).encode
+
+
+class _ChunkedOutput:
+    """Collects the many small pieces of output and writes them in large chunks."""
+
+    def __init__(self, output_stream, flush_stream: bool = False):
+        self._write = output_stream.write
+        self._flush = getattr(output_stream, "flush", None) if flush_stream else None
+        self._chunk: list[str] = []
+        self._chunk_size = 0
+
+    def write(self, text: str):
+        self._chunk.append(text)
+        self._chunk_size += len(text)
+        if self._chunk_size >= _CHUNK:
+            self.flush()
+
+    def flush(self):
+        if self._chunk:
+            self._write("".join(self._chunk))
+            self._chunk.clear()
+            self._chunk_size = 0
+        if self._flush is not None:
+            self._flush()
+
+
+class CompactJsonVisitor(_JsonNodes):
+    """Writes the document as ``json.dump(..., separators=(",", ":"))`` would.
+
+    Every object is encoded by the C encoder in one call and the output is
+    written in large chunks. Call :meth:`finish` after the root to end the
+    document. With ``fragment`` the visited tags are written as the items of
+    an array, separated by ",".
+    """
+
+    def __init__(
+        self,
+        output_stream,
+        input_filename: str,
+        with_annotations: bool,
+        with_tagid: bool,
+        with_tag: bool,
+        typed_values: bool = False,
+        fragment: bool = False,
+    ):
+        super().__init__(
+            input_filename, with_annotations, with_tagid, with_tag, typed_values
+        )
+        self._out = _ChunkedOutput(output_stream)
+        # Per open list: whether an item was written to it yet.
+        self._has_items: list[bool] = [False] if fragment else []
+        self._started = fragment
+
+    def _item(self, text: str):
+        if self._has_items[-1]:
+            self._out.write(",")
+        self._out.write(text)
+        self._has_items[-1] = True
+
+    @staticmethod
+    def _open(node: dict) -> str:
+        # Up to and including the "[" of "children".
+        return compact_dumps({**node, "children": []})[: -len("]}")]
+
+    def visit_list_begin(self, tag: Tag):
+        if tag.tag_id == 0:
+            self._add_root_meta(tag)
+            self._out.write(self._open(self._root_meta))
+            self._started = True
+        else:
+            self._item(self._open(self._list_node(tag)))
+        self._has_items.append(False)
+
+    def visit_list_end(self, tag: Tag):
+        self._has_items.pop()
+        self._out.write("]}")
+
+    def visit(self, tag: Tag):
+        self._item(compact_dumps(self._leaf_node(tag)))
+
+    def finish(self):
+        """End the document (the empty one if the root was not visited)."""
+        if not self._started:
+            self._out.write(compact_dumps({**self._root_meta, "children": []}))
+            self._started = True
+        self._out.flush()
+
+
+class NdjsonTagVisitor(TagVisitor):
+    """Writes one JSON object per tag and line (JSON Lines).
+
+    A record has the tagid, the tagid of the parent list (0 for the top-level
+    tags), the depth (1 for the top-level tags), tag number, name, type and
+    value of a tag; LIST and NULL tags have a null value. With annotations it
+    also has the comment. The root itself has no record. With ``typed_values``
+    integers are numbers, see :func:`convert`.
+
+    Lines are collected and written in chunks that end at a line break, each
+    followed by a flush, so a reader of the stream never sees a partial line.
+    Call :meth:`flush` at the end.
+    """
+
+    def __init__(
+        self,
+        output_stream,
+        with_annotations: bool,
+        typed_values: bool = False,
+        parents=(TAGID_ROOT,),
+    ):
+        self._out = _ChunkedOutput(output_stream, flush_stream=True)
+        self._with_annotations = with_annotations
+        self._typed_values = typed_values
+        self._parents = list(parents)
+
+    def _record(self, tag: Tag, typename: str, value, comment):
+        record = {
+            "tagid": tag.tag_id,
+            "parent": self._parents[-1],
+            "depth": len(self._parents),
+            "tag_num": f"0x{tag.tag:x}",
+            "tag": tag_info(tag).normalized,
+            "type": typename,
+            "value": value,
+        }
+        if self._with_annotations:
+            record["comment"] = comment
+        self.write_fragment(json.dumps(record) + "\n")
+
+    def write_fragment(self, lines: str):
+        """Add ``lines``, whole records rendered by another visitor, to the output."""
+        self._out.write(lines)
+
+    def flush(self):
+        self._out.flush()
+
+    def visit_list_begin(self, tag: Tag):
+        if tag.tag_id == TAGID_ROOT:
+            return
+        self._record(tag, "list", None, None)
+        self._parents.append(tag.tag_id)
+
+    def visit_list_end(self, tag: Tag):
+        if tag.tag_id == TAGID_ROOT:
+            return
+        self._parents.pop()
+
+    def visit(self, tag: Tag):
+        info = tag_info(tag)
+        if info.type == TagType.NULL:
+            self._record(tag, "null", None, None)
+            return
+        typename = info.json_type
+        if typename is None:
+            raise ValueError(
+                f"Unknown json tag type: {tag.type.name} for tag {tag.name}"
+            )
+        value, comment = info.decode(tag)
+        if self._typed_values:
+            value = _typed_value(typename, value)
+        self._record(tag, typename, value, comment)
+
+
+class FilteringVisitor(TagVisitor):
+    """Wraps a JSON visitor to apply tag exclusion."""
+
+    def __init__(self, inner: TagVisitor, exclude_tags: list[str]):
         self._inner = inner
         self._exclude_tags = set(exclude_tags)
         self._skip_depth = 0
@@ -138,21 +442,85 @@ def convert(
     with_annotations: bool,
     with_tagid: bool,
     with_tag: bool,
+    jobs: int = 1,
+    compact: bool = False,
+    typed_values: bool = False,
 ):
-    visitor = JsonTagVisitor(
+    """Write ``db`` as one JSON document.
+
+    By default the document is indented by 2 and every value is a string. With
+    ``compact`` it has no whitespace at all; with ``typed_values`` BYTE, WORD,
+    DWORD and QWORD values are JSON numbers, except QWORDs above 2**53.
+    """
+    if jobs > 1:
+        # Render the children of the top-level lists in worker processes.
+        from sdbtool.shard import convert_json
+
+        return convert_json(
+            db,
+            output_stream,
+            exclude_tags,
+            with_annotations,
+            with_tagid,
+            with_tag,
+            jobs,
+            compact=compact,
+            typed_values=typed_values,
+        )
+
+    root = db.root()
+    if root is None:
+        raise RuntimeError("Failed to get root tag from database.")
+    if compact:
+        visitor = CompactJsonVisitor(
+            output_stream,
+            db.name,
+            with_annotations=with_annotations,
+            with_tagid=with_tagid,
+            with_tag=with_tag,
+            typed_values=typed_values,
+        )
+        root.accept(
+            FilteringVisitor(visitor, exclude_tags), db.exclusions(exclude_tags)
+        )
+        visitor.finish()
+        output_stream.write("\n")
+        return
+    # The visitor writes a fragment per tag; on a Click LazyFile every write
+    # pays __getattr__ indirection, so resolve .write once via WriteProxy.
+    out = WriteProxy(output_stream)
+    visitor = JsonStreamVisitor(
+        out,
         db.name,
         with_annotations=with_annotations,
         with_tagid=with_tagid,
         with_tag=with_tag,
+        typed_values=typed_values,
     )
+    root.accept(FilteringVisitor(visitor, exclude_tags), db.exclusions(exclude_tags))
+    visitor.finish()
+    out.write("\n")
+
+
+def convert_ndjson(
+    db: SdbDatabase,
+    output_stream,
+    exclude_tags: list[str],
+    with_annotations: bool,
+    jobs: int = 1,
+    typed_values: bool = False,
+):
+    """Write the tags of ``db`` as JSON Lines, see :class:`NdjsonTagVisitor`."""
+    if jobs > 1:
+        from sdbtool.shard import convert_ndjson as sharded
+
+        return sharded(
+            db, output_stream, exclude_tags, with_annotations, jobs, typed_values
+        )
+
     root = db.root()
     if root is None:
         raise RuntimeError("Failed to get root tag from database.")
-    root.accept(_FilteringVisitor(visitor, exclude_tags))
-    # json.dump with indent=2 uses the pure-Python encoder, which emits millions
-    # of tiny writes; on a Click LazyFile each pays __getattr__ indirection,
-    # dominating the runtime. Resolve .write once via WriteProxy so the output
-    # still streams (no full-document buffer) but skips that per-fragment cost.
-    out = WriteProxy(output_stream)
-    json.dump(visitor.result(), out, indent=2)
-    out.write("\n")
+    visitor = NdjsonTagVisitor(output_stream, with_annotations, typed_values)
+    root.accept(FilteringVisitor(visitor, exclude_tags), db.exclusions(exclude_tags))
+    visitor.flush()
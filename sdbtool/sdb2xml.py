@@ -10,14 +10,28 @@ from sdbtool.apphelp import (
     TagVisitor,
     TagType,
     Tag,
-    tag_value_to_string,
     is_excluded,
-    xml_tag_name,
+    tag_info,
+    TAG_TYPE_XML_NAMES,
 )
 from sdbtool.xml import XmlWriter
-from sdbtool.writeproxy import WriteProxy
 import enum
 
+# convert() collects the output and writes it in blocks of this many characters.
+BLOCK_SIZE = 1 << 16
+
+# The values of these types are numbers or base64: nothing to escape.
+_UNESCAPED_TYPES = frozenset(
+    TAG_TYPE_XML_NAMES[tag_type]
+    for tag_type in (
+        TagType.BYTE,
+        TagType.WORD,
+        TagType.DWORD,
+        TagType.QWORD,
+        TagType.BINARY,
+    )
+)
+
 
 class XmlAnnotations(enum.Enum):
     Disabled = enum.auto()
@@ -25,16 +39,7 @@ class XmlAnnotations(enum.Enum):
 
 
 def tagtype_to_xmltype(tag_type: TagType) -> str | None:
-    tagtype_map = {
-        TagType.BYTE: "xs:byte",
-        TagType.WORD: "xs:unsignedShort",
-        TagType.DWORD: "xs:unsignedInt",
-        TagType.QWORD: "xs:unsignedLong",
-        TagType.STRINGREF: "xs:string",
-        TagType.STRING: "xs:string",
-        TagType.BINARY: "xs:base64Binary",
-    }
-    return tagtype_map.get(tag_type, None)
+    return TAG_TYPE_XML_NAMES.get(tag_type, None)
 
 
 class XmlTagVisitor(TagVisitor):
@@ -46,10 +51,18 @@ class XmlTagVisitor(TagVisitor):
         annotations: XmlAnnotations,
         with_tagid: bool,
         with_tag: bool,
+        depth: int = 0,
+        block_size: int = 0,
     ):
-        """Initialize the XML tag visitor with a filename."""
-        self.writer = XmlWriter(stream)
-        self._first = True
+        """Initialize the XML tag visitor with a filename.
+
+        With ``depth`` the visited tags are written as elements nested that deep
+        in a document, without the XML declaration and root element. With
+        ``block_size`` the output is written in blocks, see :class:`XmlWriter`;
+        call ``writer.flush()`` at the end.
+        """
+        self.writer = XmlWriter(stream, depth, block_size)
+        self._first = depth == 0
         self._input_filename = input_filename
         self._exclude_tags = set(exclude_tags)
         self._annotations = annotations
@@ -76,7 +89,7 @@ class XmlTagVisitor(TagVisitor):
                 attrs["tagid"] = f"{tag.tag_id}"
             if self._with_tag:
                 attrs["tag"] = f"0x{tag.tag:x}"
-        self.writer.open(xml_tag_name(tag.name), attrs)
+        self.writer.open(tag_info(tag).xml_name, attrs)
 
     def visit_list_end(self, tag: Tag):
         """Visit the end of a list tag."""
@@ -84,7 +97,7 @@ class XmlTagVisitor(TagVisitor):
             if is_excluded(tag.name, self._exclude_tags):
                 self._skip_depth -= 1
             return
-        self.writer.close(xml_tag_name(tag.name))
+        self.writer.close(tag_info(tag).xml_name)
 
     def visit(self, tag: Tag):
         """Visit a tag."""
@@ -99,12 +112,13 @@ class XmlTagVisitor(TagVisitor):
         if self._with_tag:
             ids["tag"] = f"0x{tag.tag:x}"
 
-        name = xml_tag_name(tag.name)
-        if tag.type == TagType.NULL:
+        info = tag_info(tag)
+        name = info.xml_name
+        if info.type == TagType.NULL:
             self.writer.empty_tag(name, ids)
             return
 
-        typename = tagtype_to_xmltype(tag.type)
+        typename = info.xml_type
         if typename is None:
             raise ValueError(
                 f"Unknown xml tag type: {tag.type.name} for tag {tag.name}"
@@ -117,8 +131,12 @@ class XmlTagVisitor(TagVisitor):
         self.writer.close(name)
 
     def _write_tag_value(self, tag: Tag):
-        value, comment = tag_value_to_string(tag)
-        self.writer.write(value)
+        info = tag_info(tag)
+        value, comment = info.decode(tag)
+        if info.xml_type in _UNESCAPED_TYPES:
+            self.writer.write_unescaped(value)
+        else:
+            self.writer.write(value)
         if self._annotations == XmlAnnotations.Comment and comment is not None:
             self.writer.write_comment(comment)
 
@@ -130,21 +148,30 @@ def convert(
     annotations: XmlAnnotations,
     with_tagid: bool,
     with_tag: bool,
+    jobs: int = 1,
 ):
-    # XmlWriter emits many small writes; sending each straight to a Click
-    # LazyFile pays __getattr__ indirection per fragment and dominates the
-    # runtime. Resolve .write once via WriteProxy so output keeps streaming
-    # (no full-document buffer) but skips that per-fragment cost.
+    if jobs > 1:
+        # Render the children of the top-level lists in worker processes.
+        from sdbtool.shard import convert_xml
+
+        return convert_xml(
+            db, output_stream, exclude_tags, annotations, with_tagid, with_tag, jobs
+        )
+
+    # XmlWriter renders many small pieces; collect them and write in blocks,
+    # so the text layer (or a Click LazyFile) is called once per block.
     visitor = XmlTagVisitor(
-        WriteProxy(output_stream),
+        output_stream,
         db.name,
         exclude_tags,
         annotations,
         with_tagid=with_tagid,
         with_tag=with_tag,
+        block_size=BLOCK_SIZE,
     )
     root = db.root()
     assert (
         root is not None
     ), "This is impossible, otherwise the previous exception would have been raised."
-    root.accept(visitor)
+    root.accept(visitor, db.exclusions(exclude_tags))
+    visitor.writer.flush()
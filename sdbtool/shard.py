@@ -0,0 +1,346 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     Convert one SDB file to XML / JSON on several cores.
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+
+Nearly all of a database sits in the children of its few top-level lists
+(DATABASE, STRINGTABLE, INDEXES), and those children are independent of each
+other. :func:`convert_xml`, :func:`convert_json` and :func:`convert_ndjson`
+split the children of every top-level list into contiguous tagid ranges and render each range in a
+worker process; the workers open the file memory-mapped, so they share its
+pages. The main process writes the rest of the document and the rendered
+ranges in order, exactly as the serial converters in :mod:`sdbtool.sdb2xml`
+and :mod:`sdbtool.sdb2json` would: the output is byte-identical.
+
+A range is rendered as the text it takes in the full document: XML at the
+nesting depth of the list's children, JSON as its array items, each indented
+as ``json.dump(..., indent=2)`` indents them there, JSON Lines as its records.
+"""
+
+import io
+import json
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from sdbtool.apphelp import (
+    ExcludedTags,
+    PathType,
+    SdbDatabase,
+    Tag,
+    TagType,
+    is_excluded,
+)
+from sdbtool.apphelp.sdb_reader import (
+    SdbGetFirstChild,
+    SdbGetNextChild,
+    SdbpReadTagHeader,
+    TAGID_NULL,
+    TAGID_ROOT,
+)
+from sdbtool.sdb2json import (
+    CompactJsonVisitor,
+    FilteringVisitor,
+    JsonStreamVisitor,
+    JsonTagVisitor,
+    NdjsonTagVisitor,
+    compact_dumps,
+)
+from sdbtool.sdb2xml import BLOCK_SIZE, XmlAnnotations, XmlTagVisitor
+from sdbtool.writeproxy import WriteProxy
+
+# Ranges per worker and top-level list: a few, so a slow range does not leave
+# the other workers idle at the end.
+_RANGES_PER_JOB = 4
+_LIST_HEADER = 6  # TAG + DWORD size
+
+# The children of a top-level list are the items of the "children" array at
+# depth 2 of the JSON document; its "]" is indented like the list's keys.
+_JSON_ITEM_DEPTH = 2
+_JSON_CLOSE_INDENT = " " * 6
+
+# A range of children: (parent list, first child, end offset).
+Shard = tuple[int, int, int]
+
+# The database, options and compiled exclusions (options[0]) of a pool
+# worker, set up by _init_worker.
+_worker_db: SdbDatabase | None = None
+_worker_options: tuple = ()
+_worker_excluded: ExcludedTags | None = None
+
+
+def _shards(db: SdbDatabase, parent: int, count: int) -> list[Shard]:
+    """Split the children of ``parent`` into up to ``count`` ranges of about equal size."""
+    pdb = db.handle
+    _, data_size = SdbpReadTagHeader(pdb, parent)
+    end = min(pdb.size, parent + _LIST_HEADER + data_size)
+    children = []
+    child = SdbGetFirstChild(pdb, parent)
+    while child != TAGID_NULL:
+        children.append(child)
+        child = SdbGetNextChild(pdb, parent, child)
+    if not children:
+        return []
+    target = (end - children[0]) / count
+    starts = [children[0]]
+    for child in children[1:]:
+        if child - starts[-1] >= target:
+            starts.append(child)
+    return [(parent, start, stop) for start, stop in zip(starts, [*starts[1:], end])]
+
+
+def _shard_tags(db: SdbDatabase, shard: Shard):
+    parent, child, end = shard
+    pdb = db.handle
+    while child != TAGID_NULL and child < end:
+        yield Tag(db, child)
+        child = SdbGetNextChild(pdb, parent, child)
+
+
+def _top_level(db: SdbDatabase, exclude_tags: set[str], jobs: int):
+    """Yield ``(tag, shards)`` for the top-level tags; ``shards`` is None if not split."""
+    pdb = db.handle
+    # With the root excluded nothing is written at all.
+    split = not is_excluded(db.root().name, exclude_tags)
+    tagid = SdbGetFirstChild(pdb, TAGID_ROOT)
+    while tagid != TAGID_NULL:
+        tag = Tag(db, tagid)
+        shards = None
+        if (
+            split
+            and tag.type == TagType.LIST
+            and not is_excluded(tag.name, exclude_tags)
+        ):
+            shards = _shards(db, tagid, jobs * _RANGES_PER_JOB) or None
+        yield tag, shards
+        tagid = SdbGetNextChild(pdb, TAGID_ROOT, tagid)
+
+
+def _all_shards(top_level) -> list[Shard]:
+    return [shard for _, shards in top_level if shards for shard in shards]
+
+
+def _init_worker(path: str, path_type: PathType, target_os, options: tuple) -> None:
+    global _worker_db, _worker_options, _worker_excluded
+    _worker_db = SdbDatabase(path, path_type, use_mmap=True)
+    _worker_db.target_os = target_os
+    _worker_options = options
+    _worker_excluded = _worker_db.exclusions(options[0])
+
+
+def _pool(db: SdbDatabase, jobs: int, options: tuple) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        jobs,
+        initializer=_init_worker,
+        initargs=(str(db.path), db.path_type, db.target_os, options),
+    )
+
+
+def _render_xml(shard: Shard) -> str:
+    exclude_tags, annotations, with_tagid, with_tag = _worker_options
+    out = io.StringIO()
+    visitor = XmlTagVisitor(
+        out,
+        _worker_db.name,
+        exclude_tags,
+        annotations,
+        with_tagid=with_tagid,
+        with_tag=with_tag,
+        depth=2,
+    )
+    for tag in _shard_tags(_worker_db, shard):
+        tag.accept(visitor, _worker_excluded)
+    return out.getvalue()
+
+
+def _render_json(shard: Shard) -> str:
+    exclude_tags, with_annotations, with_tagid, with_tag, compact, typed_values = (
+        _worker_options
+    )
+    out = io.StringIO()
+    options = dict(
+        with_annotations=with_annotations,
+        with_tagid=with_tagid,
+        with_tag=with_tag,
+        typed_values=typed_values,
+    )
+    if compact:
+        visitor = CompactJsonVisitor(out, _worker_db.name, **options, fragment=True)
+    else:
+        visitor = JsonStreamVisitor(
+            out, _worker_db.name, **options, depth=_JSON_ITEM_DEPTH
+        )
+    filtering = FilteringVisitor(visitor, exclude_tags)
+    for tag in _shard_tags(_worker_db, shard):
+        tag.accept(filtering, _worker_excluded)
+    if compact:
+        visitor.finish()
+    return out.getvalue()
+
+
+def _render_ndjson(shard: Shard) -> str:
+    exclude_tags, with_annotations, typed_values = _worker_options
+    out = io.StringIO()
+    visitor = NdjsonTagVisitor(
+        out, with_annotations, typed_values, parents=(TAGID_ROOT, shard[0])
+    )
+    filtering = FilteringVisitor(visitor, exclude_tags)
+    for tag in _shard_tags(_worker_db, shard):
+        tag.accept(filtering, _worker_excluded)
+    visitor.flush()
+    return out.getvalue()
+
+
+def convert_xml(
+    db: SdbDatabase,
+    output_stream,
+    exclude_tags: list[str],
+    annotations: XmlAnnotations,
+    with_tagid: bool,
+    with_tag: bool,
+    jobs: int,
+):
+    """:func:`sdbtool.sdb2xml.convert` in ``jobs`` worker processes."""
+    visitor = XmlTagVisitor(
+        output_stream,
+        db.name,
+        exclude_tags,
+        annotations,
+        with_tagid=with_tagid,
+        with_tag=with_tag,
+        block_size=BLOCK_SIZE,
+    )
+    root = db.root()
+    if root is None:
+        raise ValueError("Database handle is not initialized")
+    exclude = set(exclude_tags)
+    excluded = db.exclusions(exclude_tags)
+    options = (exclude_tags, annotations, with_tagid, with_tag)
+    top_level = list(_top_level(db, exclude, jobs))
+    with _pool(db, jobs, options) as pool:
+        fragments = pool.map(_render_xml, _all_shards(top_level))
+        visitor.visit_list_begin(root)
+        for tag, shards in top_level:
+            if shards is None:
+                tag.accept(visitor, excluded)
+                continue
+            visitor.visit_list_begin(tag)
+            for _ in shards:
+                visitor.writer.write_fragment(next(fragments))
+            visitor.visit_list_end(tag)
+        visitor.visit_list_end(root)
+    visitor.writer.flush()
+
+
+def convert_json(
+    db: SdbDatabase,
+    output_stream,
+    exclude_tags: list[str],
+    with_annotations: bool,
+    with_tagid: bool,
+    with_tag: bool,
+    jobs: int,
+    compact: bool = False,
+    typed_values: bool = False,
+):
+    """:func:`sdbtool.sdb2json.convert` in ``jobs`` worker processes."""
+
+    def visitor() -> JsonTagVisitor:
+        return JsonTagVisitor(
+            db.name,
+            with_annotations=with_annotations,
+            with_tagid=with_tagid,
+            with_tag=with_tag,
+            typed_values=typed_values,
+        )
+
+    root = db.root()
+    if root is None:
+        raise ValueError("Database handle is not initialized")
+    exclude = set(exclude_tags)
+    excluded = db.exclusions(exclude_tags)
+    # The document without the children of the split lists; in their place a
+    # unique string marks where the rendered ranges go.
+    head = visitor()
+    filtering = FilteringVisitor(head, exclude_tags)
+    filtering.visit_list_begin(root)
+    top_children = head.result()["children"]
+    top_level = list(_top_level(db, exclude, jobs))
+    split = []
+    for tag, shards in top_level:
+        if shards is None:
+            tag.accept(filtering, excluded)
+            continue
+        nodes = visitor()
+        nodes.visit_list_begin(tag)
+        nodes.visit_list_end(tag)
+        (node,) = nodes.result()["children"]
+        node["children"] = marker = f"<sdbtool shard {uuid.uuid4()}>"
+        top_children.append(node)
+        split.append((json.dumps(marker), shards))
+    filtering.visit_list_end(root)
+    if compact:
+        rest = compact_dumps(head.result())
+        close = "]"
+    else:
+        rest = json.dumps(head.result(), indent=2)
+        close = f"\n{_JSON_CLOSE_INDENT}]"
+
+    out = WriteProxy(output_stream)
+    options = (
+        exclude_tags,
+        with_annotations,
+        with_tagid,
+        with_tag,
+        compact,
+        typed_values,
+    )
+    with _pool(db, jobs, options) as pool:
+        fragments = pool.map(_render_json, _all_shards(top_level))
+        for marker, shards in split:
+            before, rest = rest.split(marker, 1)
+            out.write(before)
+            out.write("[")
+            written = False
+            for _ in shards:
+                # Each fragment starts with the separator of its first item.
+                fragment = next(fragments)
+                if fragment:
+                    out.write("," if written else "")
+                    out.write(fragment)
+                    written = True
+            out.write(close if written else "]")
+    out.write(rest)
+    out.write("\n")
+
+
+def convert_ndjson(
+    db: SdbDatabase,
+    output_stream,
+    exclude_tags: list[str],
+    with_annotations: bool,
+    jobs: int,
+    typed_values: bool = False,
+):
+    """:func:`sdbtool.sdb2json.convert_ndjson` in ``jobs`` worker processes."""
+    root = db.root()
+    if root is None:
+        raise ValueError("Database handle is not initialized")
+    visitor = NdjsonTagVisitor(output_stream, with_annotations, typed_values)
+    filtering = FilteringVisitor(visitor, exclude_tags)
+    top_level = list(_top_level(db, set(exclude_tags), jobs))
+    excluded = db.exclusions(exclude_tags)
+    options = (exclude_tags, with_annotations, typed_values)
+    with _pool(db, jobs, options) as pool:
+        fragments = pool.map(_render_ndjson, _all_shards(top_level))
+        filtering.visit_list_begin(root)
+        for tag, shards in top_level:
+            if shards is None:
+                tag.accept(filtering, excluded)
+                continue
+            visitor.visit_list_begin(tag)
+            for _ in shards:
+                visitor.write_fragment(next(fragments))
+            visitor.visit_list_end(tag)
+        filtering.visit_list_end(root)
+    visitor.flush()
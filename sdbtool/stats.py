@@ -0,0 +1,169 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     Tag and size statistics of an SDB file.
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+
+:func:`collect_stats` makes one linear pass over the tags of a database,
+decoding only tag headers: no :class:`~sdbtool.apphelp.Tag` objects, no values.
+Tags are enumerated by :func:`~sdbtool.apphelp.walk.walk_tags`, and sized like
+``_sdbp_get_tag_size``: header plus data, padded to a WORD.
+"""
+
+import heapq
+import os
+from dataclasses import dataclass, field
+
+from sdbtool.apphelp import normalize_tag_name, tag_id_to_string
+from sdbtool.apphelp.sdb_reader import (
+    SdbCloseDatabase,
+    SdbFile,
+    SdbOpenDatabase,
+    SdbpReadTagHeader,
+    TAG_NULL,
+    TAG_TYPE_BINARY,
+    TAG_TYPE_MASK,
+    TAG_TYPE_STRINGREF,
+    TAGID_ROOT,
+    _FIXED_SIZES,
+    _SIZEOF_DWORD,
+    _SIZEOF_TAG,
+)
+from sdbtool.apphelp.walk import END, walk_tags
+
+_TAG_STRINGTABLE = 0x7801
+_TAG_STRINGTABLE_ITEM = 0x8801
+_LIST_HEADER = _SIZEOF_TAG + _SIZEOF_DWORD
+
+# Largest BINARY tags kept by default.
+TOP_BINARIES = 10
+
+
+@dataclass
+class DatabaseStats:
+    """The statistics of one database (see :func:`collect_stats`)."""
+
+    size: int  # of the file, including the 12-byte header
+    tags: int = 0
+    # TAG -> [count, on-disk bytes]; the bytes of a list include its children.
+    by_tag: dict[int, list[int]] = field(default_factory=dict)
+    # Tags per depth, as in TagIndex.depths: top-level tags (DATABASE,
+    # STRINGTABLE, ...) are depth 1; depth 0 is the root, which is no tag.
+    depths: list[int] = field(default_factory=list)
+    stringtable_bytes: int = 0
+    strings: int = 0  # STRINGTABLE_ITEM tags
+    unique_strings: int = 0
+    duplicate_string_bytes: int = 0  # on-disk bytes of the repeated items
+    # (tagid, TAG, data size) of the largest BINARY tags, largest first.
+    largest_binaries: list[tuple[int, int, int]] = field(default_factory=list)
+
+    @property
+    def duplicate_ratio(self) -> float:
+        """The share of STRINGTABLE items that repeat an earlier one."""
+        if not self.strings:
+            return 0.0
+        return (self.strings - self.unique_strings) / self.strings
+
+    def as_dict(self, target_os: str | None = None) -> dict:
+        """The statistics as JSON-ready data, with tag names for ``target_os``."""
+
+        def name(tag: int) -> str:
+            return normalize_tag_name(tag_id_to_string(tag, target_os))
+
+        return {
+            "size": self.size,
+            "tags": self.tags,
+            "by_tag": [
+                {"tag": name(tag), "tag_num": f"0x{tag:x}", "count": n, "bytes": b}
+                for tag, (n, b) in sorted_by_size(self.by_tag)
+            ],
+            "depths": self.depths,
+            "stringtable": {
+                "bytes": self.stringtable_bytes,
+                "strings": self.strings,
+                "unique": self.unique_strings,
+                "duplicate_ratio": round(self.duplicate_ratio, 4),
+                "duplicate_bytes": self.duplicate_string_bytes,
+            },
+            "largest_binaries": [
+                {"tagid": tagid, "tag": name(tag), "tag_num": f"0x{tag:x}", "size": n}
+                for tagid, tag, n in self.largest_binaries
+            ],
+        }
+
+
+def sorted_by_size(by_tag: dict[int, list[int]]) -> list[tuple[int, list[int]]]:
+    """``by_tag`` items, largest total first (then by TAG)."""
+    return sorted(by_tag.items(), key=lambda item: (-item[1][1], item[0]))
+
+
+def collect_stats(pdb: SdbFile, top: int = TOP_BINARIES) -> DatabaseStats:
+    """Count and size every tag of ``pdb`` in one pass.
+
+    ``top`` is the number of largest BINARY tags to keep.
+    """
+    stats = DatabaseStats(pdb.size)
+    read_header = SdbpReadTagHeader
+    view = pdb.view
+    by_tag = stats.by_tag
+    depths = stats.depths
+    binaries: list[tuple[int, int, int, int]] = []  # min-heap of the largest
+    seen_strings: set[bytes] = set()
+
+    for event, tagid, depth, tag in walk_tags(pdb):
+        if event is END or tagid == TAGID_ROOT:
+            continue
+        ttype = tag & TAG_TYPE_MASK
+        if ttype == TAG_NULL:
+            data_size = tag_size = 0
+        elif ttype <= TAG_TYPE_STRINGREF:
+            data_size = _FIXED_SIZES[(ttype >> 12) - 1]
+            tag_size = ((data_size + 1) & ~1) + _SIZEOF_TAG
+        else:
+            _, data_size = read_header(pdb, tagid)
+            tag_size = ((data_size + 1) & ~1) + _LIST_HEADER
+
+        counts = by_tag.get(tag)
+        if counts is None:
+            by_tag[tag] = [1, tag_size]
+        else:
+            counts[0] += 1
+            counts[1] += tag_size
+        while depth >= len(depths):
+            depths.append(0)
+        depths[depth] += 1
+
+        if ttype == TAG_TYPE_BINARY and top > 0:
+            entry = (data_size, -tagid, tagid, tag)
+            if len(binaries) < top:
+                heapq.heappush(binaries, entry)
+            elif entry > binaries[0]:
+                heapq.heapreplace(binaries, entry)
+        elif tag == _TAG_STRINGTABLE_ITEM:
+            stats.strings += 1
+            start = tagid + _LIST_HEADER
+            data = bytes(view[start : min(pdb.size, start + data_size)])
+            if data in seen_strings:
+                stats.duplicate_string_bytes += tag_size
+            else:
+                seen_strings.add(data)
+
+    stats.tags = sum(depths)
+    stats.stringtable_bytes = by_tag.get(_TAG_STRINGTABLE, (0, 0))[1]
+    stats.unique_strings = len(seen_strings)
+    stats.largest_binaries = [
+        (tagid, tag, data_size)
+        for data_size, _, tagid, tag in sorted(binaries, reverse=True)
+    ]
+    return stats
+
+
+def get_stats(file_name: str | os.PathLike, top: int = TOP_BINARIES) -> DatabaseStats:
+    """:func:`collect_stats` of the SDB file ``file_name``."""
+    pdb = SdbOpenDatabase(os.fspath(file_name), use_mmap=True)
+    if pdb is None:
+        raise ValueError(f"Failed to open database '{file_name}'")
+    try:
+        return collect_stats(pdb, top)
+    finally:
+        SdbCloseDatabase(pdb)
@@ -5,35 +5,81 @@ PURPOSE:     Simple streaming Xml writer
 COPYRIGHT:   Copyright 2025 Mark Jansen <mark.jansen@reactos.org>
 """
 
+import io
+import re
 from xml.sax.saxutils import escape, quoteattr
 
 INDENT_DEPTH = 2  # Number of spaces for each indentation level in XML output
 
+# Characters that quoteattr would replace or that change how it quotes.
+_ATTR_SPECIAL = re.compile("[&<>\"'\n\r\t]")
+
+# "\n" and the indentation of every level, built once.
+_INDENTS = ["\n" + " " * (level * INDENT_DEPTH) for level in range(32)]
+
+
+def _newline_indent(level: int) -> str:
+    while level >= len(_INDENTS):
+        _INDENTS.append("\n" + " " * (len(_INDENTS) * INDENT_DEPTH))
+    return _INDENTS[level]
+
+
+def _attributes(attrib) -> str:
+    if not attrib:
+        return ""
+    return "".join(
+        (
+            f" {key}={quoteattr(value)}"
+            if _ATTR_SPECIAL.search(value)
+            else f' {key}="{value}"'
+        )
+        for key, value in attrib.items()
+    )
+
 
 class XmlWriter:
-    def __init__(self, stream):
+    def __init__(self, stream, indent_level: int = 0, block_size: int = 0):
+        """Write to ``stream``, with elements nested ``indent_level`` deep.
+
+        With ``block_size`` the output is collected and written to ``stream``
+        in blocks of about that many characters, encoded to UTF-8 if it is a
+        binary stream; call :meth:`flush` at the end. Without it every piece
+        is written to ``stream`` right away.
+        """
         self._stream = stream
-        self._indent_level = 0
+        self._indent_level = indent_level
         self._indent_on_close = False
+        self._block_size = block_size
+        self._binary = isinstance(stream, (io.RawIOBase, io.BufferedIOBase))
+        if block_size:
+            self._buffer = io.StringIO()
+            self._write = self._buffer.write
+        else:
+            self._write = stream.write
+
+    def _end_of_element(self):
+        # Checked once per element rather than once per piece.
+        if self._block_size and self._buffer.tell() >= self._block_size:
+            self.flush()
+
+    def flush(self):
+        """Write the collected output to the stream."""
+        if not self._block_size or not self._buffer.tell():
+            return
+        text = self._buffer.getvalue()
+        self._stream.write(text.encode("utf-8") if self._binary else text)
+        self._buffer.seek(0)
+        self._buffer.truncate()
 
     def write_xml_declaration(self):
         """Write the XML declaration at the start of the document."""
-        self._stream.write('<?xml version="1.0" encoding="utf-8" standalone="yes"?>')
-
-    def _indent(self):
-        """Return the indentation string for the given level."""
-        self._stream.write("\n")
-        self._stream.write(" " * (self._indent_level * INDENT_DEPTH))
+        self._write('<?xml version="1.0" encoding="utf-8" standalone="yes"?>')
 
     def open(self, name, attrib=None):
         """Open an XML tag with the given name and attributes."""
-        self._indent()
-        self._stream.write(f"<{name}")
-        if attrib:
-            for key, value in attrib.items():
-                self._stream.write(f" {key}={quoteattr(value)}")
-        self._stream.write(">")
-
+        self._write(
+            f"{_newline_indent(self._indent_level)}<{name}{_attributes(attrib)}>"
+        )
         self._indent_level += 1
         self._indent_on_close = False
 
@@ -41,24 +87,35 @@ class XmlWriter:
         """Close an XML tag with the given name."""
         self._indent_level -= 1
         if self._indent_on_close:
-            self._indent()
-        self._stream.write(f"</{name}>")
+            self._write(f"{_newline_indent(self._indent_level)}</{name}>")
+        else:
+            self._write(f"</{name}>")
         self._indent_on_close = True
+        self._end_of_element()
 
     def empty_tag(self, name, attrib=None):
         """Write an empty XML tag with the given name and attributes."""
-        self._indent()
-        self._stream.write(f"<{name}")
-        if attrib:
-            for key, value in attrib.items():
-                self._stream.write(f" {key}={quoteattr(value)}")
-        self._stream.write(" />")
+        self._write(
+            f"{_newline_indent(self._indent_level)}<{name}{_attributes(attrib)} />"
+        )
         self._indent_on_close = True
+        self._end_of_element()
 
     def write(self, text):
         """Write text content to the XML stream."""
-        self._stream.write(escape(text))
+        self._write(escape(text))
+
+    def write_unescaped(self, text):
+        """Write text content that cannot need escaping, such as numbers or base64."""
+        self._write(text)
+
+    def write_fragment(self, text):
+        """Write elements rendered by another writer at the current indent level."""
+        if text:
+            self._write(text)
+            self._indent_on_close = True
+            self._end_of_element()
 
     def write_comment(self, comment):
         """Write a comment to the XML stream."""
-        self._stream.write(f"<!-- {escape(comment)} -->")
+        self._write(f"<!-- {escape(comment)} -->")
@@ -0,0 +1,45 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     shared test fixtures.
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+"""
+
+import os
+import shutil
+import tempfile
+
+import pytest
+from sdbtool.apphelp import tags
+from sdbtool.apphelp.cache import CACHE_DIR_ENV
+
+_session_cache: str | None = None
+
+
+def pytest_configure(config):
+    # Test modules may look up tag names while they are collected, before any
+    # fixture runs: point those at a throwaway directory as well.
+    global _session_cache
+    _session_cache = tempfile.mkdtemp(prefix="sdbtool-cache-")
+    os.environ[CACHE_DIR_ENV] = _session_cache
+    tags._CACHE_FILE = os.path.join(_session_cache, "tags.cache")
+
+
+def pytest_unconfigure(config):
+    if _session_cache is not None:
+        shutil.rmtree(_session_cache, ignore_errors=True)
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path_factory, monkeypatch):
+    """A private, not yet created cache directory for every test.
+
+    Keeps the tests (and the interpreters they start) out of the user's real
+    cache directory. Outside ``tmp_path``, so it never shows up in a tree
+    that a test scans.
+    """
+    folder = tmp_path_factory.mktemp("cache") / "sdbtool"
+    monkeypatch.setenv(CACHE_DIR_ENV, str(folder))
+    # Resolved when sdbtool.apphelp.tags was imported.
+    monkeypatch.setattr(tags, "_CACHE_FILE", str(folder / "tags.cache"))
+    return folder
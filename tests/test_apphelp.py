@@ -10,6 +10,8 @@ from sdbtool.apphelp import (
     SdbDatabase,
     PathType,
     Tag,
+    Tags,
+    TagType,
     tag_value_to_string,
     tag_id_to_string,
     is_excluded,
@@ -205,3 +207,141 @@ def test_guid_comment_survives_paren_name():
 
     value, comment = tag_value_to_string(FakeBinaryTag())
     assert comment is not None and comment.startswith("{") and comment.endswith("}")
+
+
+def test_database_mmap_lifetime():
+    from pathlib import Path
+
+    path = Path(__file__).parent / "data" / "app_x32.sdb"
+    with SdbDatabase(path, use_mmap=True) as db:
+        handle = db._handle
+        assert handle is not None and handle.is_mapped
+        names = [tag.name for tag in db.root().tags()]
+        assert names == ["INDEXES", "DATABASE", "STRINGTABLE"]
+    # Closing the database releases the mapping and the cached root.
+    assert not db and db.root() is None
+    assert not handle.is_mapped
+
+
+def test_database_string_cache():
+    from pathlib import Path
+
+    path = Path(__file__).parent / "data" / "app_x32.sdb"
+    with SdbDatabase(path, eager_strings=True) as db:
+        cache = db.string_cache
+        assert cache is not None and cache.eager and len(cache) > 0
+        database = [t for t in db.root().tags() if t.name == "DATABASE"][0]
+        vendors = [
+            child.read_string()
+            for exe in database.tags()
+            if exe.name == "EXE"
+            for child in exe.tags()
+            if child.name == "VENDOR"
+        ]
+        assert vendors == ["vendor", "vendor", "<Unknown>"]
+        assert vendors[0] is vendors[1]  # one shared, interned string
+        assert cache.misses == 0 and cache.hits >= 3
+    assert db.string_cache is None
+    with SdbDatabase(path, string_cache_size=0) as db:
+        assert db.string_cache.maxsize == 0
+
+
+def test_tag_info_is_shared():
+    from pathlib import Path
+    from sdbtool.apphelp import TagInfo, get_tag_info
+
+    path = Path(__file__).parent / "data" / "all_tagtypes.sdb"
+    with SdbDatabase(path) as db, SdbDatabase(path, target_os="0501") as xp:
+        infos = {}
+        for _, _, _, tag in db.walk():
+            assert not hasattr(tag, "__dict__")
+            info = infos.setdefault(tag.tag, tag.info)
+            assert tag.info is info
+            assert isinstance(info, TagInfo)
+            assert info.name == tag.name
+            assert info.normalized == normalize_tag_name(tag.name)
+            assert info.xml_name == xml_tag_name(tag.name)
+        assert len(infos) > 1
+        assert get_tag_info(Tags.DATABASE) is infos[Tags.DATABASE]
+        with pytest.raises(AttributeError, match="read-only"):
+            infos[Tags.DATABASE].name = "CHANGED"
+        with pytest.raises(AttributeError, match="read-only"):
+            del infos[Tags.DATABASE].decode
+        assert get_tag_info(Tags.DATABASE).name == "DATABASE"
+
+        # Per target OS: the same tag number may carry a different name.
+        xp_tag = next(tag for _, _, _, tag in xp.walk() if tag.tag == 0x4023)
+        assert xp_tag.info is not get_tag_info(0x4023)
+        assert xp_tag.name == tag_id_to_string(0x4023, "0501")
+
+
+def test_target_os_after_open():
+    from pathlib import Path
+
+    path = Path(__file__).parent / "data" / "all_tagtypes.sdb"
+    with SdbDatabase(path) as db:
+        tag = next(tag for _, _, _, tag in db.walk() if tag.tag == 0x4023)
+        assert tag.name == tag_id_to_string(0x4023)
+        # How the CLIs apply --target-os: after the newest table is in use.
+        db.target_os = "0501"
+        assert db.target_os == "0501"
+        tag = next(tag for _, _, _, tag in db.walk() if tag.tag == 0x4023)
+        assert tag.name == tag_id_to_string(0x4023, "0501") == "OS_PLATFORM"
+
+
+def test_tag_info_setters():
+    from pathlib import Path
+
+    with SdbDatabase(Path(__file__).parent / "data" / "app_x32.sdb") as db:
+        database = next(t for t in db.root().tags() if t.name == "DATABASE")
+        other = next(t for t in db.root().tags() if t.name == "DATABASE")
+        database.name = "RENAMED"
+        assert database.name == "RENAMED" and database.info.normalized == "RENAMED"
+        assert database.type == TagType.LIST
+        assert other.name == "DATABASE"  # the shared record is untouched
+
+
+def test_tag_tables_match_fallback():
+    from sdbtool.apphelp.tags import _table
+
+    def reference(tag, version):
+        # The original per-call forward fallback.
+        for newer in KNOWN_VERSIONS[KNOWN_VERSIONS.index(version) :]:
+            name = _table(newer).get(tag)
+            if name is not None:
+                return name
+        return f"InvalidTag_0x{tag:04X}"
+
+    for version in KNOWN_VERSIONS:
+        for tag in range(0x10000):
+            assert tag_id_to_string(tag, version) == reference(tag, version)
+
+
+def test_tag_ids_for_name():
+    from sdbtool.apphelp import tag_ids_for_name
+
+    assert tag_ids_for_name("DATABASE") == (Tags.DATABASE,)
+    assert tag_ids_for_name("GUEST_TARGET_PLATFORM") == (0x4023,)
+    assert tag_ids_for_name("OS_PLATFORM", "0501") == (0x4023,)
+    assert tag_ids_for_name("OS_PLATFORM") == ()
+    assert tag_ids_for_name("NO_SUCH_TAG") == ()
+    assert tag_ids_for_name("InvalidTag_0x1000") == (0x1000,)
+    assert tag_ids_for_name("InvalidTag_0x1001") == ()  # that is INCLUDE
+    assert tag_ids_for_name("InvalidTag_0xZZZZ") == ()
+    # A few tags were renumbered; older targets resolve both numbers by name.
+    assert len(tag_ids_for_name("URL", "0501")) == 2
+    for version in KNOWN_VERSIONS:
+        for tag in (0x1001, 0x4023, 0x7007, 0x9004):
+            name = tag_id_to_string(tag, version)
+            assert tag in tag_ids_for_name(name, version)
+
+
+def test_tag_ids_for_output_name():
+    from sdbtool.apphelp import tag_ids_for_output_name
+
+    assert tag_ids_for_output_name("DATABASE") == (Tags.DATABASE,)
+    assert tag_ids_for_output_name("MSI_TRANSFORM", "0501") == (0x7010,)
+    assert tag_ids_for_output_name("MSI TRANSFORM", "0501") == (0x7010,)
+    assert tag_ids_for_output_name("S16BIT_DESCRIPTION") == (0x6017,)
+    assert tag_ids_for_output_name("16BIT_DESCRIPTION") == (0x6017,)
+    assert tag_ids_for_output_name("NO_SUCH_TAG") == ()
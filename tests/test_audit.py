@@ -0,0 +1,115 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     tests for the directory audit.
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+"""
+
+import itertools
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+from sdbtool import audit as audit_module
+from sdbtool.apphelp import SdbDatabase
+from sdbtool.audit import audit, audit_file
+from sdbtool.cli import sdbtool_command
+from sdbtool.compiled_match import matcher_cache_path
+from sdbtool.match import ExeMatcher, FileAttributeCache
+
+TESTDATA_FOLDER = Path(__file__).parent / "data"
+APP_X32 = TESTDATA_FOLDER / "app_x32.sdb"
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """A small tree with two matching executables among other files."""
+    (tmp_path / "app" / "sub").mkdir(parents=True)
+    (tmp_path / "other").mkdir()
+    shutil.copy(TESTDATA_FOLDER / "test_x32.exe", tmp_path / "app")
+    shutil.copy(TESTDATA_FOLDER / "test_x64.exe", tmp_path / "app")
+    shutil.copy(TESTDATA_FOLDER / "test_x32.exe", tmp_path / "app" / "sub")
+    shutil.copy(TESTDATA_FOLDER / "test_x32.exe", tmp_path / "other" / "Allow_x32.exe")
+    (tmp_path / "other" / "readme.txt").write_text("not an executable")
+    return tmp_path
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_audit(tree, jobs):
+    records = list(audit(tree, APP_X32, jobs=jobs, batch_size=1))
+    paths = [Path(r["path"]).relative_to(tree).as_posix() for r in records]
+    # test_x64.exe and readme.txt are never considered: no EXE has that name.
+    assert paths == ["app/test_x32.exe", "app/sub/test_x32.exe", "other/Allow_x32.exe"]
+    first, lonely, allow = records
+    assert [m["name"] for m in first["matches"]] == ["test_x32.exe"]
+    assert [ref["kind"] for ref in first["matches"][0]["refs"]] == [
+        "SHIM_REF",
+        "LAYER",
+    ]
+    assert first["matches"][0]["exe_id"] == "bb98b040-d552-42ea-95d2-b8cce25e2a24"
+    assert lonely["matches"] == []  # no test_x64.exe next to it
+    assert [m["name"] for m in allow["matches"]] == ["allow_x32.exe"]
+    assert Path(matcher_cache_path(APP_X32)).is_file()
+    assert list(audit(tree, APP_X32, jobs=jobs, cache=False)) == records
+
+
+def test_audit_prefilter_reads_no_other_files(tree, monkeypatch):
+    read = []
+    original = FileAttributeCache.get
+
+    def attributes(self, path):
+        read.append(Path(path).name)
+        return original(self, path)
+
+    monkeypatch.setattr(FileAttributeCache, "get", attributes)
+    list(audit(tree, APP_X32))
+    assert "readme.txt" not in read
+    assert sorted(set(read)) == ["Allow_x32.exe", "test_x32.exe", "test_x64.exe"]
+
+
+def test_audit_streams(tree, monkeypatch):
+    # An endless walk: records must still come out, a few batches at a time.
+    path = str(tree / "app" / "test_x32.exe")
+    monkeypatch.setattr(audit_module, "iter_files", lambda root: itertools.repeat(path))
+    records = audit(tree, APP_X32, jobs=2, batch_size=4)
+    head = list(itertools.islice(records, 10))
+    records.close()
+    assert [r["path"] for r in head] == [path] * 10
+
+
+def test_audit_errors(tree, tmp_path):
+    bad = tmp_path / "bad.sdb"
+    bad.write_bytes(b"not an sdb")
+    with pytest.raises(ValueError, match="Failed to open database"):
+        list(audit(tree, bad))
+
+    class Failing(ExeMatcher):
+        def match(self, file_name):
+            raise ValueError("broken")
+
+    with SdbDatabase(APP_X32) as db:
+        assert audit_file(Failing(db), "x.exe") == {"path": "x.exe", "error": "broken"}
+
+
+def test_audit_command(tree):
+    runner = CliRunner()
+    result = runner.invoke(
+        sdbtool_command, ["audit", str(tree), "--sdb", str(APP_X32), "-j", "2"]
+    )
+    assert result.exit_code == 0
+    records = [json.loads(line) for line in result.output.splitlines()]
+    assert records == list(audit(tree, APP_X32))
+
+    out = tree / "audit.ndjson"
+    result = runner.invoke(
+        sdbtool_command,
+        ["audit", str(tree / "app"), "--sdb", str(APP_X32), "--output", str(out)],
+    )
+    assert result.exit_code == 0 and result.output == ""
+    assert len(out.read_text().splitlines()) == 2
+
+    result = runner.invoke(sdbtool_command, ["audit", str(tree), "--sdb", __file__])
+    assert result.exit_code == 1
+    assert f"Error auditing {tree}: Failed to open database" in result.output
@@ -0,0 +1,74 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     tests for converting many SDB files at once.
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+"""
+
+import io
+import shutil
+from pathlib import Path
+
+import pytest
+from sdbtool.apphelp import SdbDatabase
+from sdbtool.batch import ConvertOptions, convert_files, plan_outputs
+from sdbtool.sdb2json import convert as sdb2json_convert
+from sdbtool.sdb2xml import XmlAnnotations, convert as sdb2xml_convert
+
+TESTDATA_FOLDER = Path(__file__).parent / "data"
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "in"
+    (root / "sub").mkdir(parents=True)
+    shutil.copy(TESTDATA_FOLDER / "app_x32.sdb", root / "app.sdb")
+    shutil.copy(TESTDATA_FOLDER / "all_tagtypes.sdb", root / "sub" / "all.SDB")
+    (root / "broken.sdb").write_bytes(b"not an sdb")
+    (root / "notes.txt").write_text("skipped")
+    return root
+
+
+def test_plan_outputs(tree, tmp_path):
+    out = tmp_path / "out"
+    pairs = plan_outputs([tree], out, "json")
+    assert pairs == [
+        (str(tree / "app.sdb"), str(out / "app.json")),
+        (str(tree / "broken.sdb"), str(out / "broken.json")),
+    ]
+    pairs = plan_outputs([tree, TESTDATA_FOLDER / "app_x64.sdb"], out, "xml", True)
+    assert [output for _, output in pairs] == [
+        str(out / "app.xml"),
+        str(out / "broken.xml"),
+        str(out / "sub" / "all.xml"),
+        str(out / "app_x64.xml"),
+    ]
+    with pytest.raises(ValueError, match="would be written to"):
+        plan_outputs([tree / "app.sdb", TESTDATA_FOLDER / "app.sdb"], out, "xml")
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+@pytest.mark.parametrize("output_format", ["xml", "json"])
+def test_convert_files(tree, tmp_path, jobs, output_format):
+    pairs = plan_outputs([tree], tmp_path / "out", output_format, recursive=True)
+    options = ConvertOptions(output_format, exclude_tags=("INDEXES",), with_tag=True)
+    results = {r.input_file: r for r in convert_files(pairs, options, jobs)}
+    assert len(results) == 3
+
+    broken = results[str(tree / "broken.sdb")]
+    assert "Failed to open database" in broken.error
+    assert not Path(broken.output_file).exists()
+
+    for name in ("app.sdb", "sub/all.SDB"):
+        result = results[str(tree / name)]
+        assert result.error is None and result.seconds >= 0
+        expected = io.StringIO()
+        with SdbDatabase(tree / name) as db:
+            if output_format == "xml":
+                sdb2xml_convert(
+                    db, expected, ["INDEXES"], XmlAnnotations.Comment, False, True
+                )
+            else:
+                sdb2json_convert(db, expected, ["INDEXES"], True, False, True)
+        written = Path(result.output_file).read_text(encoding="utf-8")
+        assert written == expected.getvalue()
@@ -0,0 +1,64 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     tests for the on-disk caches.
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+from sdbtool.apphelp import cache
+
+
+def test_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv(cache.CACHE_DIR_ENV, str(tmp_path))
+    assert cache.cache_dir() == str(tmp_path)
+    assert cache.cache_path("a", "b") == os.path.join(str(tmp_path), "a", "b")
+
+    monkeypatch.setenv(cache.CACHE_DIR_ENV, "")
+    assert cache.cache_dir() is None and cache.cache_path("a") is None
+
+    monkeypatch.delenv(cache.CACHE_DIR_ENV)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    monkeypatch.setenv("LOCALAPPDATA", str(tmp_path))
+    assert "sdbtool" in cache.cache_dir()
+    if sys.platform != "darwin":
+        assert cache.cache_dir().startswith(str(tmp_path))
+
+
+def test_roundtrip(tmp_path):
+    path = str(tmp_path / "sub" / "data.cache")
+    assert cache.read_cache(path, (1,)) is None
+    cache.write_cache(path, (1,), ("data", [1, 2]))
+    assert cache.read_cache(path, (1,)) == ("data", [1, 2])
+    assert cache.read_cache(path, (2,)) is None  # stale
+    assert os.listdir(tmp_path / "sub") == ["data.cache"]
+
+    (tmp_path / "sub" / "data.cache").write_bytes(b"garbage")
+    assert cache.read_cache(path, (1,)) is None
+
+    cache.write_cache(None, (1,), "ignored")
+    assert cache.read_cache(None, (1,)) is None
+
+
+@pytest.mark.parametrize("value", ["", "custom"])
+def test_tags_cache_location(tmp_path, value):
+    # Never next to tags.json: in the cache directory, or nowhere.
+    directory = str(tmp_path / value) if value else ""
+    code = (
+        "from sdbtool.apphelp import tags\n"
+        "print(tags._CACHE_FILE)\n"
+        "tags.tag_id_to_string(0x7001)\n"
+    )
+    env = dict(os.environ, **{cache.CACHE_DIR_ENV: directory})
+    out = subprocess.run(
+        [sys.executable, "-c", code], env=env, check=True, capture_output=True
+    ).stdout.decode()
+    if value:
+        assert out.strip() == os.path.join(directory, "tags.cache")
+        assert (tmp_path / value / "tags.cache").is_file()
+    else:
+        assert out.strip() == "None"
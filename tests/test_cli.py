@@ -5,13 +5,21 @@ PURPOSE:     Tests for the cli module.
 COPYRIGHT:   Copyright 2025 Mark Jansen <mark.jansen@reactos.org>
 """
 
+import json
+import os
+import shutil
+import subprocess
+import sys
+
 import click
+import pytest
 from click.testing import CliRunner
-from sdbtool.cli import attributes, sdb2xml, sdb2json, info, gui
-from sdbtool.cli import sdbtool_command
+from sdbtool.cli import attributes, sdb2xml, sdb2json, grep, index, info, gui
+from sdbtool.cli import match, query, stats, sdbtool_command
 from sdbtool.cli.types import SDB_DATABASE
 from sdbtool.info import DatabaseInformation
 from sdbtool.apphelp import SdbDatabase
+from sdbtool.compiled_match import matcher_cache_path
 from uuid import UUID
 from pathlib import Path
 
@@ -38,7 +46,7 @@ def test_sdb2xml_command(tmp_path, monkeypatch):
     monkeypatch.setattr(
         sdb2xml,
         "sdb2xml_convert",
-        lambda db, output_stream, exclude_tags, annotations, with_tagid, with_tag: click.echo(
+        lambda db, output_stream, exclude_tags, annotations, with_tagid, with_tag, jobs: click.echo(
             f"nop:{exclude_tags}"
         ),
     )
@@ -169,6 +177,162 @@ def test_info_command(tmp_path, monkeypatch):
         assert "Error getting info for test3.sdb: Test Error" in result.output
 
 
+def test_match_command(monkeypatch):
+    runner = CliRunner()
+    exe = str(TESTDATA_FOLDER / "test_x32.exe")
+    other = str(TESTDATA_FOLDER / "test_x64.exe")
+    db_file = str(TESTDATA_FOLDER / "app_x32.sdb")
+    result = runner.invoke(sdbtool_command, ["match", exe, other, "--sdb", db_file])
+    assert result.exit_code == 0
+    assert os.path.isfile(matcher_cache_path(db_file))
+    with monkeypatch.context() as m:
+        # Without the cache nothing is compiled: the indexes are used instead.
+        m.setattr(match, "load_matcher", pytest.fail)
+        uncached = runner.invoke(
+            sdbtool_command, ["match", exe, other, "--sdb", db_file, "--no-cache"]
+        )
+    assert uncached.output == result.output
+    assert f"Matches for {exe}:" in result.output
+    assert "  EXE test_x32.exe (tagid 0x598)" in result.output
+    assert "    App: test_x32" in result.output
+    assert "    ID: bb98b040-d552-42ea-95d2-b8cce25e2a24" in result.output
+    assert "    SHIM_REF: IgnoreFreeLibrary (tagid 0x6d4)" in result.output
+    assert "    LAYER: ShimEngineBasicTestLayer (tagid 0x700)" in result.output
+    assert f"Matches for {other}:\n  No matching EXE entries." in result.output
+
+    result = runner.invoke(sdbtool_command, ["match", db_file, "--sdb", exe])
+    assert result.exit_code == 0
+    assert f"Error matching {db_file}: Failed to open database" in result.output
+    result = runner.invoke(
+        sdbtool_command, ["match", db_file, "--sdb", exe, "--no-cache"]
+    )
+    assert f"Error matching {db_file}: Failed to open database" in result.output
+    assert match.command is sdbtool_command.get_command(None, "match")
+
+    result = runner.invoke(sdbtool_command, ["match", exe])
+    assert result.exit_code == 2
+    assert "Missing option '--sdb'" in result.output
+
+
+def test_query_command():
+    runner = CliRunner()
+    db_file = str(TESTDATA_FOLDER / "app_x32.sdb")
+    result = runner.invoke(
+        sdbtool_command, ["query", db_file, "DATABASE/EXE/NAME", "--format", "text"]
+    )
+    assert result.exit_code == 0
+    assert result.output == "allow_x32.exe\ndisallow_x32.exe\ntest_x32.exe\n"
+    result = runner.invoke(
+        sdbtool_command, ["query", db_file, '//EXE[NAME="test_x32.exe"]/LAYER']
+    )
+    assert result.exit_code == 0
+    assert json.loads(result.output)["children"][0]["tag"] == "LAYER"
+    result = runner.invoke(
+        sdbtool_command, ["query", db_file, "//LAYER", "--format", "xml"]
+    )
+    assert result.exit_code == 0
+    assert '<NAME type="xs:string">ShimEngineBasicTestLayer</NAME>' in result.output
+    assert query.command is sdbtool_command.get_command(None, "query")
+
+    result = runner.invoke(sdbtool_command, ["query", db_file, "//EXE["])
+    assert result.exit_code == 1
+    assert "Error querying SDB: Unexpected end of selector" in result.output
+
+
+def test_grep_command():
+    runner = CliRunner()
+    db_file = str(TESTDATA_FOLDER / "app_x32.sdb")
+    result = runner.invoke(sdbtool_command, ["grep", "-i", "LAYER$", db_file])
+    assert result.exit_code == 0
+    assert result.output == (
+        f"{db_file}:0x706:NAME: ShimEngineBasicTestLayer"
+        "  (LAYER ShimEngineBasicTestLayer, 0x700)\n"
+    )
+    result = runner.invoke(
+        sdbtool_command, ["grep", "^IgnoreFree", db_file, "--format", "ndjson"]
+    )
+    assert json.loads(result.output)["record"]["tag"] == "EXE"
+    assert grep.command is sdbtool_command.get_command(None, "grep")
+
+    result = runner.invoke(sdbtool_command, ["grep", "(", db_file])
+    assert result.exit_code == 1
+    assert "Error: Invalid pattern" in result.output
+    result = runner.invoke(sdbtool_command, ["grep", "x", str(Path(__file__))])
+    assert result.exit_code == 1
+    assert "Error searching" in result.output
+
+
+def test_index_command(tmp_path):
+    runner = CliRunner()
+    corpus = str(tmp_path / "corpus.sqlite")
+    sdbs = tmp_path / "sdbs"
+    sdbs.mkdir()
+    shutil.copy(TESTDATA_FOLDER / "app_x32.sdb", sdbs)
+    shutil.copy(TESTDATA_FOLDER / "app_x64.sdb", sdbs)
+    result = runner.invoke(
+        sdbtool_command, ["index", "build", str(sdbs), "--db", corpus]
+    )
+    assert result.exit_code == 0
+    assert result.output.startswith("2 added, 0 updated, 0 unchanged, 0 removed")
+    result = runner.invoke(
+        sdbtool_command, ["index", "build", str(sdbs), "--db", corpus]
+    )
+    assert result.output.startswith("0 added, 0 updated, 2 unchanged")
+
+    result = runner.invoke(
+        sdbtool_command, ["index", "search", "TEST_X32.EXE", "--db", corpus]
+    )
+    assert result.exit_code == 0
+    assert result.output.splitlines() == [
+        f"{sdbs / 'app_x32.sdb'}\t0x59e\tNAME\ttest_x32.exe",
+        f"{sdbs / 'app_x64.sdb'}\t0x65e\tNAME\ttest_x32.exe",
+    ]
+    result = runner.invoke(
+        sdbtool_command,
+        ["index", "search", "0xA00", "--db", corpus, "--tag", "0x4001", "--files"],
+    )
+    assert result.output == ""
+    result = runner.invoke(
+        sdbtool_command,
+        ["index", "search", "2560", "--db", corpus, "--tag", "SIZE", "--files"],
+    )
+    assert result.output == f"{sdbs / 'app_x32.sdb'}\n{sdbs / 'app_x64.sdb'}\n"
+    assert index.command is sdbtool_command.get_command(None, "index")
+
+    result = runner.invoke(
+        sdbtool_command, ["index", "search", "x", "--db", corpus, "--tag", "NOPE"]
+    )
+    assert result.exit_code == 1
+    assert "Unknown tag name: NOPE" in result.output
+
+
+def test_stats_command():
+    runner = CliRunner()
+    db_file = str(TESTDATA_FOLDER / "app_x32.sdb")
+    result = runner.invoke(sdbtool_command, ["stats", db_file, "--top", "1"])
+    assert result.exit_code == 0
+    lines = result.output.splitlines()
+    assert lines[:4] == [
+        f"Stats for {db_file}:",
+        "  Size: 2764 bytes, 328 tags",
+        "  Tags per depth: 1: 3, 2: 84, 3: 183, 4: 55, 5: 3",
+        "  String table: 888 bytes, 27 strings, 27 unique (0.0% duplicates, 0 bytes)",
+    ]
+    assert lines[-2:] == [
+        "  Largest BINARY tags:",
+        "    INDEX_BITS (tagid 0x26): 36 bytes",
+    ]
+    result = runner.invoke(
+        sdbtool_command, ["stats", db_file, db_file, "--format", "json"]
+    )
+    first, second = map(json.loads, result.output.splitlines())
+    assert first == second and first["file"] == db_file and first["tags"] == 328
+    assert stats.command is sdbtool_command.get_command(None, "stats")
+
+    result = runner.invoke(sdbtool_command, ["stats", str(Path(__file__))])
+    assert result.output.startswith(f"Error getting stats for {Path(__file__)}")
+
+
 def test_gui_command(tmp_path, monkeypatch):
     def mock_show_gui(input_file):
         if not input_file.name.endswith(".sdb"):
@@ -196,7 +360,7 @@ def test_sdb2json_command(tmp_path, monkeypatch):
     monkeypatch.setattr(
         sdb2json,
         "sdb2json_convert",
-        lambda db, output_stream, exclude_tags, with_annotations, with_tagid, with_tag: click.echo(
+        lambda db, output_stream, exclude_tags, with_annotations, with_tagid, with_tag, jobs, compact, typed_values: click.echo(
             f"nop:{exclude_tags}"
         ),
     )
@@ -215,6 +379,100 @@ def test_sdb2json_command(tmp_path, monkeypatch):
     assert "nop:['INDEXES', 'STRINGTABLE']\n" == result.output
 
 
+@pytest.mark.parametrize("command", ["sdb2xml", "sdb2json"])
+def test_convert_jobs(command):
+    runner = CliRunner()
+    db_file = str(TESTDATA_FOLDER / "app_x32.sdb")
+    serial = runner.invoke(sdbtool_command, [command, db_file, "--tagid"])
+    assert serial.exit_code == 0
+    for jobs in ("2", "0"):
+        result = runner.invoke(
+            sdbtool_command, [command, db_file, "--tagid", "-j", jobs]
+        )
+        assert result.exit_code == 0
+        assert result.output == serial.output
+
+
+@pytest.mark.parametrize(
+    "command, suffix", [("sdb2xml", ".xml"), ("sdb2json", ".json")]
+)
+def test_convert_out_dir(tmp_path, command, suffix):
+    inputs = tmp_path / "in"
+    (inputs / "sub").mkdir(parents=True)
+    shutil.copy(TESTDATA_FOLDER / "app_x32.sdb", inputs / "app.sdb")
+    shutil.copy(TESTDATA_FOLDER / "app_x64.sdb", inputs / "sub" / "app64.sdb")
+    (inputs / "broken.sdb").write_bytes(b"")
+    out = tmp_path / "out"
+    runner = CliRunner()
+
+    single = runner.invoke(sdbtool_command, [command, str(inputs / "app.sdb")])
+    result = runner.invoke(
+        sdbtool_command, [command, str(inputs), "--out-dir", str(out), "-r"]
+    )
+    assert result.exit_code == 1
+    lines = result.output.splitlines()
+    assert lines[0].endswith(f" ms  {inputs / 'app.sdb'} -> {out / ('app' + suffix)}")
+    assert "FAILED" in lines[1] and "Failed to open database" in lines[1]
+    assert str(out / "sub" / ("app64" + suffix)) in lines[2]
+    assert lines[3].startswith("Converted 2 of 3 files in ")
+    assert lines[3].endswith(" (1 failed)")
+    assert (out / ("app" + suffix)).read_text(encoding="utf-8") == single.output
+
+    result = runner.invoke(
+        sdbtool_command,
+        [command, str(inputs / "app.sdb"), "--out-dir", str(out), "-j", "2"],
+    )
+    assert result.exit_code == 0
+    assert result.output.splitlines()[-1].startswith("Converted 1 of 1 files")
+
+    for args, message in [
+        ([str(inputs / "app.sdb"), str(inputs / "app.sdb")], "requires --out-dir"),
+        ([str(inputs / "app.sdb"), "-r"], "--recursive requires --out-dir"),
+        ([str(inputs), "--out-dir", str(out), "--output", "x"], "mutually exclusive"),
+    ]:
+        result = runner.invoke(sdbtool_command, [command, *args])
+        assert result.exit_code == 2
+        assert message in result.output
+
+
+def test_sdb2json_ndjson():
+    runner = CliRunner()
+    db_file = str(TESTDATA_FOLDER / "app_x32.sdb")
+    result = runner.invoke(
+        sdbtool_command, ["sdb2json", db_file, "--format", "ndjson", "--exclude=auto"]
+    )
+    assert result.exit_code == 0
+    records = [json.loads(line) for line in result.output.splitlines()]
+    assert records[0]["tag"] == "DATABASE" and records[0]["depth"] == 1
+    assert {record["tag"] for record in records if record["depth"] == 1} == {"DATABASE"}
+
+    result = runner.invoke(
+        sdbtool_command, ["sdb2json", db_file, "--format", "ndjson", "--compact"]
+    )
+    assert result.exit_code == 2
+    assert "--compact cannot be used with --format ndjson" in result.output
+
+
+def test_sdb2json_compact_typed_values():
+    runner = CliRunner()
+    db_file = str(TESTDATA_FOLDER / "app_x32.sdb")
+    default = runner.invoke(sdbtool_command, ["sdb2json", db_file])
+    result = runner.invoke(
+        sdbtool_command, ["sdb2json", db_file, "--compact", "--typed-values"]
+    )
+    assert result.exit_code == 0
+    assert result.output.count("\n") == 1
+    assert len(result.output) < len(default.output) / 2
+    document = json.loads(result.output)
+    indexes = document["children"][0]
+    assert indexes["children"][0]["children"][0] == {
+        "tag": "INDEX_TAG",
+        "type": "word",
+        "value": 28679,
+        "comment": "EXE",
+    }
+
+
 def test_sdb2json_exception(tmp_path, monkeypatch):
     def raise_value_error(*args, **kwargs):
         raise ValueError("Test error")
@@ -240,3 +498,75 @@ def test_sdb_database_param_type():
         assert other.path == db_file
         assert other is not db
         other.close()
+
+
+def test_mmap_option(monkeypatch):
+    seen = []
+    monkeypatch.setattr(
+        sdb2json,
+        "sdb2json_convert",
+        lambda db, **kwargs: seen.append(db._handle.is_mapped),
+    )
+    runner = CliRunner()
+    db_file = str(TESTDATA_FOLDER / "all_tagtypes.sdb")
+    # --mmap is eager, so it applies even when given after the database argument.
+    assert (
+        runner.invoke(sdbtool_command, ["sdb2json", db_file, "--mmap"]).exit_code == 0
+    )
+    assert runner.invoke(sdbtool_command, ["sdb2json", db_file]).exit_code == 0
+    assert seen == [True, False]
+
+
+def test_lazy_subcommands():
+    # Run in a fresh interpreter: this test process has already imported them all.
+    db_file = str(TESTDATA_FOLDER / "app_x32.sdb")
+    code = f"""
+import io, sys, contextlib
+from sdbtool.cli import sdbtool_command
+assert "sdbtool.cli.info" not in sys.modules
+with contextlib.redirect_stdout(io.StringIO()):
+    sdbtool_command(["info", {db_file!r}], standalone_mode=False)
+    sdbtool_command(["sdb2json", {db_file!r}], standalone_mode=False)
+import sdbtool.batch, sdbtool.corpus  # index and --out-dir walk trees, not match
+loaded = sorted(m for m in ("tkinter", "pefile", "sdbtool.gui") if m in sys.modules)
+assert not loaded, loaded
+assert "sdbtool.cli.gui" not in sys.modules
+"""
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_cli_modules_load_no_tag_table():
+    # The --target-os check reads the version list only when the option is given.
+    import sdbtool.cli as cli
+
+    modules = [spec.partition(":")[0] for spec in cli.COMMANDS.values()]
+    code = (
+        f"import {', '.join(m for m in modules if m != 'sdbtool.cli.gui')}\n"
+        "from sdbtool.apphelp import tags\n"
+        "assert tags._VERSIONS is None, 'tags.json was loaded'\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_target_os_option():
+    runner = CliRunner()
+    db_file = str(TESTDATA_FOLDER / "all_tagtypes.sdb")
+    result = runner.invoke(sdbtool_command, ["sdb2json", db_file, "--target-os", "x"])
+    assert result.exit_code == 2
+    assert "'x' is not one of '0501'" in result.output
+    result = runner.invoke(
+        sdbtool_command, ["stats", db_file, "--target-os", "0601-SP1"]
+    )
+    assert result.exit_code == 0
+
+
+def test_entry_point_attributes():
+    import sdbtool.cli as cli
+
+    assert cli.sdb2xml_command is sdb2xml.command
+    assert cli.info_command is info.command
+    assert cli.gui_command is gui.command
+    assert sdbtool_command.get_command(None, "info") is info.command
+    assert sdbtool_command.list_commands(None) == sorted(cli.COMMANDS)
+    with pytest.raises(AttributeError, match="has no attribute 'nope_command'"):
+        cli.nope_command
@@ -0,0 +1,166 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     tests for the compiled EXE matcher and its cache file.
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+"""
+
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+from sdbtool import compiled_match
+from sdbtool.apphelp import SdbDatabase
+from sdbtool.apphelp.cache import CACHE_DIR_ENV
+from sdbtool.apphelp.fileattr import (
+    TAG_BIN_FILE_VERSION,
+    TAG_BIN_PRODUCT_VERSION,
+    TAG_FROM_LINK_DATE,
+    TAG_FROM_PRODUCT_VERSION,
+    TAG_LINK_DATE,
+    TAG_UPTO_BIN_FILE_VERSION,
+    TAG_UPTO_LINK_DATE,
+)
+from sdbtool.compiled_match import (
+    _in_interval,
+    compile_matcher,
+    load_matcher,
+    matcher_cache_path,
+)
+from sdbtool.match import ExeMatcher, attribute_matches
+
+TESTDATA_FOLDER = Path(__file__).parent / "data"
+
+
+@pytest.fixture
+def sdb(tmp_path, cache_dir):
+    """A copy of app_x32.sdb, whose modification time the tests may change."""
+    return Path(shutil.copy(TESTDATA_FOLDER / "app_x32.sdb", tmp_path))
+
+
+@pytest.mark.parametrize("db_name", ["app_x32.sdb", "app_x64.sdb"])
+def test_same_matches_as_exe_matcher(tmp_path, db_name):
+    shutil.copy(TESTDATA_FOLDER / "test_x32.exe", tmp_path / "test_x32.exe")
+    shutil.copy(TESTDATA_FOLDER / "test_x32.exe", tmp_path / "allow_x32.exe")
+    files = [
+        TESTDATA_FOLDER / "test_x32.exe",
+        TESTDATA_FOLDER / "test_x64.exe",
+        tmp_path / "test_x32.exe",  # no test_x64.exe next to it
+        tmp_path / "allow_x32.exe",
+        tmp_path / "missing.exe",
+    ]
+    with SdbDatabase(TESTDATA_FOLDER / db_name) as db:
+        matcher = ExeMatcher(db)
+        compiled = compile_matcher(db)
+        assert len(compiled) == 3
+        for file_name in files:
+            assert compiled.may_match(str(file_name)) == matcher.may_match(
+                str(file_name)
+            )
+            assert compiled.match(file_name) == matcher.match(file_name)
+        assert any(compiled.match(file_name) for file_name in files)
+
+
+def test_compiled_intervals():
+    with SdbDatabase(TESTDATA_FOLDER / "app_x32.sdb") as db:
+        compiled = compile_matcher(db)
+    (entry,) = compiled.candidates("test_x32.exe")
+    tag_id, name, *_, files = compiled.data[2][entry]
+    assert (tag_id, name) == (0x598, "test_x32.exe")
+    star, other = files
+    assert star[0] == "*" and other[0] == "test_x64.exe"
+    # The UPTO_ bounds are intervals over the attribute they bound.
+    assert dict((tag, (low, high)) for tag, low, high in star[2]) == {
+        TAG_BIN_FILE_VERSION: (None, 0x0001_0000_0000_0000),
+        TAG_BIN_PRODUCT_VERSION: (None, 0x0001_0000_0000_0001),
+        TAG_LINK_DATE: (None, 0),
+    }
+    assert compiled.candidates("unknown.exe") == []
+
+
+@pytest.mark.parametrize(
+    "tag, bound, actual",
+    [
+        (TAG_UPTO_BIN_FILE_VERSION, 0x0001_0002_0003_0004, 0x0001_0002_0003_0004),
+        (TAG_UPTO_BIN_FILE_VERSION, 0x0001_0002_0003_0003, 0x0001_0002_0003_0004),
+        (TAG_FROM_LINK_DATE, 1000, 1000),
+        (TAG_FROM_LINK_DATE, 1001, 1000),
+        (TAG_UPTO_LINK_DATE, 999, 1000),
+        (TAG_FROM_LINK_DATE, 1000, None),
+        (TAG_FROM_LINK_DATE, 1000, "1000"),
+        (TAG_FROM_PRODUCT_VERSION, "1.0.0.1", "1.0.0.10"),
+        (TAG_FROM_PRODUCT_VERSION, "2.0", "1.10.0.0"),
+        (TAG_FROM_PRODUCT_VERSION, "2.0", "not a version"),
+        (TAG_FROM_PRODUCT_VERSION, "2.0", 2),
+    ],
+)
+def test_intervals_match_like_bounds(tag, bound, actual):
+    low = high = None
+    value = tuple(map(int, bound.split("."))) if isinstance(bound, str) else bound
+    if tag in compiled_match._LOWER_BOUNDS:
+        low = value
+    else:
+        high = value
+    assert _in_interval(actual, low, high) is attribute_matches(tag, bound, actual)
+
+
+def test_cache(sdb, cache_dir, monkeypatch):
+    cached = Path(matcher_cache_path(sdb))
+    assert cached.parent.parent == cache_dir
+    compiled = load_matcher(sdb)
+    assert cached.is_file()
+    assert os.listdir(sdb.parent) == [sdb.name]  # not next to it
+
+    def no_compile(*args, **kwargs):
+        pytest.fail("compiled again")
+
+    with monkeypatch.context() as m:
+        m.setattr(compiled_match, "compile_matcher", no_compile)
+        loaded = load_matcher(sdb)
+    assert loaded.data == compiled.data
+    exe = TESTDATA_FOLDER / "test_x32.exe"
+    assert loaded.match(exe) == compiled.match(exe) != []
+
+    # A database with another modification time is compiled again.
+    stat = os.stat(sdb)
+    os.utime(sdb, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    before = cached.read_bytes()
+    load_matcher(sdb)
+    assert cached.read_bytes() != before
+
+    # So is one with a damaged cache file.
+    cached.write_bytes(b"\0garbage")
+    assert load_matcher(sdb).data == compiled.data
+    key = compiled_match._cache_key(str(sdb))
+    assert compiled_match._read_matcher(str(cached), key) == compiled.data
+
+    # Another database has its own cache file.
+    other = Path(shutil.copy(sdb, sdb.parent / "other.sdb"))
+    assert matcher_cache_path(other) != str(cached)
+
+
+def test_no_cache(sdb, cache_dir, monkeypatch):
+    load_matcher(sdb, cache=False)
+    assert not cache_dir.exists()
+    monkeypatch.setenv(CACHE_DIR_ENV, "")  # caching disabled
+    assert matcher_cache_path(sdb) is None
+    assert len(load_matcher(sdb)) == 3
+
+
+def test_unwritable_cache(sdb, cache_dir):
+    # The cache cannot be written (a directory is in the way): still works.
+    cached = Path(matcher_cache_path(sdb))
+    cached.mkdir(parents=True)
+    assert len(load_matcher(sdb)) == 3
+    assert cached.is_dir()
+
+
+def test_load_matcher_errors(tmp_path, cache_dir):
+    bad = tmp_path / "bad.sdb"
+    bad.write_bytes(b"not an sdb")
+    with pytest.raises(ValueError, match="Failed to open database"):
+        load_matcher(bad)
+    with pytest.raises(ValueError, match="Failed to open database"):
+        load_matcher(tmp_path / "missing.sdb")
+    assert sorted(os.listdir(tmp_path)) == ["bad.sdb"]
@@ -0,0 +1,135 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     tests for the sqlite index of SDB tag values.
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+"""
+
+import os
+import shutil
+import sqlite3
+from pathlib import Path
+
+import pytest
+from sdbtool import corpus
+from sdbtool.apphelp.sdb_reader import SdbCloseDatabase, SdbOpenDatabase
+from sdbtool.corpus import BuildStats, build_index, extract_values, search
+
+TESTDATA_FOLDER = Path(__file__).parent / "data"
+TEST_X32_ID = "{bb98b040-d552-42ea-95d2-b8cce25e2a24}"
+
+
+@pytest.fixture
+def sdbs(tmp_path):
+    """A folder with copies of the test databases and a file that is not one."""
+    folder = tmp_path / "sdbs"
+    (folder / "sub").mkdir(parents=True)
+    shutil.copy(TESTDATA_FOLDER / "app_x32.sdb", folder)
+    shutil.copy(TESTDATA_FOLDER / "app_x64.sdb", folder / "sub")
+    shutil.copy(TESTDATA_FOLDER / "all_tagtypes.sdb", folder)
+    (folder / "bad.sdb").write_bytes(b"not an sdb")
+    (folder / "notes.txt").write_text("test_x32.exe")
+    return folder
+
+
+def test_extract_values():
+    pdb = SdbOpenDatabase(str(TESTDATA_FOLDER / "app_x32.sdb"))
+    try:
+        values = list(extract_values(pdb))
+    finally:
+        SdbCloseDatabase(pdb)
+    assert (0x59E, 0x6001, "test_x32.exe") in values
+    assert (0x5B0, 0x9004, TEST_X32_ID) in values  # EXE_ID
+    assert (0x4FA, 0x4015, "1") in values  # HTMLHELPID
+    tags = {tag for _, tag, _ in values}
+    assert 0x8801 not in tags and 0x3803 not in tags  # STRINGTABLE, INDEXES
+    assert [tagid for tagid, _, _ in values] == sorted(tagid for tagid, _, _ in values)
+
+
+def test_build_and_search(sdbs, tmp_path):
+    index = tmp_path / "corpus.sqlite"
+    stats = build_index(sdbs, index)
+    assert (stats.added, stats.failed) == (4, 1)
+    app_x32, app_x64 = str(sdbs / "app_x32.sdb"), str(sdbs / "sub" / "app_x64.sdb")
+
+    hits = search(index, "TEST_X32.EXE")
+    assert [(hit.path, hit.tag_name) for hit in hits] == [
+        (app_x32, "NAME"),
+        (app_x64, "NAME"),
+    ]
+    assert [hit.path for hit in search(index, TEST_X32_ID.upper())] == [app_x32]
+    assert [hit.path for hit in search(index, "2560", tag="SIZE")] == [
+        app_x32,
+        app_x64,
+    ]
+    assert search(index, "2560", tag=0x6001) == []
+    # names as written in the JSON / XML output, for the target os
+    for name in ("EXE_ID", "EXE_ID(GUID)"):
+        hits = search(index, TEST_X32_ID, tag=name, target_os="0501")
+        assert [hit.tag_id for hit in hits] == [0x5B0]
+    assert search(index, "x", tag="S16BIT_DESCRIPTION") == []
+    assert {hit.value for hit in search(index, "ignorefree", prefix=True)} == {
+        "IgnoreFreeLibrary"
+    }
+    assert search(index, "ignore_", prefix=True) == []  # '_' is not a wildcard
+    with pytest.raises(ValueError, match="Unknown tag name: NOPE"):
+        search(index, "x", tag="NOPE")
+
+
+def test_search_does_not_open_sdbs(sdbs, tmp_path, monkeypatch):
+    index = tmp_path / "corpus.sqlite"
+    build_index(sdbs, index)
+
+    def no_open(*args, **kwargs):
+        pytest.fail("opened an SDB")
+
+    monkeypatch.setattr(corpus, "SdbOpenDatabase", no_open)
+    monkeypatch.setattr(corpus, "SdbProbeDatabase", no_open)
+    assert len(search(index, "test_x32.exe")) == 2
+
+
+def test_incremental_build(sdbs, tmp_path, monkeypatch):
+    index = tmp_path / "corpus.sqlite"
+    build_index(sdbs, index)
+    opened = []
+    original = corpus.SdbOpenDatabase
+
+    def counting_open(path, *args, **kwargs):
+        opened.append(os.path.basename(path))
+        return original(path, *args, **kwargs)
+
+    monkeypatch.setattr(corpus, "SdbOpenDatabase", counting_open)
+    assert build_index(sdbs, index) == BuildStats(unchanged=4)
+    assert opened == []
+
+    app_x32 = sdbs / "app_x32.sdb"
+    stat = os.stat(app_x32)
+    os.utime(app_x32, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    (sdbs / "sub" / "app_x64.sdb").unlink()
+    stats = build_index(sdbs, index)
+    assert (stats.updated, stats.unchanged, stats.removed) == (1, 2, 1)
+    assert opened == ["app_x32.sdb"]
+    assert [hit.path for hit in search(index, "test_x32.exe")] == [str(app_x32)]
+
+    # Files indexed from another folder are kept.
+    other = tmp_path / "other"
+    other.mkdir()
+    shutil.copy(TESTDATA_FOLDER / "app_x64.sdb", other)
+    assert build_index(other, index).added == 1
+    assert build_index(sdbs, index).removed == 0
+    assert len(search(index, "test_x32.exe")) == 2
+
+
+def test_index_errors(tmp_path):
+    not_an_index = tmp_path / "other.sqlite"
+    with sqlite3.connect(not_an_index) as conn:
+        conn.execute("CREATE TABLE t (x)")
+    with pytest.raises(ValueError, match="is not an sdbtool index"):
+        search(not_an_index, "x")
+    garbage = tmp_path / "garbage.sqlite"
+    garbage.write_bytes(b"\0" * 1024)
+    with pytest.raises(ValueError, match="Failed to open index"):
+        build_index(tmp_path, garbage)
+    with pytest.raises(ValueError, match="Failed to open index"):
+        search(tmp_path / "missing.sqlite", "x")
+    assert not (tmp_path / "missing.sqlite").exists()
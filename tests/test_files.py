@@ -0,0 +1,23 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     tests for the directory tree walk.
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+"""
+
+from pathlib import Path
+
+from sdbtool.files import iter_files
+
+
+def test_iter_files(tmp_path):
+    for name in ["b/z.exe", "b/a/y.txt", "a.sdb", "c/x.exe", "B.txt"]:
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_bytes(b"")
+    (tmp_path / "empty").mkdir()
+    files = [Path(p).relative_to(tmp_path).as_posix() for p in iter_files(tmp_path)]
+    assert files == ["B.txt", "a.sdb", "b/z.exe", "b/a/y.txt", "c/x.exe"]
+
+
+def test_iter_files_missing_root(tmp_path):
+    assert list(iter_files(tmp_path / "missing")) == []
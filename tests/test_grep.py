@@ -0,0 +1,145 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     tests for searching the strings of SDB files.
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+"""
+
+import struct
+from pathlib import Path
+
+import pytest
+from sdbtool import grep as grep_module
+from sdbtool.apphelp.sdb_reader import (
+    SdbCloseDatabase,
+    SdbGetStringTagPtr,
+    SdbOpenDatabase,
+    TAG_TYPE_MASK,
+    TAG_TYPE_STRING,
+    TAG_TYPE_STRINGREF,
+)
+from sdbtool.apphelp.walk import LEAF, walk_tags
+from sdbtool.grep import compile_pattern, grep, grep_file
+
+TESTDATA_FOLDER = Path(__file__).parent / "data"
+APP_X32 = str(TESTDATA_FOLDER / "app_x32.sdb")
+APP_X64 = str(TESTDATA_FOLDER / "app_x64.sdb")
+ALL_TAGTYPES = str(TESTDATA_FOLDER / "all_tagtypes.sdb")
+
+
+def _tagids(hits):
+    return [hit["tagid"] for hit in hits]
+
+
+def test_grep_file():
+    hits = grep_file(APP_X32, compile_pattern("^test_x"))
+    assert [(hit["tagid"], hit["tag"], hit["value"]) for hit in hits] == [
+        (0x59E, "NAME", "test_x32.exe"),
+        (0x5A4, "APP_NAME", "test_x32"),
+        (0x65E, "NAME", "test_x64.exe"),  # a MATCHING_FILE of the EXE
+    ]
+    assert {hit["match"] for hit in hits} == {"test_x"}
+    assert all(
+        hit["record"] == {"tagid": 0x598, "tag": "EXE", "name": "test_x32.exe"}
+        for hit in hits
+    )
+    (layer,) = grep_file(APP_X32, compile_pattern("layer$", ignore_case=True))
+    assert layer["record"] == {
+        "tagid": 0x700,
+        "tag": "LAYER",
+        "name": "ShimEngineBasicTestLayer",
+    }
+    app_name, title = grep_file(APP_X32, compile_pattern("^disallow$"))
+    assert app_name["record"]["name"] == "disallow_x32.exe"
+    assert title["tag"] == "APPHELP_TITLE" and title["record"] is None
+
+
+def test_grep_file_is_per_tag_search():
+    """The same tags as decoding every string tag and searching it."""
+    pdb = SdbOpenDatabase(APP_X32)
+    try:
+        strings = [
+            (tagid, SdbGetStringTagPtr(pdb, tagid))
+            for event, tagid, _, tag in walk_tags(pdb)
+            if event is LEAF
+            and (tag & TAG_TYPE_MASK) in (TAG_TYPE_STRINGREF, TAG_TYPE_STRING)
+            and tag != 0x8801  # STRINGTABLE_ITEM
+        ]
+    finally:
+        SdbCloseDatabase(pdb)
+    patterns = ["", "e", r"\.exe$", "^[a-z]+$", "x(32|64)", "Lib"]
+    # Matches that would run into the next string in the STRINGTABLE.
+    patterns += [r"\s", "^$", "[^a]+$", r"e\s*", r"\d\W+", r"[\s\S]*_"]
+    for pattern in patterns:
+        regex = compile_pattern(pattern)
+        expected = []
+        for tagid, value in strings:
+            m = regex.search(value or "")
+            if m is not None:
+                expected.append((tagid, m.group(0)))
+        hits = grep_file(APP_X32, regex)
+        assert [(hit["tagid"], hit["match"]) for hit in hits] == expected, pattern
+
+
+def test_grep_matches_stay_in_one_string():
+    # 'test_x32.exe' is followed by other strings in the table.
+    assert grep_file(APP_X32, compile_pattern(r"test_x32\.exe\s+\w")) == []
+    assert grep_file(APP_X32, compile_pattern(r"^test_x32$")) != []
+
+
+def test_grep_after_surrogate_pairs(tmp_path):
+    # Characters outside the BMP take two UTF-16 code units.
+    names = ["\U0001f600 smile \U0001f389", "target", "\U0001f600", "last"]
+    strings, refs = b"", b""
+    for name in names:
+        raw = name.encode("utf-16-le") + b"\0\0"
+        refs += struct.pack("<HI", 0x6001, 6 + len(strings))  # NAME
+        strings += struct.pack("<HI", 0x8801, len(raw)) + raw
+    database = struct.pack("<HI", 0x7001, len(refs)) + refs
+    stringtable = struct.pack("<HI", 0x7801, len(strings)) + strings
+    path = tmp_path / "astral.sdb"
+    path.write_bytes(struct.pack("<II", 2, 1) + b"sdbf" + database + stringtable)
+
+    def found(pattern):
+        hits = grep_file(str(path), compile_pattern(pattern))
+        return [(hit["value"], hit["match"]) for hit in hits]
+
+    assert found("^target$") == [("target", "target")]
+    assert found("^.a") == [("target", "ta"), ("last", "la")]
+    assert found("smile.+") == [(names[0], "smile \U0001f389")]
+    assert found("\U0001f600$") == [(names[2], "\U0001f600")]
+    assert found(r"\s\w") == [(names[0], " s")]
+
+
+def test_grep_without_stringtable():
+    (hit,) = grep_file(ALL_TAGTYPES, compile_pattern("^val$"))
+    assert (hit["tagid"], hit["value"], hit["record"]) == (124, "val", None)
+
+
+def test_grep_skips_walk_without_matches(monkeypatch):
+    def no_walk(*args, **kwargs):
+        pytest.fail("walked the tags")
+
+    monkeypatch.setattr(grep_module, "walk_tags", no_walk)
+    assert grep_file(APP_X32, compile_pattern("no such string")) == []
+
+
+def test_grep_errors(tmp_path):
+    bad = tmp_path / "bad.sdb"
+    bad.write_bytes(b"not an sdb")
+    assert list(grep([bad], "x")) == [
+        {"path": str(bad), "error": f"Failed to open database '{bad}'"}
+    ]
+    with pytest.raises(ValueError, match="Invalid pattern"):
+        list(grep([APP_X32], "("))
+
+
+def test_grep_jobs():
+    files = [APP_X32, APP_X64, ALL_TAGTYPES]
+    serial = list(grep(files, "allow|val"))
+    parallel = list(grep(files, "allow|val", jobs=2))
+    key = lambda hit: (hit["path"], hit["tagid"])  # noqa: E731
+    assert sorted(parallel, key=key) == sorted(serial, key=key)
+    assert [hit["path"] for hit in serial] == sorted(
+        (hit["path"] for hit in serial), key=files.index
+    )
@@ -0,0 +1,145 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     tests for lookups through the INDEXES section.
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+"""
+
+import struct
+from pathlib import Path
+
+import pytest
+from sdbtool.apphelp import SdbDatabase
+from sdbtool.apphelp import indexes as ix
+
+TESTDATA_FOLDER = Path(__file__).parent / "data"
+EXE, NAME, EXE_ID, APPHELP, HTMLHELPID = 0x7007, 0x6001, 0x9004, 0x700D, 0x4015
+
+
+def W(v: int) -> bytes:
+    return struct.pack("<H", v)
+
+
+def D(v: int) -> bytes:
+    return struct.pack("<I", v)
+
+
+def build_sdb(path: Path, names: list[str], flags: int, unique: bool) -> list[int]:
+    """A database with one EXE per name and an EXE-by-NAME index.
+
+    Returns the tagids of the EXEs. With ``unique`` only the first EXE of
+    each key gets an INDEX_BITS record.
+    """
+    keys = [ix.SdbMakeIndexKey(name, flags) for name in names]
+    count = len(set(keys)) if unique else len(keys)
+    index_size = 4 + 4 + 6 + 6 + 12 * count
+    first_exe = 12 + 6 + 6 + index_size + 6  # header, INDEXES, INDEX, DATABASE
+    tagids = [first_exe + 12 * i for i in range(len(names))]
+
+    records = sorted(zip(keys, tagids))
+    if unique:
+        records = [
+            r for i, r in enumerate(records) if i == 0 or records[i - 1][0] != r[0]
+        ]
+    bits = b"".join(struct.pack("<QI", *r) for r in records)
+    index = W(0x3802) + W(EXE) + W(0x3803) + W(NAME)
+    index += W(0x4016) + D(flags) + W(0x9801) + D(len(bits)) + bits
+    assert len(index) == index_size
+    indexes = W(0x7802) + D(6 + len(index)) + W(0x7803) + D(len(index)) + index
+
+    strings, exes = b"", b""
+    for name in names:
+        raw = name.encode("utf-16-le") + b"\0\0"
+        exes += W(EXE) + D(6) + W(NAME) + D(6 + len(strings))
+        strings += W(0x8801) + D(len(raw)) + raw
+    database = W(0x7001) + D(len(exes)) + exes
+    stringtable = W(0x7801) + D(len(strings)) + strings
+    path.write_bytes(D(2) + D(1) + b"sdbf" + indexes + database + stringtable)
+    return tagids
+
+
+def test_string_keys():
+    assert ix.SdbMakeIndexKeyFromString("ALLOW_X32.EXE") == 0x414C4C4F575F5833
+    assert ix.SdbMakeIndexKeyFromString("allow_x32.exe") == 0x414C4C4F575F5833
+    assert ix.SdbMakeIndexKeyFromString("ab") == 0x4142 << 48
+    assert ix.SdbMakeIndexKeyFromString("") == 0
+    assert ix.SdbMakeIndexKeyFromString("driver_x.sys", trailing=True) == (
+        ix.SdbMakeIndexKeyFromString("ER_X.SYS")
+    )
+    # A character with a non-zero high byte takes two bytes, high byte first.
+    assert ix.SdbMakeIndexKeyFromString("Аb") == 0x0410_42 << 40
+    # Upper-casing never changes the length ("ß" has no single-character form).
+    assert ix.SdbMakeIndexKeyFromString("ß") == 0xDF << 56
+
+
+def test_binary_and_integer_keys():
+    guid = bytes.fromhex("f55ff5ef13e6d541999937a01bad42f6")
+    assert ix.SdbMakeIndexKey(guid) == 0xB7974B084FC2C66C
+    assert ix.SdbMakeIndexKey(2) == 2
+    assert ix.SdbMakeIndexKey(-1) == (1 << 64) - 1
+
+
+def test_indexes_of_database():
+    with SdbDatabase(TESTDATA_FOLDER / "app_x32.sdb") as db:
+        handle = db._handle
+        assert handle.indexes is None
+        index = ix.SdbGetIndex(handle, EXE, NAME)
+        assert index.flags == ix.SHIMDB_INDEX_UNIQUE_KEY
+        assert index._keys is None  # INDEX_BITS is decoded on first use
+        keys, tagids = index.records(handle)
+        assert list(keys) == sorted(keys) and len(tagids) == 3
+        assert ix.SdbGetIndex(handle, EXE, 0x6020) is not None
+        assert ix.SdbGetIndex(handle, 0x7008, NAME) is None
+        db.close()
+        assert handle.indexes is None
+
+
+@pytest.mark.parametrize(
+    "tag, key, value, found",
+    [
+        ("EXE", "NAME", "allow_x32.exe", [0x4A4]),
+        ("EXE", "NAME", "DISALLOW_X32.EXE", [0x51E]),
+        (EXE, NAME, "test_x32.exe", [0x598]),
+        ("EXE", "NAME", "allow_x32", []),  # same key, different name
+        ("EXE", "NAME", "missing.exe", []),
+        ("APPHELP", "HTMLHELPID", 1, [0x730]),
+        (APPHELP, HTMLHELPID, 2, [0x70C]),
+        (EXE, EXE_ID, bytes.fromhex("958a17953c449144a20c5ef72b1b77cf"), [0x51E]),
+        ("EXE", "APP_NAME", "Disallow", [0x51E]),  # not indexed
+        ("MATCHING_FILE", "NAME", "test_x64.exe", []),  # not in DATABASE
+    ],
+)
+def test_find_by_index(tag, key, value, found):
+    with SdbDatabase(TESTDATA_FOLDER / "app_x32.sdb") as db:
+        tags = db.find_by_index(tag, key, value)
+        assert [t.tag_id for t in tags] == found
+        assert all(t.tag == db._tag_number(tag) for t in tags)
+        scanned = ix.SdbScanForTags(
+            db._handle, db._tag_number(tag), db._tag_number(key), value
+        )
+        assert scanned == found
+
+
+@pytest.mark.parametrize("unique", [False, True])
+@pytest.mark.parametrize("flags", [0, ix.SHIMDB_INDEX_TRAILING_CHARACTERS])
+def test_find_shared_keys(tmp_path, flags, unique):
+    # Tags sharing a key are adjacent, as the compiler emits them.
+    names = ["longname_a.exe", "longname_b.exe", "longname_c.exe", "other.exe"]
+    if flags & ix.SHIMDB_INDEX_TRAILING_CHARACTERS:
+        names = ["a_driver.sys", "b_driver.sys", "c_driver.sys", "other.sys"]
+    flags |= ix.SHIMDB_INDEX_UNIQUE_KEY if unique else 0
+    path = tmp_path / "shared.sdb"
+    tagids = build_sdb(path, names, flags, unique)
+    with SdbDatabase(path) as db:
+        for name, tagid in zip(names, tagids):
+            assert [t.tag_id for t in db.find_by_index(EXE, NAME, name)] == [tagid]
+        assert db.find_by_index(EXE, NAME, "nothing.exe") == []
+
+
+def test_find_by_index_errors():
+    db = SdbDatabase(TESTDATA_FOLDER / "app_x32.sdb")
+    with pytest.raises(ValueError, match="Unknown tag name: NOPE"):
+        db.find_by_index("NOPE", "NAME", "x")
+    db.close()
+    with pytest.raises(ValueError, match="Database handle is not initialized"):
+        db.find_by_index("EXE", "NAME", "allow_x32.exe")
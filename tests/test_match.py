@@ -0,0 +1,129 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     tests for the EXE matching engine.
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+"""
+
+import shutil
+from pathlib import Path
+from uuid import UUID
+
+import pytest
+from sdbtool import match
+from sdbtool import apphelp
+from sdbtool.apphelp import SdbDatabase
+from sdbtool.apphelp.fileattr import (
+    TAG_BIN_FILE_VERSION,
+    TAG_COMPANY_NAME,
+    TAG_FROM_LINK_DATE,
+    TAG_FROM_PRODUCT_VERSION,
+    TAG_SIZE,
+    TAG_UPTO_BIN_FILE_VERSION,
+    TAG_UPTO_LINK_DATE,
+)
+from sdbtool.match import ExeMatcher, ExeRef, attribute_matches, get_matching_exes
+
+TESTDATA_FOLDER = Path(__file__).parent / "data"
+APP_X32 = TESTDATA_FOLDER / "app_x32.sdb"
+
+
+def test_match_test_exe():
+    (exe,) = get_matching_exes(TESTDATA_FOLDER / "test_x32.exe", APP_X32)
+    assert exe.tag_id == 0x598
+    assert exe.name == "test_x32.exe"
+    assert exe.app_name == "test_x32"
+    assert exe.vendor == "<Unknown>"
+    assert exe.exe_id == UUID("bb98b040-d552-42ea-95d2-b8cce25e2a24")
+    assert exe.refs == [
+        ExeRef("SHIM_REF", 0x6D4, "IgnoreFreeLibrary"),
+        ExeRef("LAYER", 0x700, "ShimEngineBasicTestLayer"),
+    ]
+    # test_x64.exe only has an EXE entry in the 64-bit database.
+    assert get_matching_exes(TESTDATA_FOLDER / "test_x64.exe", APP_X32) == []
+    (exe,) = get_matching_exes(
+        TESTDATA_FOLDER / "test_x64.exe", TESTDATA_FOLDER / "app_x64.sdb"
+    )
+    assert exe.name == "test_x64.exe"
+
+
+def test_match_by_name(tmp_path):
+    # The allow / disallow entries only need a file with that name.
+    for name in ("allow_x32.exe", "DISALLOW_X32.EXE"):
+        shutil.copy(TESTDATA_FOLDER / "test_x32.exe", tmp_path / name)
+        (exe,) = get_matching_exes(tmp_path / name, APP_X32)
+        assert exe.name.lower() == name.lower() and exe.refs == []
+    shutil.copy(TESTDATA_FOLDER / "test_x32.exe", tmp_path / "other.exe")
+    assert get_matching_exes(tmp_path / "other.exe", APP_X32) == []
+
+
+def test_match_needs_every_matching_file(tmp_path):
+    # test_x32.exe also requires a test_x64.exe of 2560 bytes next to it.
+    shutil.copy(TESTDATA_FOLDER / "test_x32.exe", tmp_path / "test_x32.exe")
+    assert get_matching_exes(tmp_path / "test_x32.exe", APP_X32) == []
+    shutil.copy(TESTDATA_FOLDER / "test_x64.exe", tmp_path / "test_x64.exe")
+    assert len(get_matching_exes(tmp_path / "test_x32.exe", APP_X32)) == 1
+    with open(tmp_path / "test_x64.exe", "ab") as f:
+        f.write(b"\0")  # SIZE no longer matches
+    assert get_matching_exes(tmp_path / "test_x32.exe", APP_X32) == []
+
+
+def test_candidates_use_the_index(monkeypatch):
+    with SdbDatabase(APP_X32) as db:
+        matcher = ExeMatcher(db)
+        monkeypatch.setattr(
+            apphelp, "SdbScanForTags", lambda *args: pytest.fail("scanned")
+        )
+        exes = matcher.candidates(str(Path("x") / "Test_X32.exe"))
+        assert [exe.tag_id for exe in exes] == [0x598]
+        assert matcher.candidates("unknown.exe") == []
+
+
+def test_wildcard_candidates(monkeypatch):
+    with SdbDatabase(APP_X32) as db:
+        matcher = ExeMatcher(db)
+        exe = db.find_by_index("EXE", "NAME", "allow_x32.exe")[0]
+        monkeypatch.setattr(matcher, "_wildcards", [("ALLOW_*.EXE", exe)])
+        assert [e.tag_id for e in matcher.candidates("allow_new.exe")] == [0x4A4]
+        assert matcher.candidates("deny.exe") == []
+
+
+@pytest.mark.parametrize(
+    "tag, expected, actual, result",
+    [
+        (TAG_SIZE, 2048, 2048, True),
+        (TAG_SIZE, 2048, 2049, False),
+        (TAG_SIZE, 2048, None, False),  # attribute not available
+        (TAG_COMPANY_NAME, "companyname", "CompanyName", True),
+        (TAG_COMPANY_NAME, "Company*", "CompanyName", True),
+        (TAG_COMPANY_NAME, "C?mpanyName", "CompanyName", True),
+        (TAG_COMPANY_NAME, "Other*", "CompanyName", False),
+        (TAG_COMPANY_NAME, "CompanyName", 1, False),
+        (TAG_BIN_FILE_VERSION, 0x0001_0002_FFFF_FFFF, 0x0001_0002_0003_0004, True),
+        (TAG_BIN_FILE_VERSION, 0x0001_0003_FFFF_FFFF, 0x0001_0002_0003_0004, False),
+        (TAG_UPTO_BIN_FILE_VERSION, 0x0001_0002_0003_0004, 0x0001_0002_0003_0004, True),
+        (
+            TAG_UPTO_BIN_FILE_VERSION,
+            0x0001_0002_0003_0003,
+            0x0001_0002_0003_0004,
+            False,
+        ),
+        (TAG_FROM_LINK_DATE, 1000, 1000, True),
+        (TAG_FROM_LINK_DATE, 1001, 1000, False),
+        (TAG_UPTO_LINK_DATE, 999, 1000, False),
+        (TAG_UPTO_LINK_DATE, 1001, 1000, True),
+        (TAG_FROM_PRODUCT_VERSION, "1.0.0.1", "1.0.0.10", True),
+        (TAG_FROM_PRODUCT_VERSION, "1.2", "1.10.0.0", True),
+        (TAG_FROM_PRODUCT_VERSION, "2.0", "1.10.0.0", False),
+        (TAG_FROM_PRODUCT_VERSION, "2.0", "not a version", False),
+    ],
+)
+def test_attribute_matches(tag, expected, actual, result):
+    assert attribute_matches(tag, expected, actual) is result
+
+
+def test_get_matching_exes_errors(tmp_path):
+    bad = tmp_path / "bad.sdb"
+    bad.write_bytes(b"not an sdb")
+    with pytest.raises(ValueError, match="Failed to open database"):
+        get_matching_exes(TESTDATA_FOLDER / "test_x32.exe", bad)
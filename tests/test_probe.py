@@ -0,0 +1,150 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     tests for the header-and-metadata probe.
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+"""
+
+import random
+import struct
+from pathlib import Path
+
+import pytest
+from sdbtool.apphelp import sdb_reader as r
+from sdbtool.apphelp.probe import MAX_LEADING_CHILDREN, SdbProbeDatabase
+from sdbtool.info import get_info
+
+TESTDATA_FOLDER = Path(__file__).parent / "data"
+SDB_FILES = ["all_tagtypes.sdb", "app_x32.sdb", "app_x64.sdb"]
+
+
+def W(v: int) -> bytes:
+    return struct.pack("<H", v)
+
+
+def D(v: int) -> bytes:
+    return struct.pack("<I", v)
+
+
+def leading_children(pdb, database: int) -> list[int]:
+    """The DATABASE children a probe searches: those before the first LIST."""
+    children = []
+    child = r.SdbGetFirstChild(pdb, database)
+    while child != r.TAGID_NULL and len(children) < MAX_LEADING_CHILDREN:
+        if r.SdbGetTagFromTagID(pdb, child) & r.TAG_TYPE_MASK == r.TAG_TYPE_LIST:
+            break
+        children.append(child)
+        child = r.SdbGetNextChild(pdb, database, child)
+    return children
+
+
+def assert_probe_matches_open(path: Path):
+    """The probe reports what a full open does, for metadata it can reach."""
+    pdb = r.SdbOpenDatabase(str(path))
+    probe = SdbProbeDatabase(str(path))
+    if pdb is None:
+        assert probe is None
+        return
+    assert probe is not None
+    assert (probe.major, probe.minor) == (pdb.major, pdb.minor)
+    assert probe.stringtable == pdb.stringtable
+
+    database = r.SdbFindFirstTag(pdb, r.TAGID_ROOT, 0x7001)
+    reachable = {r.TAGID_NULL}
+    if database != r.TAGID_NULL:
+        reachable.update(leading_children(pdb, database))
+
+    def reached(tag: int) -> bool:
+        return database == r.TAGID_NULL or (
+            r.SdbFindFirstTag(pdb, database, tag) in reachable
+        )
+
+    assert probe.database_id == (pdb.database_id if reached(0x9007) else None)
+    assert probe.database_name == (pdb.database_name if reached(0x6001) else None)
+    if all(reached(tag) for tag in (0x9007, 0x6001, 0x4021)):
+        assert get_info(path) == get_info(path, probe=False)
+
+
+@pytest.mark.parametrize("name", SDB_FILES)
+def test_probe_matches_open(name):
+    assert_probe_matches_open(TESTDATA_FOLDER / name)
+
+
+def test_probe_matches_open_damaged(tmp_path):
+    data = (TESTDATA_FOLDER / "app_x32.sdb").read_bytes()
+    path = tmp_path / "damaged.sdb"
+    # Every truncation of the file...
+    for size in range(0, len(data) + 1, 7):
+        path.write_bytes(data[:size])
+        assert_probe_matches_open(path)
+    # ...and corrupted bytes throughout it.
+    rng = random.Random(0x5DB)
+    for _ in range(300):
+        damaged = bytearray(data)
+        for _ in range(rng.randrange(1, 4)):
+            damaged[rng.randrange(12, len(data))] = rng.randrange(256)
+        path.write_bytes(bytes(damaged))
+        assert_probe_matches_open(path)
+
+
+def test_probe_rejects(tmp_path):
+    path = tmp_path / "bad.sdb"
+    for data in (
+        b"",
+        b"\x02\x00\x00\x00\x00\x00\x00\x00sdb",
+        b"\x04" + b"\0" * 7 + b"sdbf",
+    ):
+        path.write_bytes(data)
+        assert SdbProbeDatabase(str(path)) is None
+    assert SdbProbeDatabase(str(tmp_path / "missing.sdb")) is None
+
+
+def big_database(meta: bytes, after: bytes = b"") -> bytes:
+    """A database with ``meta``, 8 MB of EXE lists, ``after`` and a STRINGTABLE."""
+    name = "big".encode("utf-16-le") + b"\0\0"
+    exes = (W(0x7007) + D(1 << 20) + bytes(1 << 20)) * 8
+    children = meta + exes + after
+    database = W(0x7001) + D(len(children)) + children
+    strings = W(0x7801) + D(6 + len(name)) + W(0x8801) + D(len(name)) + name
+    return D(2) + D(1) + b"sdbf" + database + strings
+
+
+def test_probe_reads_little(tmp_path):
+    # DATABASE: NAME, RUNTIME_PLATFORM, DATABASE_ID, then 8 MB of EXE lists.
+    meta = W(0x6001) + D(6) + W(0x4021) + D(0x82) + W(0x9007) + D(16) + bytes(16)
+    path = tmp_path / "big.sdb"
+    path.write_bytes(big_database(meta))
+
+    probe = SdbProbeDatabase(str(path))
+    assert probe.database_name == "big"
+    assert probe.runtime_platform == 0x82
+    assert probe.database_id == bytes(16)
+    assert probe.bytes_read <= 3 * 4096
+    assert_probe_matches_open(path)
+
+
+def test_probe_reads_little_without_runtime_platform(tmp_path):
+    # A missing RUNTIME_PLATFORM must not make the probe walk every EXE.
+    path = tmp_path / "big.sdb"
+    path.write_bytes(big_database(W(0x6001) + D(6) + W(0x9007) + D(16) + bytes(16)))
+    probe = SdbProbeDatabase(str(path))
+    assert probe.database_name == "big"
+    assert probe.runtime_platform is None
+    assert probe.bytes_read <= 3 * 4096
+    assert_probe_matches_open(path)
+
+
+def test_probe_leading_children_only(tmp_path):
+    # Metadata after the first list, or past the child budget, is not found.
+    path = tmp_path / "late.sdb"
+    path.write_bytes(big_database(b"", after=W(0x6001) + D(6)))
+    probe = SdbProbeDatabase(str(path))
+    assert probe.database_name is None
+    assert r.SdbOpenDatabase(str(path)).database_name == "big"
+    assert probe.bytes_read <= 3 * 4096
+
+    padding = (W(0x4001) + D(0)) * MAX_LEADING_CHILDREN
+    path.write_bytes(big_database(padding + W(0x6001) + D(6)))
+    assert SdbProbeDatabase(str(path)).database_name is None
+    path.write_bytes(big_database(padding[6:] + W(0x6001) + D(6)))
+    assert SdbProbeDatabase(str(path)).database_name == "big"
@@ -0,0 +1,231 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     tests for the tag selectors.
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+"""
+
+import io
+import json
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import pytest
+from sdbtool import query
+from sdbtool.apphelp import SdbDatabase
+from sdbtool.query import (
+    Predicate,
+    Step,
+    parse_selector,
+    select,
+    write_json,
+    write_text,
+    write_xml,
+)
+from sdbtool.sdb2json import convert as sdb2json_convert
+from sdbtool.sdb2xml import XmlAnnotations, convert as sdb2xml_convert
+
+TESTDATA_FOLDER = Path(__file__).parent / "data"
+EXE, NAME, LAYER, SIZE = 0x7007, 0x6001, 0x700B, 0x4001
+TEST_X32_ID = "{bb98b040-d552-42ea-95d2-b8cce25e2a24}"
+
+
+@pytest.fixture
+def db():
+    with SdbDatabase(TESTDATA_FOLDER / "app_x32.sdb") as db:
+        yield db
+
+
+def test_parse_selector():
+    assert parse_selector("DATABASE/EXE") == parse_selector("/DATABASE/EXE")
+    assert parse_selector(" //EXE[NAME='a\\'b'] [SIZE = 0x800]/*[LAYER] ") == [
+        Step(
+            True,
+            frozenset({EXE}),
+            (
+                Predicate(frozenset({NAME}), "=", "a'b"),
+                Predicate(frozenset({SIZE}), "=", 0x800),
+            ),
+        ),
+        Step(False, None, (Predicate(frozenset({LAYER})),)),
+    ]
+
+
+@pytest.mark.parametrize(
+    "selector, message",
+    [
+        ("", "Unexpected end of selector"),
+        ("//EXE[", "Unexpected end of selector"),
+        ("DATABASE EXE", "Unexpected 'EXE'"),
+        ("//EXE[NAME=setup]", "Expected a string or a number"),
+        ("//EXE[SIZE~1]", "'~' needs a string"),
+        ("//NOPE", "Unknown tag name: NOPE"),
+        ('//EXE[NAME="x"', "Unexpected end of selector"),
+        ("//EXE{", "Invalid selector at position 5"),
+    ],
+)
+def test_parse_selector_errors(selector, message):
+    with pytest.raises(ValueError, match=message):
+        parse_selector(selector)
+
+
+@pytest.mark.parametrize(
+    "selector, found",
+    [
+        ("DATABASE/EXE/NAME", [0x4AA, 0x524, 0x59E]),
+        ("EXE", []),  # not a top-level tag
+        ('DATABASE/EXE[NAME="TEST_X32.EXE"]/SHIM_REF/NAME', [0x6DA]),
+        ('//LAYER[NAME~"basic"]', [0x700]),
+        ("//MATCHING_FILE[SIZE=2560]/NAME", [0x65E]),
+        ("//MATCHING_FILE[SIZE=0xA00]/NAME", [0x65E]),
+        (f'//EXE[EXE_ID="{TEST_X32_ID}"]', [0x598]),
+        ('//EXE[NAME!="test_x32.exe"]', [0x4A4, 0x51E]),
+        ("/DATABASE/*[SHIM_REF]", [0x598]),
+        ("//APPHELP[HTMLHELPID=1]", [0x4E8, 0x730]),
+        ("//APPHELP//HTMLHELPID", [0x4FA, 0x574, 0x712, 0x736]),
+        ("//EXE[NAME=1]", []),  # a string is never a number
+        ("//0x700B", [0x700]),
+    ],
+)
+def test_select(db, selector, found):
+    assert [tag.tag_id for tag in select(db, selector)] == found
+
+
+def test_select_prunes(db, monkeypatch):
+    read = []
+    original = query._children
+
+    def children(pdb, parent, tag):
+        read.append(tag)
+        return original(pdb, parent, tag)
+
+    monkeypatch.setattr(query, "_children", children)
+    names = [tag.read_string() for tag in select(db, "//LAYER/NAME")]
+    assert names == ["ShimEngineBasicTestLayer"]
+    # only lists that can hold a LAYER are entered (then LAYER for /NAME):
+    # not MATCHING_FILE, SHIM_REF, STRINGTABLE, INDEXES, ...
+    assert set(read) == {0, 0x7001, EXE, LAYER}  # root, DATABASE
+    read.clear()
+    assert len(list(select(db, "//STRINGTABLE_ITEM"))) == 27
+    assert set(read) == {0, 0x7801}  # root, STRINGTABLE
+    read.clear()
+    list(select(db, "DATABASE/EXE/NAME"))
+    assert read.count(EXE) == 3 and LAYER not in read  # children only
+
+
+def _json_nodes(nodes):
+    for node in nodes:
+        yield node
+        yield from _json_nodes(node.get("children", ()))
+
+
+def test_select_output_names():
+    # names copied from the sdb2json / sdb2xml output of older releases
+    assert parse_selector("//S16BIT_DESCRIPTION") == parse_selector(
+        "//16BIT_DESCRIPTION"
+    )
+    assert parse_selector("//MSI_TRANSFORM", "0501") == parse_selector(
+        '//"MSI TRANSFORM"', "0501"
+    )
+    assert parse_selector("//EXE['EXE_ID(GUID)']", "0501") == parse_selector(
+        "//EXE[EXE_ID]", "0501"
+    )
+    with SdbDatabase(TESTDATA_FOLDER / "app_x32.sdb", target_os="0501") as db:
+        out = io.StringIO()
+        sdb2json_convert(db, out, [], False, False, False)
+        nodes = list(_json_nodes(json.loads(out.getvalue())["children"]))
+        names = {node["tag"] for node in nodes}
+        assert {"EXE_ID", "DATABASE_ID"} <= names
+        for name in names:
+            found = list(select(db, f"//{name}"))
+            assert len(found) == sum(node["tag"] == name for node in nodes), name
+        out = io.StringIO()
+        sdb2xml_convert(db, out, [], XmlAnnotations.Disabled, False, False)
+        elements = list(ET.fromstring(out.getvalue()).iter())[1:]
+        for name in {element.tag for element in elements}:
+            found = list(select(db, f"//{name}"))
+            assert len(found) == sum(e.tag == name for e in elements), name
+
+
+def test_select_closed_database():
+    db = SdbDatabase(TESTDATA_FOLDER / "app_x32.sdb")
+    db.close()
+    with pytest.raises(ValueError, match="Database handle is not initialized"):
+        list(select(db, "//EXE"))
+
+
+def test_write_json(db):
+    out = io.StringIO()
+    assert write_json(db, select(db, "DATABASE/EXE"), out, [], True, True, True) == 3
+    result = json.loads(out.getvalue())
+    # The same nodes as in the full sdb2json document...
+    full = io.StringIO()
+    sdb2json_convert(db, full, [], True, True, True)
+    database = next(
+        c for c in json.loads(full.getvalue())["children"] if c["tag"] == "DATABASE"
+    )
+    exes = [c for c in database["children"] if c["tag"] == "EXE"]
+    assert result == {
+        "file": "app_x32.sdb",
+        "tagid": 0,
+        "tag_num": "0x0",
+        "children": exes,
+    }
+    # ...written exactly like json.dump(indent=2) writes them.
+    assert out.getvalue() == json.dumps(result, indent=2) + "\n"
+
+    out = io.StringIO()
+    assert (
+        write_json(db, select(db, "//LAYER[NAME='x']"), out, [], True, False, False)
+        == 0
+    )
+    empty = {"file": "app_x32.sdb", "children": []}
+    assert out.getvalue() == json.dumps(empty, indent=2) + "\n"
+
+
+def test_write_json_exclude(db):
+    out = io.StringIO()
+    count = write_json(
+        db, select(db, "DATABASE/*"), out, ["EXE", "NAME"], False, False, False
+    )
+    tags = [c["tag"] for c in json.loads(out.getvalue())["children"]]
+    assert "EXE" not in tags and count == len(tags)
+    assert '"NAME"' not in out.getvalue()
+
+
+def test_write_xml(db):
+    out = io.StringIO()
+    selected = select(db, '//EXE[NAME="test_x32.exe"]/SHIM_REF')
+    assert write_xml(db, selected, out, [], False, True, False) == 1
+    root = ET.fromstring(out.getvalue())
+    assert root.tag == "SDB" and root.get("file") == "app_x32.sdb"
+    (shim_ref,) = root
+    assert shim_ref.tag == "SHIM_REF" and shim_ref.get("tagid") == str(0x6D4)
+    assert shim_ref.find("NAME").text == "IgnoreFreeLibrary"
+
+
+def test_write_text(db):
+    out = io.StringIO()
+    write_text(db, select(db, "//EXE/EXE_ID"), out, [], True, False, False)
+    assert (
+        out.getvalue().splitlines()[-1] == f"QLCYu1LV6kKV0rjM4l4qJA== ({TEST_X32_ID})"
+    )
+    out = io.StringIO()
+    write_text(
+        db,
+        select(db, "DATABASE/EXE[NAME='allow_x32.exe']/*"),
+        out,
+        [],
+        False,
+        True,
+        True,
+    )
+    assert out.getvalue().splitlines()[:2] == [
+        "1194 0x6001 allow_x32.exe",
+        "1200 0x6006 allow",
+    ]
+    out = io.StringIO()
+    write_text(
+        db, select(db, "//SHIM_REF/INEXCLUDE/*"), out, ["MODULE"], False, False, False
+    )
+    assert out.getvalue() == "INCLUDE\n"
@@ -8,12 +8,23 @@ COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
 import io
 import json
 from pathlib import Path
+from sdbtool import sdb2json
 from sdbtool.sdb2json import (
+    FilteringVisitor,
+    JsonStreamVisitor,
     JsonTagVisitor,
     convert as sdb2json_convert,
+    convert_ndjson as sdb2json_convert_ndjson,
     tagtype_to_jsontype,
 )
-from sdbtool.apphelp import TAGID_ROOT, PathType, SdbDatabase, Tag, TagType, winapi
+from sdbtool.apphelp import (
+    TAGID_ROOT,
+    PathType,
+    SdbDatabase,
+    Tag,
+    TagType,
+    winapi,
+)
 import pytest
 
 TESTDATA_FOLDER = Path(__file__).parent / "data"
@@ -377,7 +388,7 @@ def test_tagtype_to_jsontype():
 
 
 def test_JsonTagVisitor_invalid_visit(monkeypatch):
-    def mock_SdbOpenDatabase(path, path_type):
+    def mock_SdbOpenDatabase(path, path_type, use_mmap=False):
         return None
 
     monkeypatch.setattr(winapi, "SdbOpenDatabase", mock_SdbOpenDatabase)
@@ -398,7 +409,7 @@ def test_JsonTagVisitor_invalid_visit(monkeypatch):
 
 
 def test_convert_raises_when_root_is_none(monkeypatch):
-    def mock_SdbOpenDatabase(path, path_type):
+    def mock_SdbOpenDatabase(path, path_type, use_mmap=False):
         return None
 
     monkeypatch.setattr(winapi, "SdbOpenDatabase", mock_SdbOpenDatabase)
@@ -449,3 +460,137 @@ def test_json_normalizes_tag_names():
     v.visit_list_end(_FakeTag("MSI TRANSFORM", TagType.LIST, tag_id=1))
     names = [c["tag"] for c in v.result()["children"]]
     assert names == ["EXE_ID", "16BIT_DESCRIPTION", "MSI_TRANSFORM"]
+
+
+@pytest.mark.parametrize("db_name", ["all_tagtypes.sdb", "app_x32.sdb"])
+@pytest.mark.parametrize(
+    "exclude_tags",
+    [[], ["INDEXES", "STRINGTABLE"], ["EXE", "NAME", "PATCH"], ["DATABASE"], ["SDB"]],
+)
+@pytest.mark.parametrize("with_annotations", [True, False])
+@pytest.mark.parametrize("with_tagid, with_tag", [(False, False), (True, True)])
+def test_stream_matches_json_dump(
+    db_name, exclude_tags, with_annotations, with_tagid, with_tag
+):
+    with SdbDatabase(TESTDATA_FOLDER / db_name) as db:
+        options = (with_annotations, with_tagid, with_tag)
+        tree = JsonTagVisitor(db.name, *options)
+        db.root().accept(FilteringVisitor(tree, exclude_tags))
+        streamed = io.StringIO()
+        sdb2json_convert(db, streamed, exclude_tags, *options)
+    assert streamed.getvalue() == json.dumps(tree.result(), indent=2) + "\n"
+
+
+def test_stream_fragment():
+    out = io.StringIO()
+    visitor = JsonStreamVisitor(
+        out, "f.sdb", with_annotations=False, with_tagid=False, with_tag=False, depth=2
+    )
+    visitor.visit(_FakeTag("NAME", TagType.NULL))
+    visitor.visit_list_begin(_FakeTag("EXE", TagType.LIST, tag_id=6))
+    visitor.visit_list_end(_FakeTag("EXE", TagType.LIST, tag_id=6))
+    assert out.getvalue() == (
+        "\n"
+        '        {\n          "tag": "NAME",\n          "type": "null"\n        },\n'
+        '        {\n          "tag": "EXE",\n          "children": []\n        }'
+    )
+
+
+def test_ndjson(all_tags_sdb):
+    output = io.StringIO()
+    sdb2json_convert_ndjson(all_tags_sdb, output, ["STRINGTABLE"], True)
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert output.getvalue().endswith("\n")
+    database, first, null = records[:3]
+    assert database == {
+        "tagid": database["tagid"],
+        "parent": 0,
+        "depth": 1,
+        "tag_num": "0x7001",
+        "tag": "DATABASE",
+        "type": "list",
+        "value": None,
+        "comment": None,
+    }
+    assert (first["tag"], first["parent"], first["depth"]) == (
+        "InvalidTag_0x7000",
+        database["tagid"],
+        2,
+    )
+    assert (null["type"], null["value"]) == ("null", None)
+    assert not any(r["tag"].startswith("STRINGTABLE") for r in records)
+    exe_id = [r for r in records if r["tag"] == "EXE_ID"][-1]
+    assert exe_id["comment"] == "{55667788-1122-1122-1122-334455667788}"
+    # Every parent is a list that came before its children.
+    seen = {0: 0}
+    for record in records:
+        assert seen[record["parent"]] == record["depth"] - 1
+        if record["type"] == "list":
+            seen[record["tagid"]] = record["depth"]
+
+    output = io.StringIO()
+    sdb2json_convert_ndjson(all_tags_sdb, output, [], False)
+    assert all(
+        "comment" not in json.loads(line) for line in output.getvalue().splitlines()
+    )
+
+
+def test_ndjson_chunks(all_tags_sdb, monkeypatch):
+    monkeypatch.setattr(sdb2json, "_CHUNK", 100)
+    writes = []
+
+    class Stream:
+        def write(self, text):
+            writes.append(text)
+
+        def flush(self):
+            writes.append(None)
+
+    sdb2json_convert_ndjson(all_tags_sdb, Stream(), [], True)
+    chunks = [w for w in writes if w is not None]
+    assert len(chunks) > 1
+    assert all(chunk.endswith("\n") for chunk in chunks)
+    assert writes[-1] is None
+
+
+@pytest.mark.parametrize("db_name", ["all_tagtypes.sdb", "app_x32.sdb"])
+@pytest.mark.parametrize("exclude_tags", [[], ["INDEXES", "EXE"], ["SDB"]])
+@pytest.mark.parametrize("typed_values", [True, False])
+def test_compact_matches_json_dump(db_name, exclude_tags, typed_values):
+    with SdbDatabase(TESTDATA_FOLDER / db_name) as db:
+        tree = JsonTagVisitor(db.name, True, True, True, typed_values=typed_values)
+        db.root().accept(FilteringVisitor(tree, exclude_tags))
+        compact = io.StringIO()
+        sdb2json_convert(
+            db,
+            compact,
+            exclude_tags,
+            True,
+            True,
+            True,
+            compact=True,
+            typed_values=typed_values,
+        )
+    expected = json.dumps(tree.result(), separators=(",", ":"))
+    assert compact.getvalue() == expected + "\n"
+
+
+def test_typed_values(all_tags_sdb):
+    output = io.StringIO()
+    sdb2json_convert(all_tags_sdb, output, [], False, False, False, typed_values=True)
+    values = {
+        child["tag"]: child["value"]
+        for child in json.loads(output.getvalue())["children"][0]["children"]
+        if "value" in child
+    }
+    assert values["InvalidTag_0x2000"] == 255
+    assert values["InvalidTag_0x3000"] == 65535
+    assert values["InvalidTag_0x4000"] == 4294967295
+    # Above 2**53: kept as a string, or readers would round it.
+    assert values["InvalidTag_0x5000"] == "18446744073709551615"
+    assert values["InvalidTag_0x8000"] == ""
+
+    output = io.StringIO()
+    sdb2json_convert_ndjson(all_tags_sdb, output, [], False, typed_values=True)
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert next(r for r in records if r["type"] == "byte")["value"] == 255
@@ -13,7 +13,14 @@ from sdbtool.sdb2xml import (
     convert as sdb2xml_convert,
     tagtype_to_xmltype,
 )
-from sdbtool.apphelp import TAGID_ROOT, PathType, SdbDatabase, Tag, TagType, winapi
+from sdbtool.apphelp import (
+    TAGID_ROOT,
+    PathType,
+    SdbDatabase,
+    Tag,
+    TagType,
+    winapi,
+)
 import pytest
 
 TESTDATA_FOLDER = Path(__file__).parent / "data"
@@ -158,7 +165,7 @@ def test_tagtype_to_xmltype():
 
 
 def test_XmlTagVisitor_invalid_visit(monkeypatch):
-    def mock_SdbOpenDatabase(path, type):
+    def mock_SdbOpenDatabase(path, type, use_mmap=False):
         return None
 
     monkeypatch.setattr(winapi, "SdbOpenDatabase", mock_SdbOpenDatabase)
@@ -6,6 +6,7 @@ COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
 """
 
 import struct
+import sys
 import pytest
 from sdbtool.apphelp import sdb_reader as r
 from sdbtool.apphelp.sdb_reader import SdbFile
@@ -195,3 +196,128 @@ def test_open_database(tmp_path):
     ok.write_bytes(D(2) + D(1) + b"sdbf")
     pdb = r.SdbOpenDatabase(str(ok))
     assert pdb is not None and pdb.major == 2 and pdb.minor == 1
+
+
+def test_open_database_mmap(tmp_path):
+    empty = tmp_path / "empty.sdb"
+    empty.write_bytes(b"")
+    assert r.SdbOpenDatabase(str(empty), use_mmap=True) is None  # cannot map
+    badmagic = tmp_path / "bm.sdb"
+    badmagic.write_bytes(D(2) + D(0) + b"XXXX")
+    assert r.SdbOpenDatabase(str(badmagic), use_mmap=True) is None
+    badver = tmp_path / "bv.sdb"
+    badver.write_bytes(D(9) + D(0) + b"sdbf")
+    assert r.SdbOpenDatabase(str(badver), use_mmap=True) is None
+
+    ok = tmp_path / "ok.sdb"
+    ok.write_bytes(D(2) + D(1) + b"sdbf" + W(0x4001) + D(42))
+    pdb = r.SdbOpenDatabase(str(ok), use_mmap=True)
+    assert pdb is not None and pdb.is_mapped
+    assert r.SdbReadDWORDTag(pdb, 12) == 42
+    r.SdbCloseDatabase(pdb)
+    assert pdb.size == 0 and not pdb.is_mapped
+    assert r.SdbReadDWORDTag(pdb, 12, default=7) == 7  # closed: reads fail
+    r.SdbCloseDatabase(None)  # tolerated
+
+
+def test_mmap_reads_match_in_memory():
+    from pathlib import Path
+
+    data_dir = Path(__file__).parent / "data"
+    for name in ("all_tagtypes.sdb", "app_x32.sdb"):
+        plain = r.SdbOpenDatabase(str(data_dir / name))
+        mapped = r.SdbOpenDatabase(str(data_dir / name), use_mmap=True)
+        assert plain is not None and mapped is not None
+        assert not plain.is_mapped and mapped.is_mapped
+        assert mapped.stringtable == plain.stringtable
+        assert mapped.database_id == plain.database_id
+        assert mapped.database_name == plain.database_name
+        for tagid in range(12, plain.size, 2):
+            assert r.SdbGetTagFromTagID(mapped, tagid) == r.SdbGetTagFromTagID(
+                plain, tagid
+            )
+            assert r.SdbGetStringTagPtr(mapped, tagid) == r.SdbGetStringTagPtr(
+                plain, tagid
+            )
+        r.SdbCloseDatabase(mapped)
+        r.SdbCloseDatabase(plain)
+
+
+def _string_table_db(*texts: str) -> SdbFile:
+    """A STRINGTABLE with ``texts``, followed by one STRINGREF per entry."""
+    items = b""
+    offsets = []
+    for text in texts:
+        raw = text.encode("utf-16-le") + b"\x00\x00"
+        offsets.append(6 + len(items))
+        items += W(0x8801) + D(len(raw)) + raw
+    table = W(0x7801) + D(len(items)) + items
+    refs = b"".join(W(0x6001) + D(off) for off in offsets)
+    return mk(HDR + table + refs, stringtable=12)
+
+
+def _stringref_tagids(pdb: SdbFile, count: int) -> list[int]:
+    first = pdb.size - count * 6
+    return [first + i * 6 for i in range(count)]
+
+
+def test_string_cache_hits_and_interning():
+    pdb = _string_table_db("vendor", "shim")
+    refs = _stringref_tagids(pdb, 2)
+    first = r.SdbGetStringTagPtr(pdb, refs[0])
+    assert first == "vendor"
+    assert (pdb.strings.hits, pdb.strings.misses) == (0, 1)
+    again = r.SdbGetStringTagPtr(pdb, refs[0])
+    assert again is first  # served from the cache
+    assert (pdb.strings.hits, pdb.strings.misses) == (1, 1)
+    assert r.SdbGetStringTagPtr(pdb, refs[1]) == "shim"
+    assert len(pdb.strings) == 2
+    # Interned: equal strings from elsewhere are the same object.
+    assert first is sys.intern("".join(["ven", "dor"]))
+
+
+def test_string_cache_lru_eviction():
+    pdb = _string_table_db("a", "b", "c")
+    r.SdbSetStringCache(pdb, maxsize=2)
+    a, b, c = _stringref_tagids(pdb, 3)
+    r.SdbGetStringTagPtr(pdb, a)
+    r.SdbGetStringTagPtr(pdb, b)
+    r.SdbGetStringTagPtr(pdb, a)  # a is now the most recently used
+    r.SdbGetStringTagPtr(pdb, c)  # evicts b
+    assert len(pdb.strings) == 2
+    misses = pdb.strings.misses
+    assert r.SdbGetStringTagPtr(pdb, a) == "a"
+    assert pdb.strings.misses == misses
+    assert r.SdbGetStringTagPtr(pdb, b) == "b"
+    assert pdb.strings.misses == misses + 1
+
+
+def test_string_cache_disabled():
+    pdb = _string_table_db("a")
+    r.SdbSetStringCache(pdb, maxsize=0)
+    (ref,) = _stringref_tagids(pdb, 1)
+    assert r.SdbGetStringTagPtr(pdb, ref) == "a"
+    assert r.SdbGetStringTagPtr(pdb, ref) == "a"
+    assert len(pdb.strings) == 0 and pdb.strings.misses == 2
+
+
+def test_string_cache_eager():
+    pdb = _string_table_db("a", "b", "c")
+    r.SdbSetStringCache(pdb, maxsize=1, eager=True)
+    assert pdb.strings.eager and len(pdb.strings) == 3  # maxsize ignored
+    assert [r.SdbGetStringTagPtr(pdb, t) for t in _stringref_tagids(pdb, 3)] == [
+        "a",
+        "b",
+        "c",
+    ]
+    assert (pdb.strings.hits, pdb.strings.misses) == (3, 0)
+    # Without a string table there is nothing to load.
+    assert r.SdbLoadStringTable(mk(HDR)) == 0
+
+
+def test_string_cache_failed_lookup_is_cached():
+    # A reference past the end of the file fails, and keeps failing from the cache.
+    pdb = mk(HDR + W(0x7801) + D(0) + W(0x6001) + D(1000), stringtable=12)
+    assert r.SdbGetStringTagPtr(pdb, 18) is None
+    assert r.SdbGetStringTagPtr(pdb, 18) is None
+    assert (pdb.strings.hits, pdb.strings.misses) == (1, 1)
@@ -0,0 +1,90 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     tests for the parallel (sharded) conversion.
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+"""
+
+import io
+from pathlib import Path
+
+import pytest
+from sdbtool import shard
+from sdbtool.apphelp import SdbDatabase
+from sdbtool.apphelp.sdb_reader import SdbGetFirstChild, SdbGetNextChild
+from sdbtool.sdb2json import (
+    convert as sdb2json_convert,
+    convert_ndjson as sdb2json_convert_ndjson,
+)
+from sdbtool.sdb2xml import XmlAnnotations, convert as sdb2xml_convert
+
+TESTDATA_FOLDER = Path(__file__).parent / "data"
+DATABASE = 0x7001
+
+
+@pytest.fixture(scope="module", params=["app_x32.sdb", "all_tagtypes.sdb"])
+def db(request):
+    with SdbDatabase(TESTDATA_FOLDER / request.param) as db:
+        yield db
+
+
+OPTIONS = [
+    ([], True, False, False),
+    (["INDEXES", "STRINGTABLE"], False, True, True),
+    (["EXE", "NAME"], True, True, False),
+    (["DATABASE"], True, False, True),
+]
+
+
+@pytest.mark.parametrize("exclude, annotations, with_tagid, with_tag", OPTIONS)
+def test_xml_is_byte_identical(db, exclude, annotations, with_tagid, with_tag):
+    annotations = XmlAnnotations.Comment if annotations else XmlAnnotations.Disabled
+    serial, parallel = io.StringIO(), io.StringIO()
+    sdb2xml_convert(db, serial, exclude, annotations, with_tagid, with_tag)
+    sdb2xml_convert(db, parallel, exclude, annotations, with_tagid, with_tag, jobs=2)
+    assert parallel.getvalue() == serial.getvalue()
+
+
+@pytest.mark.parametrize("exclude, annotations, with_tagid, with_tag", OPTIONS)
+def test_json_is_byte_identical(db, exclude, annotations, with_tagid, with_tag):
+    serial, parallel = io.StringIO(), io.StringIO()
+    sdb2json_convert(db, serial, exclude, annotations, with_tagid, with_tag)
+    sdb2json_convert(db, parallel, exclude, annotations, with_tagid, with_tag, jobs=3)
+    assert parallel.getvalue() == serial.getvalue()
+
+
+@pytest.mark.parametrize("exclude, annotations, with_tagid, with_tag", OPTIONS)
+def test_ndjson_is_byte_identical(db, exclude, annotations, with_tagid, with_tag):
+    serial, parallel = io.StringIO(), io.StringIO()
+    sdb2json_convert_ndjson(db, serial, exclude, annotations)
+    sdb2json_convert_ndjson(db, parallel, exclude, annotations, jobs=2)
+    assert parallel.getvalue() == serial.getvalue()
+
+
+@pytest.mark.parametrize("exclude, annotations, with_tagid, with_tag", OPTIONS)
+def test_compact_json_is_byte_identical(db, exclude, annotations, with_tagid, with_tag):
+    options = (exclude, annotations, with_tagid, with_tag)
+    serial, parallel = io.StringIO(), io.StringIO()
+    sdb2json_convert(db, serial, *options, compact=True, typed_values=True)
+    sdb2json_convert(db, parallel, *options, jobs=2, compact=True, typed_values=True)
+    assert parallel.getvalue() == serial.getvalue()
+
+
+def test_shards_are_contiguous():
+    with SdbDatabase(TESTDATA_FOLDER / "app_x32.sdb") as db:
+        pdb = db.handle
+        database = SdbGetFirstChild(pdb, 0)
+        children = []
+        child = SdbGetFirstChild(pdb, database)
+        while child:
+            children.append(child)
+            child = SdbGetNextChild(pdb, database, child)
+        shards = shard._shards(db, database, 4)
+        assert 1 < len(shards) <= 4
+        assert shards[0][1] == children[0]
+        for (_, _, stop), (_, start, _) in zip(shards, shards[1:]):
+            assert stop == start and start in children
+        covered = [
+            tag.tag_id for piece in shards for tag in shard._shard_tags(db, piece)
+        ]
+        assert covered == children
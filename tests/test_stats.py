@@ -0,0 +1,99 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     tests for the tag and size statistics.
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+"""
+
+import struct
+from collections import Counter
+from pathlib import Path
+
+import pytest
+from sdbtool.apphelp.sdb_reader import (
+    SdbCloseDatabase,
+    SdbOpenDatabase,
+    _sdbp_get_tag_size,
+)
+from sdbtool.apphelp.walk import END, walk_tags
+from sdbtool.stats import collect_stats, get_stats
+
+TESTDATA_FOLDER = Path(__file__).parent / "data"
+
+
+def W(v: int) -> bytes:
+    return struct.pack("<H", v)
+
+
+def D(v: int) -> bytes:
+    return struct.pack("<I", v)
+
+
+def _item(text: str) -> bytes:
+    data = (text + "\0").encode("utf-16-le")
+    return W(0x8801) + D(len(data)) + data
+
+
+@pytest.mark.parametrize("db_name", ["app_x32.sdb", "all_tagtypes.sdb"])
+def test_same_tags_as_walk(db_name):
+    pdb = SdbOpenDatabase(str(TESTDATA_FOLDER / db_name))
+    try:
+        stats = collect_stats(pdb)
+        counts, sizes, depths = Counter(), Counter(), Counter()
+        for event, tagid, depth, tag in walk_tags(pdb):
+            if event is not END and tagid != 0:
+                counts[tag] += 1
+                sizes[tag] += _sdbp_get_tag_size(pdb, tagid)
+                depths[depth] += 1
+    finally:
+        SdbCloseDatabase(pdb)
+    assert {tag: count for tag, (count, _) in stats.by_tag.items()} == counts
+    assert {tag: size for tag, (_, size) in stats.by_tag.items()} == sizes
+    assert stats.depths == [depths[depth] for depth in range(max(depths) + 1)]
+    assert stats.tags == sum(counts.values())
+
+
+def test_stats():
+    stats = get_stats(TESTDATA_FOLDER / "app_x32.sdb", top=2)
+    assert stats.by_tag[0x7001][0] == 1  # DATABASE
+    assert stats.by_tag[0x7007][0] == 3  # EXE
+    # The top-level lists fill the file.
+    top_level = [0x7001, 0x7801, 0x7802]  # DATABASE, STRINGTABLE, INDEXES
+    assert 12 + sum(stats.by_tag[tag][1] for tag in top_level) == stats.size
+    assert stats.depths[:2] == [0, 3]  # depth 1: the top-level lists
+    assert (stats.stringtable_bytes, stats.strings) == (888, 27)
+    assert stats.unique_strings == 27 and stats.duplicate_ratio == 0.0
+    assert stats.largest_binaries == [(0x26, 0x9801, 36), (0x2DC, 0x9801, 36)]
+
+    data = stats.as_dict()
+    assert data["by_tag"][0] == {
+        "tag": "INDEXES",  # the largest
+        "tag_num": "0x7802",
+        "count": 1,
+        "bytes": stats.by_tag[0x7802][1],
+    }
+    assert data["largest_binaries"][0]["tag"] == "INDEX_BITS"
+    assert data["stringtable"]["strings"] == 27
+
+
+def test_duplicate_strings(tmp_path):
+    items = _item("a") + _item("shared") + _item("b") + _item("shared")
+    stringtable = W(0x7801) + D(len(items)) + items
+    path = tmp_path / "dups.sdb"
+    path.write_bytes(D(2) + D(1) + b"sdbf" + stringtable)
+    stats = get_stats(path)
+    assert (stats.strings, stats.unique_strings) == (4, 3)
+    assert stats.duplicate_ratio == 0.25
+    assert stats.duplicate_string_bytes == len(_item("shared"))
+    assert stats.depths == [0, 1, 4]
+
+
+def test_get_stats_errors(tmp_path):
+    bad = tmp_path / "bad.sdb"
+    bad.write_bytes(b"not an sdb")
+    with pytest.raises(ValueError, match="Failed to open database"):
+        get_stats(bad)
+    empty = tmp_path / "empty.sdb"
+    empty.write_bytes(D(2) + D(1) + b"sdbf")
+    stats = get_stats(empty)
+    assert (stats.size, stats.tags, stats.by_tag) == (12, 0, {})
@@ -0,0 +1,160 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     tests for the flat tag index.
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+"""
+
+import struct
+from pathlib import Path
+
+import pytest
+from sdbtool.apphelp import SdbDatabase, sdb_reader as r
+from sdbtool.apphelp.sdb_reader import SdbFile
+from sdbtool.apphelp.tag_index import SdbBuildTagIndex
+
+TESTDATA_FOLDER = Path(__file__).parent / "data"
+HDR = b"\x00" * 12
+
+
+def W(v: int) -> bytes:
+    return struct.pack("<H", v)
+
+
+def D(v: int) -> bytes:
+    return struct.pack("<I", v)
+
+
+def reader_tree(pdb: SdbFile, parent: int = r.TAGID_ROOT) -> list:
+    """The tree as walked through SdbGetFirstChild / SdbGetNextChild."""
+    out = []
+    child = r.SdbGetFirstChild(pdb, parent)
+    while child != r.TAGID_NULL:
+        out.append((child, r.SdbGetTagFromTagID(pdb, child), reader_tree(pdb, child)))
+        child = r.SdbGetNextChild(pdb, parent, child)
+    return out
+
+
+def index_tree(index, parent: int = r.TAGID_ROOT) -> list:
+    return [
+        (child, index.get_tag(child), index_tree(index, child))
+        for child in index.children(parent)
+    ]
+
+
+@pytest.mark.parametrize("name", ["all_tagtypes.sdb", "app_x32.sdb", "app_x64.sdb"])
+def test_index_matches_reader(name):
+    pdb = r.SdbOpenDatabase(str(TESTDATA_FOLDER / name))
+    index = SdbBuildTagIndex(pdb)
+    assert pdb.index is index
+    assert index_tree(index) == reader_tree(pdb)
+    for row in range(1, len(index) + 1):
+        tagid = index.tagids[row]
+        assert index.row(tagid) == row and tagid - 1 not in index
+        assert index.data_sizes[row] == r.SdbGetTagDataSize(pdb, tagid)
+        assert index.first_child(tagid) == r.SdbGetFirstChild(pdb, tagid)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        HDR,  # header only
+        HDR + W(0x4000) + D(0) + W(0x4000) + D(0),  # flat
+        HDR + W(0x0000) + b"\x00" * 8,  # NULL nibble stops iteration
+        HDR + W(0x7000) + D(6) + W(0x4000) + D(0) + W(0x4000) + D(0),  # short list
+        HDR + W(0x7000) + D(0) + W(0x4001) + D(1),  # empty list
+        HDR + W(0x7000) + D(2),  # list whose first child is past the end
+        HDR + W(0x7000) + D(100) + W(0x7000) + D(6) + W(0x4000) + D(0),  # overrun
+        HDR + W(0x2000) + b"\x01",  # truncated padding at the end
+        # Overlapping lists: the reader visits 24 and 30 twice.
+        HDR
+        + W(0x7001)
+        + D(6)
+        + W(0x7002)
+        + D(12)
+        + W(0x4001)
+        + D(1)
+        + W(0x4002)
+        + D(2),
+    ],
+)
+def test_index_matches_reader_malformed(data):
+    pdb = SdbFile(data, 2, 0)
+    index = SdbBuildTagIndex(pdb)
+    assert index_tree(index) == reader_tree(pdb)
+    tagids = list(index.tagids)
+    assert all(index.row(tagid) == tagids.index(tagid) for tagid in tagids)
+    assert all(tagid + 1 not in index for tagid in tagids)
+
+
+def test_index_navigation():
+    # [list 12: [list 18: [dword 24]], dword 30]
+    inner = W(0x7002) + D(6) + W(0x4001) + D(1)
+    outer = W(0x7001) + D(len(inner) + 6) + inner + W(0x4002) + D(2)
+    index = SdbBuildTagIndex(SdbFile(HDR + outer, 2, 0))
+    assert len(index) == 4
+    assert 24 in index and 26 not in index
+    assert index.first_child(r.TAGID_ROOT) == 12
+    assert index.first_child(12) == 18
+    assert index.next_sibling(18) == 30
+    assert index.next_sibling(30) == r.TAGID_NULL
+    assert index.parent(24) == 18
+    assert index.parent(12) == r.TAGID_ROOT
+    assert index.depth(r.TAGID_ROOT) == 0
+    assert index.depth(24) == 3
+    assert index.path(24) == [12, 18, 24]
+    assert index.path(r.TAGID_ROOT) == []
+    assert index.data_offsets[index.row(24)] == 26
+    with pytest.raises(ValueError, match="0x1a is not a tag in this database"):
+        index.parent(26)
+    assert index.contents() == {
+        r.TAGID_ROOT: {0x7001, 0x7002, 0x4001, 0x4002},
+        0x7001: {0x7002, 0x4001, 0x4002},
+        0x7002: {0x4001},
+    }
+
+
+def test_tag_navigation():
+    with SdbDatabase(TESTDATA_FOLDER / "app_x32.sdb") as db:
+        assert db._handle.index is None  # only built on demand
+        root = db.root()
+        assert root.parent is None
+        assert list(root.ancestors()) == []
+        assert root.path == ""
+        assert root.depth == 0
+
+        database = [t for t in root.tags() if t.name == "DATABASE"][0]
+        exe = [t for t in database.tags() if t.name == "EXE"][0]
+        name = next(exe.tags())
+        assert name.path == "DATABASE/EXE/NAME"
+        assert name.depth == 3
+        assert name.parent.tag_id == exe.tag_id
+        assert [t.name for t in name.ancestors()] == ["EXE", "DATABASE", "SDB"]
+        assert database.parent.tag_id == root.tag_id
+        assert db._handle.index is not None
+
+
+def test_tags_through_index():
+    path = TESTDATA_FOLDER / "app_x32.sdb"
+
+    def names(db):
+        out = []
+
+        def walk(tag):
+            out.append((tag.tag_id, tag.name))
+            for child in tag.tags():
+                walk(child)
+
+        walk(db.root())
+        return out
+
+    with SdbDatabase(path) as plain, SdbDatabase(path, with_index=True) as indexed:
+        assert indexed._handle.index is not None
+        assert names(indexed) == names(plain)
+
+
+def test_index_closed_database():
+    db = SdbDatabase(TESTDATA_FOLDER / "app_x32.sdb", with_index=True)
+    db.close()
+    with pytest.raises(ValueError, match="Database handle is not initialized"):
+        db.index()
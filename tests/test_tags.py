@@ -0,0 +1,104 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     tests for the lazy, cached loading of the tag tables.
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+"""
+
+import subprocess
+import sys
+
+import pytest
+from sdbtool.apphelp import tags
+
+
+@pytest.fixture
+def fresh_tags(tmp_path, monkeypatch):
+    """Unloaded tag tables, with the cache redirected to ``tmp_path``."""
+    monkeypatch.setattr(tags, "_CACHE_FILE", str(tmp_path / "tags.cache"))
+    tags._reset()
+    yield tmp_path / "tags.cache"
+    tags._reset()
+
+
+def test_import_loads_nothing():
+    code = (
+        "import sys, sdbtool.apphelp\n"
+        "from sdbtool.apphelp import tags\n"
+        "assert tags._VERSIONS is None, 'tags.json was loaded at import'\n"
+        "assert 'json' not in sys.modules, 'json was imported'\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+# Modules a fresh interpreter may load for `import sdbtool.apphelp.tags` plus a
+# first (cached) name lookup: 53 on Python 3.10, 55 on 3.11. Raising it needs a
+# look at `tools/benchmark.py imports` first.
+IMPORT_MODULE_BUDGET = 60
+
+
+def test_import_module_budget():
+    code = (
+        "import sys\n"
+        "before = set(sys.modules)\n"
+        "from sdbtool.apphelp.tags import tag_id_to_string\n"
+        "assert tag_id_to_string(0x7001) == 'DATABASE'\n"
+        "heavy = {'json', 'dataclasses', 'inspect', 'importlib.resources', 'logging'}\n"
+        "assert not heavy & set(sys.modules), heavy & set(sys.modules)\n"
+        "print(len(set(sys.modules) - before))\n"
+    )
+    # Fill the tags cache first: the budget is what every later run pays.
+    warm = "from sdbtool.apphelp.tags import tag_id_to_string as t; t(0x7001)"
+    subprocess.run([sys.executable, "-c", warm], check=True)
+    out = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True
+    ).stdout
+    assert int(out) <= IMPORT_MODULE_BUDGET
+
+
+def test_tables_built_on_demand(fresh_tags):
+    assert tags._VERSIONS is None
+    newest = tags.DEFAULT_VERSION
+    assert tags.KNOWN_VERSIONS[-1] == newest
+    assert tags._TABLES == {}  # the version list alone builds no table
+
+    assert tags.tag_id_to_string(0x7001) == "DATABASE"
+    assert set(tags._TABLES) == {newest}
+
+    assert tags.tag_id_to_string(0x4023, "0603") == "OS_PLATFORM"
+    assert set(tags._TABLES) == set(tags.KNOWN_VERSIONS[-3:])  # 0603 and newer
+
+
+def test_cache_roundtrip(fresh_tags, monkeypatch):
+    expected = tags.tag_id_to_string(0x4023, "0501")
+    assert fresh_tags.exists()
+
+    # A current cache is used as-is: the JSON is not parsed again.
+    tags._reset()
+    with monkeypatch.context() as m:
+        m.setattr(tags, "_parse", pytest.fail)
+        assert tags.tag_id_to_string(0x4023, "0501") == expected
+
+    # A damaged or stale cache is ignored and rewritten.
+    for content in (b"garbage", b""):
+        fresh_tags.write_bytes(content)
+        tags._reset()
+        assert tags.tag_id_to_string(0x4023, "0501") == expected
+        assert fresh_tags.read_bytes() != content
+
+
+def test_cache_unwritable(fresh_tags, monkeypatch):
+    blocked = fresh_tags.parent / "blocked"
+    blocked.write_bytes(b"")  # a file where the cache directory would go
+    monkeypatch.setattr(tags, "_CACHE_FILE", str(blocked / "tags.cache"))
+    assert tags.tag_id_to_string(0x7001) == "DATABASE"
+    assert blocked.read_bytes() == b""
+
+    monkeypatch.setattr(tags, "_CACHE_FILE", None)
+    tags._reset()
+    assert tags.tag_id_to_string(0x7001) == "DATABASE"
+
+
+def test_unknown_module_attribute():
+    with pytest.raises(AttributeError, match="has no attribute 'NOPE'"):
+        tags.NOPE
@@ -0,0 +1,218 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     tests for the iterative tag-tree walker.
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+"""
+
+import struct
+from pathlib import Path
+
+import pytest
+from sdbtool.apphelp import (
+    ExcludedTags,
+    SdbDatabase,
+    Tag,
+    TagVisitor,
+    WalkEvent,
+    sdb_reader as r,
+)
+from sdbtool.apphelp.sdb_reader import SdbFile
+from sdbtool.apphelp.walk import walk_tags
+
+TESTDATA_FOLDER = Path(__file__).parent / "data"
+HDR = b"\x00" * 12
+
+
+def W(v: int) -> bytes:
+    return struct.pack("<H", v)
+
+
+def D(v: int) -> bytes:
+    return struct.pack("<I", v)
+
+
+def reader_events(pdb: SdbFile, tagid: int = r.TAGID_ROOT, depth: int = 0) -> list:
+    """Reference: the events of a recursive SdbGetFirstChild / SdbGetNextChild walk."""
+    tag = r.TAG_NULL if tagid == r.TAGID_ROOT else r.SdbGetTagFromTagID(pdb, tagid)
+    if tagid != r.TAGID_ROOT and (tag & r.TAG_TYPE_MASK) != r.TAG_TYPE_LIST:
+        return [(WalkEvent.LEAF, tagid, depth, tag)]
+    out = [(WalkEvent.BEGIN, tagid, depth, tag)]
+    child = r.SdbGetFirstChild(pdb, tagid)
+    while child != r.TAGID_NULL:
+        out += reader_events(pdb, child, depth + 1)
+        child = r.SdbGetNextChild(pdb, tagid, child)
+    out.append((WalkEvent.END, tagid, depth, tag))
+    return out
+
+
+def pruned(events: list, excluded: set[int]) -> list:
+    """Reference: ``events`` without the excluded tags and everything below them."""
+    out, skip_depth = [], None
+    for event, tagid, depth, tag in events:
+        if skip_depth is not None:
+            if event == WalkEvent.END and depth == skip_depth:
+                skip_depth = None
+            continue
+        if depth > 0 and tag in excluded:
+            if event == WalkEvent.BEGIN:
+                skip_depth = depth
+            continue
+        out.append((event, tagid, depth, tag))
+    return out
+
+
+class Excluded(dict):
+    """A plain ``excluded`` mapping for walk_tags: the tags not in it are kept."""
+
+    def __missing__(self, tag: int) -> bool:
+        return False
+
+
+class RecordingVisitor(TagVisitor):
+    def __init__(self):
+        self.events = []
+
+    def visit(self, tag: Tag):
+        self.events.append(("leaf", tag.tag_id, tag.name))
+
+    def visit_list_begin(self, tag: Tag):
+        self.events.append(("begin", tag.tag_id, tag.name))
+
+    def visit_list_end(self, tag: Tag):
+        self.events.append(("end", tag.tag_id, tag.name))
+
+
+def recursive_events(tag: Tag, out: list) -> list:
+    """Reference: what the old recursive ``Tag.accept`` reported."""
+    if tag.type == r.TAG_TYPE_LIST:
+        out.append(("begin", tag.tag_id, tag.name))
+        for child in tag.tags():
+            recursive_events(child, out)
+        out.append(("end", tag.tag_id, tag.name))
+    else:
+        out.append(("leaf", tag.tag_id, tag.name))
+    return out
+
+
+@pytest.mark.parametrize("name", ["all_tagtypes.sdb", "app_x32.sdb", "app_x64.sdb"])
+def test_walk_matches_reader(name):
+    pdb = r.SdbOpenDatabase(str(TESTDATA_FOLDER / name))
+    assert list(walk_tags(pdb)) == reader_events(pdb)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        HDR,  # header only
+        HDR + W(0x4000) + D(0) + W(0x4000) + D(0),  # flat
+        HDR + W(0x7000) + D(6) + W(0x4000) + D(0) + W(0x4000) + D(0),  # short list
+        HDR + W(0x7000) + D(0) + W(0x4001) + D(1),  # empty list
+        HDR + W(0x7000) + D(2),  # list whose first child is past the end
+        HDR + W(0x7000) + D(100) + W(0x7000) + D(6) + W(0x4000) + D(0),  # overrun
+        HDR + W(0x2000) + b"\x01",  # truncated padding at the end
+    ],
+)
+def test_walk_matches_reader_malformed(data):
+    pdb = SdbFile(data, 2, 0)
+    assert list(walk_tags(pdb)) == reader_events(pdb)
+
+
+@pytest.mark.parametrize("name", ["all_tagtypes.sdb", "app_x32.sdb"])
+def test_accept_matches_recursion(name):
+    with SdbDatabase(TESTDATA_FOLDER / name) as db:
+        visitor = RecordingVisitor()
+        db.root().accept(visitor)
+        assert visitor.events == recursive_events(db.root(), [])
+
+
+def test_walk_subtree_and_leaf():
+    with SdbDatabase(TESTDATA_FOLDER / "app_x32.sdb") as db:
+        database = [t for t in db.root().tags() if t.name == "DATABASE"][0]
+        events = list(db.walk(database))
+        assert events[0][:3] == (WalkEvent.BEGIN, database.tag_id, 0)
+        assert events[0][3] is database and events[-1][3] is database
+        assert events[-1][:3] == (WalkEvent.END, database.tag_id, 0)
+        assert [(e, t, d) for e, t, d, _ in db.walk(database.tag_id)] == [
+            (e, t, d) for e, t, d, _ in events
+        ]
+
+        name = next(database.tags())
+        assert [(e, t, d) for e, t, d, _ in db.walk(name)] == [
+            (WalkEvent.LEAF, name.tag_id, 0)
+        ]
+        visitor = RecordingVisitor()
+        name.accept(visitor)
+        assert visitor.events == [("leaf", name.tag_id, name.name)]
+
+
+def test_walk_early_stop_and_resume():
+    with SdbDatabase(TESTDATA_FOLDER / "app_x32.sdb") as db:
+        full = [(e, t, d) for e, t, d, _ in db.walk()]
+        walker = db.walk()
+        head = [next(walker)[:3] for _ in range(5)]
+        walker.close()  # stop early
+        assert head == full[:5]
+
+        # Resume at any tag by walking from it: its events are a slice of the whole.
+        exe = [t for e, t, d in full if e == WalkEvent.BEGIN and d == 2][0]
+        begin = full.index((WalkEvent.BEGIN, exe, 2))
+        part = [(e, t, d + 2) for e, t, d, _ in db.walk(exe)]
+        assert full[begin : begin + len(part)] == part
+
+
+def test_walk_deep_nesting():
+    depth = 5000
+    data = b""
+    for _ in range(depth):
+        data = W(0x7001) + D(len(data)) + data
+    pdb = SdbFile(HDR + data, 2, 0)
+    events = list(walk_tags(pdb))
+    assert len(events) == 2 * depth + 2
+    assert events[depth] == (WalkEvent.BEGIN, 12 + 6 * (depth - 1), depth, 0x7001)
+
+
+@pytest.mark.parametrize("name", ["all_tagtypes.sdb", "app_x32.sdb"])
+@pytest.mark.parametrize(
+    "excluded",
+    [
+        {0x7802, 0x7801},  # INDEXES, STRINGTABLE
+        {0x7007, 0x6001},  # EXE, NAME
+        {0x7001},  # DATABASE
+    ],
+)
+def test_walk_excluded(name, excluded):
+    pdb = r.SdbOpenDatabase(str(TESTDATA_FOLDER / name))
+    events = list(walk_tags(pdb, excluded=Excluded.fromkeys(excluded, True)))
+    assert events == pruned(reader_events(pdb), excluded)
+
+
+def test_walk_excluded_start_is_visited():
+    with SdbDatabase(TESTDATA_FOLDER / "app_x32.sdb") as db:
+        database = [t for t in db.root().tags() if t.name == "DATABASE"][0]
+        excluded = db.exclusions(["DATABASE", "EXE"])
+        events = [(e, t, d) for e, t, d, _ in db.walk(database, excluded)]
+        assert events[0] == (WalkEvent.BEGIN, database.tag_id, 0)
+        assert events[-1] == (WalkEvent.END, database.tag_id, 0)
+        names = {tag.name for _, _, _, tag in db.walk(database, excluded)}
+        assert "EXE" not in names and "MATCHING_FILE" not in names
+
+
+def test_excluded_tags():
+    with SdbDatabase(TESTDATA_FOLDER / "app_x32.sdb") as db:
+        assert db.exclusions([]) is None
+    excluded = ExcludedTags(["MSI_TRANSFORM", "S16BIT_DESCRIPTION", "InvalidTag"])
+    assert excluded[0x7010] and excluded[0x6017] and excluded[0x7FFF]
+    assert not excluded[0x7011] and not excluded[0x6020]
+    # The raw name of an older target resolves to the same number.
+    assert ExcludedTags(["MSI TRANSFORM"], "0501")[0x7010]
+    assert ExcludedTags(["MSI_TRANSFORM"], "0501")[0x7010]
+    assert ExcludedTags(["16BIT_DESCRIPTION"])[0x6017]
+    assert not ExcludedTags(["InvalidTag_0x7FFE"])[0x7FFF]
+
+
+def test_walk_closed_database():
+    db = SdbDatabase(TESTDATA_FOLDER / "app_x32.sdb")
+    db.close()
+    with pytest.raises(ValueError, match="Database handle is not initialized"):
+        db.walk()
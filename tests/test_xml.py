@@ -7,6 +7,7 @@ COPYRIGHT:   Copyright 2025 Mark Jansen <mark.jansen@reactos.org>
 
 from sdbtool.xml import XmlWriter
 import io
+import pytest
 
 
 def test_xml_writer():
@@ -24,3 +25,48 @@ def test_xml_writer():
 
     expected_output = '<?xml version="1.0" encoding="utf-8" standalone="yes"?>\n<root attr="value&amp;tag&lt;test&gt;">\n  <child>Content&amp;tag&lt;test&gt;</child>\n  <empty /><!-- This is a comment with special characters: &amp; &lt; &gt; -->\n</root>'
     assert stream.getvalue() == expected_output
+
+
+def _write_document(writer):
+    writer.write_xml_declaration()
+    writer.open("root", {"file": "a'b\"c.sdb", "tagid": "12"})
+    for level in range(40):
+        writer.open(f"list{level}", {"tag": "0x7001"})
+        writer.open("value", {"type": "xs:string"})
+        writer.write("\u00e9 & <x>")
+        writer.write_comment("-- & --")
+        writer.close("value")
+        writer.open("number", {"type": "xs:unsignedInt"})
+        writer.write_unescaped("42")
+        writer.close("number")
+    writer.empty_tag("empty", {"a": "tab\there"})
+    for level in reversed(range(40)):
+        writer.close(f"list{level}")
+    writer.close("root")
+
+
+@pytest.mark.parametrize("block_size", [1, 100, 1 << 16])
+def test_xml_writer_blocks(block_size):
+    expected = io.StringIO()
+    _write_document(XmlWriter(expected))
+
+    class Stream(io.StringIO):
+        writes = 0
+
+        def write(self, text):
+            self.writes += 1
+            return super().write(text)
+
+    text = Stream()
+    writer = XmlWriter(text, block_size=block_size)
+    _write_document(writer)
+    writer.flush()
+    assert text.getvalue() == expected.getvalue()
+    if block_size > len(expected.getvalue()):
+        assert text.writes == 1
+
+    binary = io.BytesIO()
+    writer = XmlWriter(binary, block_size=block_size)
+    _write_document(writer)
+    writer.flush()
+    assert binary.getvalue() == expected.getvalue().encode("utf-8")
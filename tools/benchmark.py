@@ -0,0 +1,573 @@
+"""
+PROJECT:     sdbtool
+LICENSE:     MIT (https://spdx.org/licenses/MIT)
+PURPOSE:     Micro-benchmarks for the sdbtool hot paths.
+COPYRIGHT:   Copyright 2026 Mark Jansen <mark.jansen@reactos.org>
+
+Like ``generate_tags.py`` this script lives outside the package and is never
+shipped. Each subcommand times one hot path and prints the per-item cost, so
+changes to the reader / converters can be compared before and after.
+
+Usage::
+
+    uv run python tools/benchmark.py reader path\\to\\sysmain.sdb
+    uv run python tools/benchmark.py walk path\\to\\sysmain.sdb
+    uv run python tools/benchmark.py info path\\to\\sysmain.sdb
+    uv run python tools/benchmark.py lookup path\\to\\sysmain.sdb
+    uv run python tools/benchmark.py matcher path\\to\\sysmain.sdb
+    uv run python tools/benchmark.py grep path\\to\\sysmain.sdb
+    uv run python tools/benchmark.py stats path\\to\\sysmain.sdb
+    uv run python tools/benchmark.py convert path\\to\\sysmain.sdb --jobs 8
+    uv run python tools/benchmark.py json [path\\to\\sysmain.sdb ...]
+    uv run python tools/benchmark.py imports
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sdbtool.apphelp import sdb_reader  # noqa: E402
+
+_TESTDATA = Path(__file__).resolve().parent.parent / "tests" / "data"
+_DEFAULT_SDB = _TESTDATA / "app_x32.sdb"
+
+
+def _best_of(repeat: int, func, *args) -> float:
+    """The fastest of ``repeat`` runs of ``func(*args)``, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _report(label: str, seconds: float, count: int) -> None:
+    print(f"  {label:<28} {seconds * 1e9 / max(count, 1):10.1f} ns/tag")
+
+
+# --- reader: slice + int.from_bytes (legacy) vs. precompiled struct --------
+
+
+def _legacy_read_uint(pdb, offset: int, num: int):
+    raw = sdb_reader.SdbpReadData(pdb, offset, num)
+    return None if raw is None else int.from_bytes(raw, "little")
+
+
+def _legacy_get_tag(pdb, tagid: int) -> int:
+    value = _legacy_read_uint(pdb, tagid, 2)
+    return 0 if value is None else value
+
+
+def _legacy_read_scalar(pdb, tagid: int, ttype: int, num: int) -> int:
+    tag = _legacy_get_tag(pdb, tagid)
+    if tag and (tag & sdb_reader.TAG_TYPE_MASK) == ttype:
+        value = _legacy_read_uint(pdb, tagid + 2, num)
+        if value is not None:
+            return value
+    return 0
+
+
+_SCALAR_WIDTH = {
+    sdb_reader.TAG_TYPE_BYTE: 1,
+    sdb_reader.TAG_TYPE_WORD: 2,
+    sdb_reader.TAG_TYPE_DWORD: 4,
+    sdb_reader.TAG_TYPE_QWORD: 8,
+}
+_SCALAR_READER = {
+    sdb_reader.TAG_TYPE_BYTE: sdb_reader.SdbReadBYTETag,
+    sdb_reader.TAG_TYPE_WORD: sdb_reader.SdbReadWORDTag,
+    sdb_reader.TAG_TYPE_DWORD: sdb_reader.SdbReadDWORDTag,
+    sdb_reader.TAG_TYPE_QWORD: sdb_reader.SdbReadQWORDTag,
+}
+
+
+def _all_tagids(pdb) -> list[int]:
+    from sdbtool.apphelp.tag_index import SdbBuildTagIndex
+
+    return list(SdbBuildTagIndex(pdb).tagids[1:])
+
+
+def _legacy_reader_pass(pdb, tagids):
+    for tagid in tagids:
+        ttype = _legacy_get_tag(pdb, tagid) & sdb_reader.TAG_TYPE_MASK
+        width = _SCALAR_WIDTH.get(ttype)
+        if width is not None:
+            _legacy_read_scalar(pdb, tagid, ttype, width)
+
+
+def _reader_pass(pdb, tagids):
+    for tagid in tagids:
+        ttype = sdb_reader.SdbGetTagFromTagID(pdb, tagid) & sdb_reader.TAG_TYPE_MASK
+        read = _SCALAR_READER.get(ttype)
+        if read is not None:
+            read(pdb, tagid)
+
+
+def _bulk_pass(pdb, tagids):
+    # Grouping the tagids by type is part of what the bulk readers cost.
+    by_type: dict[int, list[int]] = {}
+    for tagid, tag in zip(tagids, sdb_reader.SdbGetTagsFromTagIDs(pdb, tagids)):
+        by_type.setdefault(tag & sdb_reader.TAG_TYPE_MASK, []).append(tagid)
+    for ttype, tagids in by_type.items():
+        if ttype == sdb_reader.TAG_TYPE_BYTE:
+            sdb_reader.SdbReadBYTETags(pdb, tagids)
+        elif ttype == sdb_reader.TAG_TYPE_WORD:
+            sdb_reader.SdbReadWORDTags(pdb, tagids)
+        elif ttype == sdb_reader.TAG_TYPE_DWORD:
+            sdb_reader.SdbReadDWORDTags(pdb, tagids)
+        elif ttype == sdb_reader.TAG_TYPE_QWORD:
+            sdb_reader.SdbReadQWORDTags(pdb, tagids)
+
+
+def bench_reader(args) -> None:
+    """Per-tag cost of decoding every tag's TAG word and scalar value."""
+    pdb = sdb_reader.SdbOpenDatabase(str(args.sdb))
+    if pdb is None:
+        raise SystemExit(f"Failed to open {args.sdb}")
+    tagids = _all_tagids(pdb) * args.scale
+
+    print(f"reader: {args.sdb.name}, {len(tagids)} tags, best of {args.repeat}")
+    _report(
+        "legacy slice+from_bytes",
+        _best_of(args.repeat, _legacy_reader_pass, pdb, tagids),
+        len(tagids),
+    )
+    _report(
+        "struct.unpack_from",
+        _best_of(args.repeat, _reader_pass, pdb, tagids),
+        len(tagids),
+    )
+    _report(
+        "typed bulk readers",
+        _best_of(args.repeat, _bulk_pass, pdb, tagids),
+        len(tagids),
+    )
+
+
+# --- walk: recursive Tag.accept (legacy) vs. the iterative walker -----------
+
+
+class _NullVisitor:
+    def visit(self, tag):
+        pass
+
+    def visit_list_begin(self, tag):
+        pass
+
+    def visit_list_end(self, tag):
+        pass
+
+
+def _legacy_accept(tag, visitor) -> None:
+    if tag.type == sdb_reader.TAG_TYPE_LIST:
+        visitor.visit_list_begin(tag)
+        for child in tag.tags():
+            _legacy_accept(child, visitor)
+        visitor.visit_list_end(tag)
+    else:
+        visitor.visit(tag)
+
+
+def _walk_pass(root, accept, scale: int) -> None:
+    visitor = _NullVisitor()
+    for _ in range(scale):
+        accept(root, visitor)
+
+
+def bench_walk(args) -> None:
+    """Per-tag cost of visiting the whole tag tree."""
+    from sdbtool.apphelp import SdbDatabase, Tag
+
+    with SdbDatabase(args.sdb) as db:
+        root = db.root()
+        count = sum(1 for _ in db.walk()) * args.scale
+        print(f"walk: {args.sdb.name}, {count} events, best of {args.repeat}")
+        _report(
+            "recursive accept",
+            _best_of(args.repeat, _walk_pass, root, _legacy_accept, args.scale),
+            count,
+        )
+        _report(
+            "iterative accept",
+            _best_of(args.repeat, _walk_pass, root, Tag.accept, args.scale),
+            count,
+        )
+
+
+# --- info: full open vs. header-and-metadata probe --------------------------
+
+
+def _info_pass(path: str, probe: bool, scale: int) -> None:
+    from sdbtool.info import get_info
+
+    for _ in range(scale):
+        get_info(path, probe=probe)
+
+
+def bench_info(args) -> None:
+    """Per-file cost of `sdbtool info`: full open vs. probe."""
+    from sdbtool.apphelp.probe import SdbProbeDatabase
+
+    path = str(args.sdb)
+    probe = SdbProbeDatabase(path)
+    if probe is None:
+        raise SystemExit(f"Failed to open {args.sdb}")
+    print(
+        f"info: {args.sdb.name}, {probe.size} bytes,"
+        f" probe reads {probe.bytes_read}, best of {args.repeat}"
+    )
+    for label, use_probe in (("full open", False), ("probe", True)):
+        seconds = _best_of(args.repeat, _info_pass, path, use_probe, args.scale)
+        print(f"  {label:<28} {seconds * 1e6 / args.scale:10.1f} us/file")
+
+
+# --- lookup: EXE by NAME through INDEXES vs. a scan --------------------------
+
+
+def _lookup_pass(pdb, names, find) -> None:
+    for name in names:
+        find(pdb, name)
+
+
+def bench_lookup(args) -> None:
+    """Per-lookup cost of finding every EXE by NAME: index vs. scan."""
+    from sdbtool.apphelp import indexes
+
+    exe, name_tag = 0x7007, 0x6001
+    pdb = sdb_reader.SdbOpenDatabase(str(args.sdb))
+    if pdb is None:
+        raise SystemExit(f"Failed to open {args.sdb}")
+    index = indexes.SdbGetIndex(pdb, exe, name_tag)
+    if index is None:
+        raise SystemExit(f"{args.sdb} has no EXE / NAME index")
+    names = [
+        sdb_reader.SdbGetStringTagPtr(
+            pdb, sdb_reader.SdbFindFirstTag(pdb, tagid, name_tag)
+        )
+        for tagid in index.records(pdb)[1]
+    ]
+    names = [name for name in names if name] * args.scale
+    print(f"lookup: {args.sdb.name}, {len(names)} lookups, best of {args.repeat}")
+
+    def scan(pdb, name):
+        return indexes.SdbScanForTags(pdb, exe, name_tag, name)
+
+    def indexed(pdb, name):
+        return list(indexes.SdbFindIndexedTags(pdb, index, name))
+
+    for label, find in (("scan", scan), ("INDEXES binary search", indexed)):
+        seconds = _best_of(args.repeat, _lookup_pass, pdb, names, find)
+        print(f"  {label:<28} {seconds * 1e6 / max(len(names), 1):10.1f} us/lookup")
+
+
+# --- matcher: compiling the EXE entries vs. loading them from the cache ------
+
+
+def _match_pass(matcher, files) -> None:
+    for file_name in files:
+        matcher.match(file_name)
+
+
+def bench_matcher(args) -> None:
+    """Start-up and per-file cost of the compiled matcher vs. ExeMatcher."""
+    from sdbtool.apphelp import SdbDatabase
+    from sdbtool.apphelp.cache import CACHE_DIR_ENV
+    from sdbtool.compiled_match import compile_matcher, load_matcher
+    from sdbtool.match import ExeMatcher
+
+    exe = Path(__file__).resolve().parent.parent / "tests" / "data" / "test_x32.exe"
+    files = [str(exe)] * args.scale
+    sdb = str(args.sdb)
+    with SdbDatabase(sdb) as db:
+        count = len(compile_matcher(db))
+    print(f"matcher: {args.sdb.name}, {count} EXE entries, best of {args.repeat}")
+
+    def compiled(sdb):
+        with SdbDatabase(sdb) as db:
+            compile_matcher(db)
+
+    previous = os.environ.get(CACHE_DIR_ENV)
+    with tempfile.TemporaryDirectory() as folder:
+        # Keep the user's cache directory out of it.
+        os.environ[CACHE_DIR_ENV] = folder
+        try:
+            load_matcher(sdb)
+            for label, func in (
+                ("compile", compiled),
+                ("load cached", load_matcher),
+            ):
+                seconds = _best_of(args.repeat, func, sdb)
+                print(f"  {label:<28} {seconds * 1e3:10.2f} ms")
+
+            with SdbDatabase(sdb) as db:
+                for label, matcher in (
+                    ("match (ExeMatcher)", ExeMatcher(db)),
+                    ("match (compiled)", load_matcher(sdb)),
+                ):
+                    seconds = _best_of(args.repeat, _match_pass, matcher, files)
+                    print(f"  {label:<28} {seconds * 1e6 / len(files):10.1f} us/file")
+        finally:
+            if previous is None:
+                del os.environ[CACHE_DIR_ENV]
+            else:
+                os.environ[CACHE_DIR_ENV] = previous
+
+
+# --- grep: one regex pass over the STRINGTABLE vs. decoding every tag --------
+
+
+def _per_tag_grep(path: str, regex) -> list[int]:
+    from sdbtool.apphelp.walk import LEAF, walk_tags
+
+    pdb = sdb_reader.SdbOpenDatabase(path, use_mmap=True)
+    try:
+        return [
+            tagid
+            for event, tagid, _, tag in walk_tags(pdb)
+            if event is LEAF
+            and (tag & sdb_reader.TAG_TYPE_MASK)
+            in (sdb_reader.TAG_TYPE_STRINGREF, sdb_reader.TAG_TYPE_STRING)
+            and regex.search(sdb_reader.SdbGetStringTagPtr(pdb, tagid) or "")
+        ]
+    finally:
+        sdb_reader.SdbCloseDatabase(pdb)
+
+
+def _grep_pass(func, path: str, regex, scale: int) -> None:
+    for _ in range(scale):
+        func(path, regex)
+
+
+def bench_grep(args) -> None:
+    """Per-file cost of searching the strings of a database with a regex."""
+    from sdbtool.grep import compile_pattern, grep_file
+
+    path = str(args.sdb)
+    print(f"grep: {args.sdb.name}, best of {args.repeat}")
+    for pattern in ("no such string", "(?i)setup"):
+        regex = compile_pattern(pattern)
+        for label, func in (
+            ("per tag", _per_tag_grep),
+            ("STRINGTABLE blob", grep_file),
+        ):
+            seconds = _best_of(args.repeat, _grep_pass, func, path, regex, args.scale)
+            print(
+                f"  {label + ' ' + repr(pattern):<36} "
+                f"{seconds * 1e3 / args.scale:10.3f} ms/file"
+            )
+
+
+# --- stats: the statistics pass vs. a bare walk of the tag headers ----------
+
+
+def _header_walk_pass(pdb, scale: int) -> None:
+    from sdbtool.apphelp.walk import walk_tags
+
+    for _ in range(scale):
+        for _ in walk_tags(pdb):
+            pass
+
+
+def _stats_pass(pdb, scale: int) -> None:
+    from sdbtool.stats import collect_stats
+
+    for _ in range(scale):
+        collect_stats(pdb)
+
+
+def bench_stats(args) -> None:
+    """Per-tag cost of `sdbtool stats` next to walking the tag headers."""
+    from sdbtool.stats import collect_stats
+
+    pdb = sdb_reader.SdbOpenDatabase(str(args.sdb), use_mmap=True)
+    if pdb is None:
+        raise SystemExit(f"Failed to open {args.sdb}")
+    count = collect_stats(pdb).tags * args.scale
+    print(f"stats: {args.sdb.name}, {count} tags, best of {args.repeat}")
+    for label, func in (
+        ("walk_tags", _header_walk_pass),
+        ("collect_stats", _stats_pass),
+    ):
+        _report(label, _best_of(args.repeat, func, pdb, args.scale), count)
+
+
+# --- convert: sdb2xml / sdb2json on one core vs. sharded over --jobs --------
+
+
+def _convert_pass(convert, db, jobs: int, *options) -> None:
+    import io
+
+    convert(db, io.StringIO(), [], *options, jobs=jobs)
+
+
+def bench_convert(args) -> None:
+    """Wall time of converting the whole database, serial vs. in worker processes."""
+
+    from sdbtool.apphelp import SdbDatabase
+    from sdbtool.sdb2json import convert as sdb2json_convert
+    from sdbtool.sdb2xml import XmlAnnotations, convert as sdb2xml_convert
+
+    jobs = args.jobs or os.cpu_count() or 1
+    print(f"convert: {args.sdb.name}, {jobs} jobs, best of {args.repeat}")
+    with SdbDatabase(args.sdb, use_mmap=True) as db:
+        for label, convert, options in (
+            ("sdb2xml", sdb2xml_convert, (XmlAnnotations.Comment, False, False)),
+            ("sdb2json", sdb2json_convert, (True, False, False)),
+        ):
+            for n in (1, jobs):
+                seconds = _best_of(args.repeat, _convert_pass, convert, db, n, *options)
+                print(f"  {f'{label} --jobs {n}':<28} {seconds * 1e3:10.1f} ms")
+
+
+# --- json: sdb2json indented vs. --compact and --typed-values -----------------
+
+_JSON_VARIANTS = [
+    ("indented (default)", {}),
+    ("--typed-values", {"typed_values": True}),
+    ("--compact", {"compact": True}),
+    ("--compact --typed-values", {"compact": True, "typed_values": True}),
+]
+
+
+def _json_pass(convert, dbs, scale: int, variant: dict) -> int:
+    import io
+
+    for _ in range(scale):
+        size = 0
+        for db in dbs:
+            out = io.StringIO()
+            convert(db, out, [], True, False, False, **variant)
+            size += len(out.getvalue())
+    return size
+
+
+def bench_json(args) -> None:
+    """Time and output size of sdb2json per schema option, over the test corpus."""
+    from contextlib import ExitStack
+
+    from sdbtool.apphelp import SdbDatabase
+    from sdbtool.sdb2json import convert
+
+    files = args.sdb or sorted(_TESTDATA.glob("*.sdb"))
+    print(f"json: {len(files)} files, best of {args.repeat}, scale {args.scale}")
+    with ExitStack() as stack:
+        dbs = [stack.enter_context(SdbDatabase(file)) for file in files]
+        tags = sum(len(_all_tagids(db._handle)) for db in dbs)
+        for label, variant in _JSON_VARIANTS:
+            seconds = _best_of(
+                args.repeat, _json_pass, convert, dbs, args.scale, variant
+            )
+            size = _json_pass(convert, dbs, 1, variant)
+            print(
+                f"  {label:<28} {seconds * 1e9 / (tags * args.scale):10.1f} ns/tag"
+                f" {size:>12} chars"
+            )
+
+
+# --- imports: interpreter start-up with sdbtool imported ---------------------
+
+
+_IMPORT_CASES = [
+    ("python (baseline)", "pass"),
+    ("import sdbtool", "import sdbtool"),
+    ("import sdbtool.apphelp", "import sdbtool.apphelp"),
+    (
+        "first name lookup (cached)",
+        "from sdbtool.apphelp.tags import tag_id_to_string as t; t(0x7001)",
+    ),
+    (
+        "first name lookup (no cache)",
+        "from sdbtool.apphelp import tags; tags._CACHE_FILE = None;"
+        " tags.tag_id_to_string(0x7001)",
+    ),
+    ("import sdbtool.cli", "import sdbtool.cli"),
+]
+
+
+def _run_python(code: str) -> None:
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def bench_imports(args) -> None:
+    """Wall time of a fresh interpreter running a few sdbtool imports."""
+    root = str(Path(__file__).resolve().parent.parent)
+    print(f"imports: best of {args.repeat}")
+    for label, code in _IMPORT_CASES:
+        code = f"import sys; sys.path.insert(0, {root!r}); {code}"
+        seconds = _best_of(args.repeat, _run_python, code)
+        print(f"  {label:<28} {seconds * 1e3:10.1f} ms")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    reader = sub.add_parser("reader", help=bench_reader.__doc__)
+    reader.add_argument("sdb", type=Path, nargs="?", default=_DEFAULT_SDB)
+    reader.set_defaults(func=bench_reader)
+
+    walk = sub.add_parser("walk", help=bench_walk.__doc__)
+    walk.add_argument("sdb", type=Path, nargs="?", default=_DEFAULT_SDB)
+    walk.set_defaults(func=bench_walk)
+
+    info = sub.add_parser("info", help=bench_info.__doc__)
+    info.add_argument("sdb", type=Path, nargs="?", default=_DEFAULT_SDB)
+    info.set_defaults(func=bench_info)
+
+    lookup = sub.add_parser("lookup", help=bench_lookup.__doc__)
+    lookup.add_argument("sdb", type=Path, nargs="?", default=_DEFAULT_SDB)
+    lookup.set_defaults(func=bench_lookup)
+
+    matcher = sub.add_parser("matcher", help=bench_matcher.__doc__)
+    matcher.add_argument("sdb", type=Path, nargs="?", default=_DEFAULT_SDB)
+    matcher.set_defaults(func=bench_matcher)
+
+    grep = sub.add_parser("grep", help=bench_grep.__doc__)
+    grep.add_argument("sdb", type=Path, nargs="?", default=_DEFAULT_SDB)
+    grep.set_defaults(func=bench_grep)
+
+    stats = sub.add_parser("stats", help=bench_stats.__doc__)
+    stats.add_argument("sdb", type=Path, nargs="?", default=_DEFAULT_SDB)
+    stats.set_defaults(func=bench_stats)
+
+    convert = sub.add_parser("convert", help=bench_convert.__doc__)
+    convert.add_argument("sdb", type=Path, nargs="?", default=_DEFAULT_SDB)
+    convert.add_argument(
+        "--jobs", type=int, default=0, help="Worker processes (0: one per CPU)."
+    )
+    convert.set_defaults(func=bench_convert)
+
+    json_ = sub.add_parser("json", help=bench_json.__doc__)
+    json_.add_argument("sdb", type=Path, nargs="*")
+    json_.set_defaults(func=bench_json)
+
+    imports = sub.add_parser("imports", help=bench_imports.__doc__)
+    imports.set_defaults(func=bench_imports)
+
+    for command in sub.choices.values():
+        command.add_argument(
+            "--repeat", type=int, default=5, help="Timed runs (best is reported)."
+        )
+        command.add_argument(
+            "--scale",
+            type=int,
+            default=200,
+            help="Repeat the workload N times per run.",
+        )
+
+    args = parser.parse_args()
+    args.func(args)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())